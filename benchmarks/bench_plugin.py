@@ -0,0 +1,238 @@
+"""
+Synthetic-scale benchmarks of the pytest-jira-xray plugin pipeline.
+
+Each case generates a synthetic session with given number of test items and feeds their reports
+to the ``XrayPlugin`` hooks, then builds, encodes and publishes the Xray report to a local Xray stand-in
+(``pytest_xray.testing.XrayServer``).
+Every case runs in a separate process, so peak RSS is measured per case.
+
+Usage::
+
+    $ python benchmarks/bench_plugin.py --sizes 1000 10000 100000 --output results.json
+    $ python benchmarks/bench_plugin.py --sizes 1000 --compare results.json
+"""
+
+import argparse
+import base64
+import datetime as dt
+import json
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+SCENARIOS: dict[str, dict[str, Any]] = {
+    # one key per test, everything passes
+    'baseline': dict(keys_per_item=1, fan_in=1, fail_rate=0.0, evidence_size=0, capture_size=0),
+    # many parametrized tests per key with some failures
+    'parametrized': dict(keys_per_item=1, fan_in=10, fail_rate=0.1, evidence_size=0, capture_size=0),
+    # tests marked with several keys
+    'multi-key': dict(keys_per_item=3, fan_in=1, fail_rate=0.05, evidence_size=0, capture_size=0),
+    # evidences attached to failing tests
+    'evidence': dict(keys_per_item=1, fan_in=1, fail_rate=0.05, evidence_size=8192, capture_size=0),
+    # captured output added to comments with --add-captures
+    'captures': dict(keys_per_item=1, fan_in=1, fail_rate=0.05, evidence_size=0, capture_size=2048),
+    # all tests fail with the same traceback, e.g. when a service is not available
+    'outage': dict(keys_per_item=1, fan_in=1, fail_rate=1.0, evidence_size=0, capture_size=0),
+    # the same with tracebacks deduplicated by --xray-dedupe-failures
+    'outage-dedupe': dict(keys_per_item=1, fan_in=1, fail_rate=1.0, evidence_size=0, capture_size=0, dedupe=True),
+}
+
+DEFAULT_SIZES: list[int] = [1000, 10000, 100000]
+
+# metrics where lower is better, compared with a baseline results file
+COMPARED_METRICS: list[str] = [
+    'hook_us_per_test',
+    'as_dict_s',
+    'encode_s',
+    'payload_bytes',
+    'peak_rss_kib',
+    'publish_s',
+]
+
+TRACEBACK: str = (
+    'def test_example(value):\n'
+    '>       assert value == expected\n'
+    'E       AssertionError: assert 1 == 2\n\n'
+    'tests/test_example.py:10: AssertionError'
+)
+
+
+def _peak_rss_kib() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - not available on Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux kilobytes
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def _make_reports(size: int, scenario: dict[str, Any], seed: int = 0) -> list[Any]:
+    from _pytest.reports import TestReport
+
+    rng = random.Random(seed)
+    evidence_data = base64.b64encode(rng.randbytes(scenario['evidence_size'])).decode()
+    capture = 'x' * (scenario['capture_size'] - 1) + '\n' if scenario['capture_size'] else ''
+    keys_per_item = scenario['keys_per_item']
+
+    reports = []
+    for index in range(size):
+        nodeid = f'tests/test_bench.py::test_{index // scenario["fan_in"]}[{index % scenario["fan_in"]}]'
+        first_key = (index // scenario['fan_in']) * keys_per_item
+        test_keys = {nodeid: [f'BENCH-{number}' for number in range(first_key, first_key + keys_per_item)]}
+        failed = rng.random() < scenario['fail_rate']
+        sections = [('Captured stdout call', capture)] if capture else []
+        for when in ('setup', 'call', 'teardown'):
+            outcome = 'failed' if failed and when == 'call' else 'passed'
+            report = TestReport(
+                nodeid=nodeid,
+                location=('tests/test_bench.py', index, nodeid),
+                keywords={},
+                outcome=outcome,  # type: ignore[arg-type]
+                longrepr=TRACEBACK if outcome == 'failed' else None,
+                when=when,  # type: ignore[arg-type]
+                sections=sections if when == 'call' else [],
+                duration=0.001,
+            )
+            report.test_keys = test_keys  # type: ignore[attr-defined]
+            report.defects = {}  # type: ignore[attr-defined]
+            if failed and when == 'call' and evidence_data:
+                report.evidences = [  # type: ignore[attr-defined]
+                    {'data': evidence_data, 'filename': 'screenshot.png', 'contentType': 'image/png'}
+                ]
+            reports.append(report)
+    return reports
+
+
+def run_case(scenario_name: str, size: int) -> dict[str, Any]:
+    """Run a single benchmark case in the current process and return its metrics."""
+    from _pytest.config import _prepareconfig
+
+    from pytest_xray.constant import TEST_EXECUTION_ENDPOINT, XRAY_PLUGIN
+    from pytest_xray.testing import XrayServer
+    from pytest_xray.xray_plugin import XrayPlugin
+    from pytest_xray.xray_publisher import XrayPublisher
+
+    scenario = SCENARIOS[scenario_name]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        args = ['--jira-xray', f'--xraypath={tmp_dir}/xray.json', '--allow-duplicate-ids', '-p', 'no:cacheprovider']
+        if scenario['capture_size']:
+            args.append('--add-captures')
+        if scenario.get('dedupe'):
+            args.append('--xray-dedupe-failures')
+        config = _prepareconfig(args)
+        config._do_configure()
+        try:
+            plugin = config.pluginmanager.get_plugin(XRAY_PLUGIN)
+            assert isinstance(plugin, XrayPlugin)
+            reports = _make_reports(size, scenario)
+
+            start = time.perf_counter()
+            for report in reports:
+                plugin.pytest_runtest_logreport(report)
+            hook_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            results = plugin.test_execution.as_dict()
+            as_dict_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            payload = json.dumps(results).encode('utf-8')
+            encode_time = time.perf_counter() - start
+
+            with XrayServer() as server:
+                publisher = XrayPublisher(
+                    base_url=server.url, endpoint=TEST_EXECUTION_ENDPOINT, auth=('user', 'password')
+                )
+                start = time.perf_counter()
+                publisher.publish(results)
+                publish_time = time.perf_counter() - start
+        finally:
+            config._ensure_unconfigure()
+
+    return {
+        'scenario': scenario_name,
+        'size': size,
+        **scenario,
+        'keys': len(results['tests']),
+        'hook_us_per_test': round(hook_time / size * 1e6, 3),
+        'as_dict_s': round(as_dict_time, 6),
+        'encode_s': round(encode_time, 6),
+        'payload_bytes': len(payload),
+        'peak_rss_kib': _peak_rss_kib(),
+        'publish_s': round(publish_time, 6),
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], cwd=Path(__file__).parent, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _compare(results: list[dict[str, Any]], baseline_path: str) -> None:
+    baseline = {(case['scenario'], case['size']): case for case in json.loads(Path(baseline_path).read_text())['cases']}
+    print(f'\nComparison with {baseline_path} (current / baseline):')
+    for case in results:
+        base_case = baseline.get((case['scenario'], case['size']))
+        if base_case is None:
+            continue
+        ratios = []
+        for metric in COMPARED_METRICS:
+            if case.get(metric) and base_case.get(metric):
+                ratios.append(f'{metric}={case[metric] / base_case[metric]:.2f}x')
+        print(f'{case["scenario"]:>14} {case["size"]:>7}: ' + ' '.join(ratios))
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES, help='numbers of test items')
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--output', metavar='path', help='write results in JSON format to given file')
+    parser.add_argument('--compare', metavar='path', help='compare results with a previous JSON results file')
+    parser.add_argument('--case', nargs=2, metavar=('SCENARIO', 'SIZE'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.case:
+        print(json.dumps(run_case(args.case[0], int(args.case[1]))))
+        return 0
+
+    cases = []
+    for size in args.sizes:
+        for scenario_name in args.scenarios:
+            output = subprocess.check_output([sys.executable, __file__, '--case', scenario_name, str(size)], text=True)
+            case = json.loads(output.splitlines()[-1])
+            cases.append(case)
+            print(
+                f'{scenario_name:>14} {size:>7}: hook {case["hook_us_per_test"]:>8.1f} us/test, '
+                f'as_dict {case["as_dict_s"]:.3f} s, encode {case["encode_s"]:.3f} s, '
+                f'payload {case["payload_bytes"]:>11} B, peak RSS {case["peak_rss_kib"]} KiB, '
+                f'publish {case["publish_s"]:.3f} s'
+            )
+
+    if args.output:
+        data = {
+            'meta': {
+                'revision': _git_revision(),
+                'date': dt.datetime.now(tz=dt.timezone.utc).isoformat(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+            },
+            'cases': cases,
+        }
+        Path(args.output).write_text(json.dumps(data, indent=2))
+    if args.compare:
+        _compare(cases, args.compare)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
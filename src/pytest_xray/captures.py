@@ -0,0 +1,73 @@
+"""Captured output of tests added to the XRAY report with ``--add-captures`` option."""
+
+import argparse
+import gzip
+import re
+from typing import Optional
+
+from _pytest.reports import TestReport
+
+from pytest_xray.evidence import APP_GZIP, evidence
+from pytest_xray.helper import Status
+
+# ANSI escape sequences setting colors, e.g. of log levels
+ANSI_ESCAPE: re.Pattern = re.compile(r'\x1b\[[0-9;]*m')
+
+# compression level of captures sent as evidences, the fastest level is used as captures compress well anyway
+CAPTURES_COMPRESS_LEVEL: int = 1
+
+
+def parse_capture_statuses(value: str) -> set[Status]:
+    """Parse comma separated statuses of tests whose captures are added to the report."""
+    statuses = set()
+    for name in value.split(','):
+        try:
+            statuses.add(Status(name.strip().upper()))
+        except ValueError:
+            choices = ', '.join(status.value for status in Status)
+            raise argparse.ArgumentTypeError(f'unknown status "{name.strip()}", choose from {choices}') from None
+    return statuses
+
+
+def parse_capture_limit(value: str) -> int:
+    """Parse maximal number of characters kept from the end of each captured stream."""
+    try:
+        limit = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'captures limit must be an integer but got "{value}"') from None
+    if limit < 1:
+        raise argparse.ArgumentTypeError(f'captures limit must be greater than 0 but got {limit}')
+    return limit
+
+
+def _tail(text: str, limit: Optional[int]) -> str:
+    if limit is None or len(text) <= limit:
+        return text
+    return f'... {len(text) - limit} characters truncated ...\n{text[-limit:]}'
+
+
+def get_captures(report: TestReport, limit: Optional[int] = None) -> str:
+    """
+    Return captured stdout, stderr and log of a test without ANSI escape sequences.
+
+    :param report: test report with captured output
+    :param limit: maximal number of characters kept from the end of each stream
+    """
+    captures = ''
+    stdout = report.capstdout
+    if stdout:
+        captures += f'{"-" * 29} Captured stdout call {"-" * 29}\n{_tail(ANSI_ESCAPE.sub("", stdout), limit)}'
+    stderr = report.capstderr
+    if stderr:
+        captures += f'{"-" * 29} Captured stderr call {"-" * 29}\n{_tail(ANSI_ESCAPE.sub("", stderr), limit)}'
+    log = report.caplog
+    if log:
+        captures += f'{"-" * 30} Captured log call {"-" * 31}\n{_tail(ANSI_ESCAPE.sub("", log), limit)}'
+    return captures
+
+
+def get_captures_evidence(report: TestReport, captures: str) -> dict[str, str]:
+    """Return captures as a gzip compressed text evidence named after the pytest test and its phase."""
+    name = re.sub(r'[^\w.\[\]-]+', '_', report.nodeid)
+    data = gzip.compress(captures.encode('utf-8'), compresslevel=CAPTURES_COMPRESS_LEVEL)
+    return evidence(data, f'{name}-{report.when}.txt.gz', APP_GZIP)
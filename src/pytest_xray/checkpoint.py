@@ -0,0 +1,96 @@
+"""
+Checkpoint of results uploaded in batches, so a failed upload continues with the first batch which did not land.
+
+The checkpoint file keeps the key of the created test execution and hashes of the uploaded batches.
+Batches of a resumed upload are compared with the recorded ones in order, those which match are not
+uploaded again and the rest is imported into the recorded test execution.
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Optional
+
+from pytest_xray.ledger import get_payload_fingerprint
+
+_logger = logging.getLogger(__name__)
+
+
+class UploadCheckpoint:
+    """
+    Test execution key and hashes of batches uploaded to it, stored in a JSON file.
+
+    :param path: path of the checkpoint file
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = Path(path)
+        self.url: Optional[str] = None
+        self.test_execution_key: Optional[str] = None
+        self.batches: list[dict[str, Any]] = []  # hash and number of tests of each uploaded batch
+        self.complete: bool = False
+
+    def load(self, url: str) -> None:
+        """Read the checkpoint of an upload to given URL, checkpoints of other URLs are ignored."""
+        try:
+            data = json.loads(self.path.read_text(encoding='UTF-8'))
+        except FileNotFoundError:
+            data = {}
+        except (OSError, ValueError):
+            _logger.exception('Cannot read upload checkpoint "%s", uploading all batches', self.path)
+            data = {}
+        if data.get('url') != url:
+            data = {}
+        self.url = url
+        self.test_execution_key = data.get('testExecutionKey')
+        self.batches = data.get('batches', [])
+        self.complete = data.get('complete', False)
+
+    def fingerprint(self, data: dict[str, Any]) -> str:
+        """Return hash of a batch of results."""
+        return get_payload_fingerprint(self.url or '', data)
+
+    def resume(self, index: int, fingerprint: str) -> Optional[str]:
+        """
+        Return test execution key if the batch at given index was already uploaded.
+
+        Otherwise this and the following batches are removed from the checkpoint,
+        so the upload continues with this batch.
+        """
+        uploaded = index < len(self.batches) and self.batches[index]['fingerprint'] == fingerprint
+        if uploaded and self.test_execution_key is not None:
+            return self.test_execution_key
+        del self.batches[index:]
+        self.complete = False
+        if not self.batches:
+            self.test_execution_key = None
+        return None
+
+    def add(self, fingerprint: str, tests: int, key: str) -> None:
+        """Record uploaded batch with the key of its test execution."""
+        self.test_execution_key = key
+        self.batches.append({'fingerprint': fingerprint, 'tests': tests})
+        self.save()
+
+    def finish(self) -> None:
+        """Record that all batches were uploaded."""
+        self.complete = True
+        self.save()
+
+    def save(self) -> None:
+        """Replace the checkpoint file, so it is never left partially written."""
+        data = {
+            'url': self.url,
+            'testExecutionKey': self.test_execution_key,
+            'batches': self.batches,
+            'complete': self.complete,
+        }
+        temp_path = self.path.with_name(self.path.name + '.tmp')
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path.write_text(json.dumps(data, indent=2), encoding='UTF-8')
+            os.replace(temp_path, self.path)
+        except OSError:
+            # the batch was uploaded, only a resumed upload sends it again
+            _logger.exception('Cannot write upload checkpoint "%s"', self.path)
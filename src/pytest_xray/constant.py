@@ -1,8 +1,14 @@
 TEST_EXECUTION_ENDPOINT = '/rest/raven/2.0/import/execution'
 TEST_EXECUTION_ENDPOINT_CLOUD = '/api/v2/import/execution'
 AUTHENTICATE_ENDPOINT = '/api/v2/authenticate'
+SEARCH_ENDPOINT = '/rest/api/2/search'
 DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%S%z'
 XRAY_PLUGIN = 'JIRA_XRAY'
+XRAY_SELECTION_PLUGIN = 'JIRA_XRAY_SELECTION'
+XRAY_CACHE_LAST_FAILED = 'pytest_xray/lastfailed'
+XRAY_CACHE_DIR = 'pytest_xray'
+XRAY_HISTORY_FILE = 'history.json'
+XRAY_CACHE_KEYS = 'pytest_xray/keys'
 XRAY_MARKER_NAME = 'xray'
 JIRA_XRAY_FLAG = '--jira-xray'
 XRAY_TEST_PLAN_ID = '--testplan'
@@ -12,7 +18,38 @@ JIRA_CLOUD = '--cloud'
 JIRA_API_KEY = '--api-key-auth'
 JIRA_CLIENT_SECRET_AUTH = '--client-secret-auth'
 XRAYPATH = '--xraypath'
+XRAY_ARCHIVE = '--xray-archive'
+XRAY_PER_PROJECT = '--xray-per-project'
+XRAY_PROJECT = '--xray-project'
+XRAY_LEDGER = '--xray-ledger'
+XRAY_LEDGER_IGNORE = '--xray-ledger-ignore'
 XRAY_ADD_CAPTURES = '--add-captures'
+XRAY_CAPTURES_FOR = '--xray-captures-for'
+XRAY_CAPTURES_LIMIT = '--xray-captures-limit'
+XRAY_CAPTURES_EVIDENCE = '--xray-captures-evidence'
+XRAY_KEYS = '--xray-keys'
+XRAY_KEYS_FILE = '--xray-keys-file'
+XRAY_LAST_FAILED = '--xray-last-failed'
+XRAY_SHARD = '--xray-shard'
+XRAY_ORDER = '--xray-order'
+XRAY_PROFILE = '--xray-profile'
+XRAY_PROFILE_JSON = '--xray-profile-json'
+XRAY_MEMORY = '--xray-memory'
+XRAY_MEMORY_JSON = '--xray-memory-json'
+XRAY_TRACE = '--xray-trace'
+XRAY_SLOW_THRESHOLD = '--xray-slow-threshold'
+XRAY_BASELINE = '--xray-baseline'
+XRAY_SAVE_BASELINE = '--xray-save-baseline'
+XRAY_SLOW_COMMENT = '--xray-slow-comment'
+XRAY_STORE = '--xray-store'
+XRAY_BATCH_SIZE = '--xray-batch-size'
+XRAY_CHECKPOINT = '--xray-checkpoint'
+XRAY_WARM_UP = '--xray-warm-up'
+XRAY_WARM_UP_ABORT = '--xray-warm-up-abort'
+XRAY_ITERATIONS = '--xray-iterations'
+XRAY_DEDUPE_FAILURES = '--xray-dedupe-failures'
+XRAY_VALIDATE_KEYS = '--xray-validate-keys'
+XRAY_VALIDATE_KEYS_TTL = '--xray-validate-keys-ttl'
 # all environment variables used by plugin
 ENV_XRAY_API_BASE_URL = 'XRAY_API_BASE_URL'
 ENV_XRAY_API_USER = 'XRAY_API_USER'
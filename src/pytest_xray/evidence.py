@@ -10,6 +10,7 @@ PLAIN_TEXT: str = 'text/plain'
 TEXT_HTML: str = 'text/html'
 APP_JSON: str = 'application/json'
 APP_ZIP: str = 'application/zip'
+APP_GZIP: str = 'application/gzip'
 
 
 def evidence(data: AnyStr, filename: str, content_type: str) -> dict[str, str]:
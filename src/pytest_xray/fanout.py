@@ -0,0 +1,275 @@
+"""
+Publisher of the same results to several targets, e.g. test executions on a server and a file archive.
+
+All targets are published concurrently, each from its own thread, and tests of the results
+are encoded to JSON only once for all targets.
+"""
+
+import functools
+import queue
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional, Union
+
+from pytest_xray.exceptions import XrayError
+from pytest_xray.file_publisher import FilePublisher
+from pytest_xray.helper import DEFAULT_SUMMARY_DESCRIPTION
+from pytest_xray.ledger import PublishLedger
+from pytest_xray.metrics import PublishMetrics
+from pytest_xray.profiler import NullProfiler, Profiler
+from pytest_xray.tracing import NullTracer, Tracer
+from pytest_xray.xray_publisher import EncodedTests, XrayPublisher, get_xray_publisher
+
+# seconds between checks whether a target which does not take the next batch is still publishing
+QUEUE_POLL_INTERVAL: float = 0.1
+
+_DONE = object()  # marks the end of batches passed to a target
+
+
+class PublishTarget:
+    """
+    Publisher of results with its own test execution and test plan keys.
+
+    :param name: name of the target shown in the terminal summary
+    :param publisher: publisher of the target
+    :param test_execution_key: key of an existing test execution
+    :param test_plan_key: key of a test plan
+    """
+
+    def __init__(
+        self,
+        name: str,
+        publisher: Union[XrayPublisher, FilePublisher],
+        test_execution_key: Optional[str] = None,
+        test_plan_key: Optional[str] = None,
+    ) -> None:
+        self.name = name
+        self.publisher = publisher
+        self.test_execution_key = test_execution_key
+        self.test_plan_key = test_plan_key
+        self.issue_id: Optional[str] = None
+        self.error: Optional[XrayError] = None
+        self.elapsed: float = 0.0  # time spent publishing in seconds
+
+    def results(self, data: dict[str, Any]) -> dict[str, Any]:
+        """Return copy of results with keys of the target, the tests are shared with the original results."""
+        results = {name: value for name, value in data.items() if name != 'testExecutionKey'}
+        info = {name: value for name, value in data.get('info', {}).items() if name != 'testPlanKey'}
+        if self.test_plan_key:
+            info['testPlanKey'] = self.test_plan_key
+        if self.test_execution_key is not None:
+            results['testExecutionKey'] = self.test_execution_key
+            # do not change summary of an existing test execution, unless it was given explicitly
+            if info.get('summary') == DEFAULT_SUMMARY_DESCRIPTION:
+                del info['summary']
+        else:
+            info.setdefault('summary', DEFAULT_SUMMARY_DESCRIPTION)
+        results['info'] = info
+        return results
+
+
+def _iter_queue(batch_queue: queue.Queue) -> Iterator[dict[str, Any]]:
+    while True:
+        item = batch_queue.get()
+        if item is _DONE:
+            return
+        yield item
+
+
+def _put(batch_queue: queue.Queue, item: Any, future: Future) -> None:
+    """Pass item to the target unless it already finished, e.g. because publishing failed."""
+    while not future.done():
+        try:
+            batch_queue.put(item, timeout=QUEUE_POLL_INTERVAL)
+        except queue.Full:
+            continue
+        return
+
+
+class FanOutPublisher:
+    """
+    Publishes the same results to several targets concurrently.
+
+    Publishing fails if any of the targets failed, results of all targets are kept in ``targets``.
+    """
+
+    def __init__(
+        self,
+        targets: list[PublishTarget],
+        profiler: Optional[Profiler] = None,
+        metrics: Optional[PublishMetrics] = None,
+        tracer: Optional[Tracer] = None,
+    ) -> None:
+        self.targets = targets
+        self.profiler = profiler or NullProfiler()
+        self.metrics = metrics or PublishMetrics()
+        self.tracer = tracer or NullTracer()
+        self._lock = threading.Lock()  # on_published callback is called from several threads
+
+    def warm_up(self) -> None:
+        """Warm up all targets concurrently or raise XrayError with errors of the failed targets."""
+        errors = []
+        with ThreadPoolExecutor(max_workers=len(self.targets), thread_name_prefix='xray-warm-up') as executor:
+            futures = [executor.submit(target.publisher.warm_up) for target in self.targets]
+        for target, future in zip(self.targets, futures):
+            exc = future.exception()
+            if isinstance(exc, XrayError):
+                errors.append(f'{target.name}: {exc.message}')
+            elif exc is not None:
+                raise exc
+        if errors:
+            raise XrayError('\n'.join(errors))
+
+    def publish(self, data: dict[str, Any]) -> str:
+        """
+        Publish results to all targets and return their issue ids or raise XrayError.
+
+        :param data: results to publish
+        :return: comma separated issue ids or file paths of the targets
+        """
+        data = {**data, 'tests': EncodedTests(data['tests'])}
+        return self._run([functools.partial(self._publish, target, data) for target in self.targets])
+
+    def publish_batches(
+        self,
+        batches: Iterable[dict[str, Any]],
+        on_published: Optional[Callable[[dict[str, Any], str], None]] = None,
+    ) -> str:
+        """
+        Publish results split into batches to all targets and return their issue ids or raise XrayError.
+
+        Each target takes the next batch only when it published the previous one, so at most
+        a single batch is kept in memory.
+
+        :param batches: results with parts of tests
+        :param on_published: function called with each batch and the issue id of a target after it was published
+        :return: comma separated issue ids or file paths of the targets
+        """
+        queues: list[queue.Queue] = [queue.Queue(maxsize=1) for _ in self.targets]
+        callback = None if on_published is None else functools.partial(self._published, on_published)
+
+        def feed(futures: list[Future]) -> None:
+            try:
+                for data in batches:
+                    data = {**data, 'tests': EncodedTests(data['tests'])}
+                    for target, batch_queue, future in zip(self.targets, queues, futures):
+                        _put(batch_queue, target.results(data), future)
+            finally:
+                for batch_queue, future in zip(queues, futures):
+                    _put(batch_queue, _DONE, future)
+
+        calls: list[Callable[[], str]] = [
+            functools.partial(target.publisher.publish_batches, _iter_queue(batch_queue), callback)
+            for target, batch_queue in zip(self.targets, queues)
+        ]
+        return self._run(calls, feed)
+
+    @staticmethod
+    def _publish(target: PublishTarget, data: dict[str, Any]) -> str:
+        return target.publisher.publish(target.results(data))
+
+    def _published(self, on_published: Callable[[dict[str, Any], str], None], data: dict[str, Any], key: str) -> None:
+        with self._lock:
+            on_published(data, key)
+
+    def _run(self, calls: list[Callable[[], str]], feed: Optional[Callable[[list[Future]], None]] = None) -> str:
+        span = self.tracer.span('publish to targets', attributes={'xray.targets': len(self.targets)})
+        with span, ThreadPoolExecutor(max_workers=len(self.targets), thread_name_prefix='xray-publish') as executor:
+            futures = [
+                executor.submit(self._run_target, target, call, span) for target, call in zip(self.targets, calls)
+            ]
+            if feed is not None:
+                feed(futures)
+        return self._collect(futures)
+
+    def _collect(self, futures: list[Future]) -> str:
+        """Merge metrics of the finished targets and return their issue ids or raise XrayError."""
+        for future in futures:
+            future.result()  # raise unexpected errors of the targets
+        for target in self.targets:
+            self.metrics.merge(target.publisher.metrics)
+            self.profiler.add(f'publish: target {target.name}', target.elapsed)
+        failed = [target.name for target in self.targets if target.error is not None]
+        if failed:
+            raise XrayError(
+                f'Could not publish results to {len(failed)} of {len(self.targets)} targets: {", ".join(failed)}'
+            )
+        return ', '.join(str(target.issue_id) for target in self.targets)
+
+    def _run_target(self, target: PublishTarget, call: Callable[[], str], span: Any) -> None:
+        target.publisher.metrics.estimate_compression = self.metrics.estimate_compression
+        start = time.perf_counter()
+        try:
+            with self.tracer.attach(span):
+                target.issue_id = call()
+        except XrayError as exc:
+            target.error = exc
+        finally:
+            target.elapsed = time.perf_counter() - start
+
+    def summary_lines(self) -> list[str]:
+        """Return issue id or error of each target."""
+        lines = []
+        for target in self.targets:
+            if target.error is not None:
+                lines.append(f'{target.name}: failed, {target.error.message}')
+            elif target.issue_id is not None:
+                lines.append(f'{target.name}: {target.issue_id}')
+        return lines
+
+
+def _target_name(test_execution_key: Optional[str], test_plan_key: Optional[str]) -> str:
+    if test_execution_key is not None:
+        return test_execution_key
+    if test_plan_key is not None:
+        return f'new test execution in {test_plan_key}'
+    return 'new test execution'
+
+
+def get_fan_out_publisher(
+    keys: list[tuple[Optional[str], Optional[str]]],
+    xray_path: Optional[str] = None,
+    archive: Optional[str] = None,
+    cloud: bool = False,
+    client_secret_auth: bool = False,
+    api_key_auth: bool = False,
+    profiler: Optional[Profiler] = None,
+    metrics: Optional[PublishMetrics] = None,
+    tracer: Optional[Tracer] = None,
+    ledger: Optional[PublishLedger] = None,
+) -> FanOutPublisher:
+    """
+    Return publisher of results to each pair of test execution and test plan keys and to the archive file.
+
+    :param keys: pairs of test execution and test plan keys, the first pair is used by the plugin results
+    :param xray_path: store results with the first pair of keys in a file instead of uploading them to a server
+    :param archive: store results also in a file at given path
+    :param cloud: use Jira XRAY cloud server endpoint
+    :param client_secret_auth: use client secret authentication
+    :param api_key_auth: use API key authentication, basic authentication is used by default
+    :param profiler: profiler measuring publish phases, it is shared by the targets
+    :param metrics: metrics of published results of all targets
+    :param tracer: tracer of publish phases, it is shared by the targets
+    :param ledger: ledger of results published to servers which are not published again
+    :return: fan-out publisher
+    """
+    # each target has its own metrics, they are merged when all targets finished
+    targets = []
+    if xray_path:
+        targets.append(PublishTarget(xray_path, FilePublisher(xray_path, profiler, None, tracer), *keys[0]))
+    else:
+        for test_execution_key, test_plan_key in keys:
+            # each target has its own connection and authentication, they are used from separate threads
+            publisher = get_xray_publisher(
+                cloud, client_secret_auth, api_key_auth, profiler=profiler, tracer=tracer, ledger=ledger
+            )
+            targets.append(
+                PublishTarget(
+                    _target_name(test_execution_key, test_plan_key), publisher, test_execution_key, test_plan_key
+                )
+            )
+    if archive:
+        targets.append(PublishTarget(archive, FilePublisher(archive, profiler, None, tracer), *keys[0]))
+    return FanOutPublisher(targets, profiler, metrics, tracer)
@@ -1,8 +1,13 @@
 import json
 import logging
+from collections.abc import Iterable
 from pathlib import Path
+from typing import Callable, Optional
 
 from pytest_xray.exceptions import XrayError
+from pytest_xray.metrics import PublishMetrics
+from pytest_xray.profiler import NullProfiler, Profiler
+from pytest_xray.tracing import NullTracer, Tracer
 
 logger = logging.getLogger(__name__)
 
@@ -10,8 +15,24 @@ logger = logging.getLogger(__name__)
 class FilePublisher:
     """Exports Xray report to a file."""
 
-    def __init__(self, filepath: str) -> None:
+    def __init__(
+        self,
+        filepath: str,
+        profiler: Optional[Profiler] = None,
+        metrics: Optional[PublishMetrics] = None,
+        tracer: Optional[Tracer] = None,
+    ) -> None:
         self.filepath: Path = Path(filepath)
+        self.profiler = profiler or NullProfiler()
+        self.metrics = metrics or PublishMetrics()
+        self.tracer = tracer or NullTracer()
+
+    def warm_up(self) -> None:
+        """Create directory of the file or raise XrayError, so it is not found only when results are saved."""
+        try:
+            self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        except OSError as exc:
+            raise XrayError(f'Cannot create directory of Xray results file: {exc}') from exc
 
     def publish(self, data: dict) -> str:
         """
@@ -21,9 +42,53 @@ class FilePublisher:
         :return: file path where data was saved
         """
         self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        span = self.tracer.span('write file', attributes={'file.path': str(self.filepath)})
         try:
-            with open(self.filepath, 'w', encoding='UTF-8') as file:
+            with self.profiler.measure('publish: write file'), span, open(self.filepath, 'w', encoding='UTF-8') as file:
                 json.dump(data, file, indent=2)
+                self.metrics.payload_bytes += file.tell()
+                span.set_attribute('file.size', file.tell())
+        except TypeError as exc:
+            logger.exception(exc)
+            raise XrayError(f'Cannot export Xray results to file: {exc}') from exc
+        else:
+            return f'{self.filepath}'
+
+    def publish_batches(
+        self, batches: Iterable[dict], on_published: Optional[Callable[[dict, str], None]] = None
+    ) -> str:
+        """
+        Save results split into batches to a single file or raise XrayError.
+
+        Tests are written one by one, so only a single batch is kept in memory.
+
+        :param batches: results with parts of tests
+        :param on_published: function called with each batch and the file path after its tests were written
+        :return: file path where data was saved
+        """
+        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        span = self.tracer.span('write file', attributes={'file.path': str(self.filepath)})
+        try:
+            with self.profiler.measure('publish: write file'), span, open(self.filepath, 'w', encoding='UTF-8') as file:
+                file.write('{\n  "tests": [')
+                first: Optional[dict] = None
+                separator = '\n    '
+                for data in batches:
+                    for test in data['tests']:
+                        file.write(separator)
+                        json.dump(test, file)
+                        separator = ',\n    '
+                    if first is None:
+                        first = {name: value for name, value in data.items() if name != 'tests'}
+                    if on_published is not None:
+                        on_published(data, str(self.filepath))
+                file.write('\n  ]')
+                for name, value in (first or {}).items():
+                    file.write(f',\n  {json.dumps(name)}: ')
+                    json.dump(value, file)
+                file.write('\n}\n')
+                self.metrics.payload_bytes += file.tell()
+                span.set_attribute('file.size', file.tell())
         except TypeError as exc:
             logger.exception(exc)
             raise XrayError(f'Cannot export Xray results to file: {exc}') from exc
@@ -0,0 +1,37 @@
+import hashlib
+import re
+
+from _pytest.reports import TestReport
+
+# number of hexadecimal digits of failure fingerprints
+FINGERPRINT_LENGTH: int = 12
+
+# parts of failure messages which differ between occurrences of the same failure
+VOLATILE_PATTERNS: list[tuple[re.Pattern, str]] = [
+    (re.compile(r'0x[0-9a-fA-F]+'), '0x?'),  # memory addresses in representations of objects
+    (re.compile(r'pytest-\d+'), 'pytest-?'),  # numbered pytest temporary directories
+    (re.compile(r'\d+(\.\d+)?(?= ?(s|ms|seconds?)\b)'), '?'),  # durations, e.g. of timeouts
+]
+
+
+def normalize_failure(text: str) -> str:
+    """Replace parts of failure text which differ between occurrences of the same failure."""
+    for pattern, replacement in VOLATILE_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def get_failure_fingerprint(report: TestReport) -> str:
+    """
+    Return fingerprint of the failure of a test.
+
+    Failures raised at the same place with the same message have the same fingerprint, even if they
+    are raised from different tests, e.g. when a service used by the tests is not available.
+    Failures without details about the crash are identified by the whole traceback.
+    """
+    crash = getattr(report.longrepr, 'reprcrash', None)
+    if crash is not None:
+        text = f'{crash.path}:{crash.lineno}\n{crash.message}'
+    else:
+        text = report.longreprtext
+    return hashlib.sha1(normalize_failure(text).encode('utf-8')).hexdigest()[:FINGERPRINT_LENGTH]
@@ -2,8 +2,9 @@ import datetime as dt
 import enum
 import os
 import re
+from collections.abc import Iterator
 from os import environ
-from typing import Any, Optional, Union
+from typing import Any, Callable, Optional, Union
 
 from pytest_xray import constant
 from pytest_xray.constant import (
@@ -19,6 +20,8 @@ from pytest_xray.constant import (
 from pytest_xray.exceptions import XrayError
 
 DEFAULT_SUMMARY_DESCRIPTION: str = 'Execution of automated tests'
+COMMENT_PREFIX: str = '{noformat:borderWidth=0px|bgColor=transparent}'
+COMMENT_SUFFIX: str = '{noformat}'
 
 
 class Status(str, enum.Enum):
@@ -60,6 +63,50 @@ STATUS_STR_MAPPER_CLOUD: dict[Status, str] = {
 # On-site jira uses the enum strings directly
 STATUS_STR_MAPPER_JIRA: dict[Status, str] = {x: x.value for x in Status}
 
+# Statuses of tests which should be rerun
+FAILED_STATUSES: tuple[Status, ...] = (Status.FAIL, Status.ABORTED)
+
+
+class Iteration:
+    """Result of a single parametrization of a test."""
+
+    def __init__(
+        self,
+        name: str,
+        status: Status,
+        parameters: Optional[list[tuple[str, str]]] = None,
+        log: Optional[str] = None,
+    ) -> None:
+        self.name = name
+        self.status = status
+        self.parameters = parameters or []
+        self.log = log or ''
+
+    def merge(self, other: 'Iteration') -> None:
+        """Merges results of other phases of the same parametrization."""
+        self.status = _merge_status(self.status, other.status)
+        if other.log != '':
+            self.log = f'{self.log}\n{other.log}' if self.log != '' else other.log
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> 'Iteration':
+        return cls(
+            name=data['name'],
+            status=status_from_str(data['status']),
+            parameters=[(parameter['name'], parameter['value']) for parameter in data.get('parameters', [])],
+            log=data.get('log'),
+        )
+
+    def as_dict(self, status_str_mapper: dict[Status, str]) -> dict[str, Any]:
+        data: dict[str, Any] = dict(
+            name=self.name,
+            parameters=[dict(name=name, value=value) for name, value in self.parameters],
+            status=status_str_mapper[self.status],
+        )
+        if self.log != '':
+            data['log'] = self.log
+        return data
+
 
 class TestCase:
     __test__ = False
@@ -72,6 +119,9 @@ class TestCase:
         status_str_mapper: Optional[dict[Status, str]] = None,
         evidences: Optional[list[dict[str, str]]] = None,
         defects: Optional[list[str]] = None,
+        start: Optional[dt.datetime] = None,
+        finish: Optional[dt.datetime] = None,
+        iterations: Optional[list[Iteration]] = None,
     ) -> None:
         self.test_key = test_key
         self.status = status
@@ -79,12 +129,16 @@ class TestCase:
         self.status_str_mapper = status_str_mapper or STATUS_STR_MAPPER_JIRA
         self.evidences = evidences or []
         self.defects = defects or []
+        self.start = start
+        self.finish = finish
+        self.iterations: dict[str, Iteration] = {iteration.name: iteration for iteration in iterations or []}
 
     def merge(self, other: 'TestCase') -> None:
         """
         Merges this test case with other, in order to obtain
-        a combined result. Comments will be just appended one after the other.
-        status will be merged according to a priority list.
+        a combined result. Comments will be just appended one after the other,
+        as well as evidences. status will be merged according to a priority list.
+        Iterations with the same name are merged, other iterations are added.
         Merge is only possible if the two tests have the same test_key
         """
 
@@ -100,22 +154,57 @@ class TestCase:
                 self.comment += other.comment
 
         self.status = _merge_status(self.status, other.status)
+        self.start = _merge_time(min, self.start, other.start)
+        self.finish = _merge_time(max, self.finish, other.finish)
 
         for defect in other.defects:
             if defect not in self.defects:
                 self.defects.append(defect)
 
+        # a new list, evidences of a report are shared by test cases of all its keys
+        self.evidences = [*self.evidences, *(item for item in other.evidences if item not in self.evidences)]
+
+        for iteration in other.iterations.values():
+            if iteration.name in self.iterations:
+                self.iterations[iteration.name].merge(iteration)
+            else:
+                self.iterations[iteration.name] = iteration
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any], status_str_mapper: Optional[dict[Status, str]] = None) -> 'TestCase':
+        """Create test case from dictionary in XRAY format, e.g. read from XRAY JSON report."""
+        comment: str = data.get('comment', '')
+        if comment.startswith(COMMENT_PREFIX) and comment.endswith(COMMENT_SUFFIX):
+            comment = comment[len(COMMENT_PREFIX) : -len(COMMENT_SUFFIX)]
+        return cls(
+            test_key=data['testKey'],
+            status=status_from_str(data['status']),
+            comment=comment,
+            status_str_mapper=status_str_mapper,
+            evidences=data.get('evidences'),
+            defects=data.get('defects'),
+            start=dt.datetime.strptime(data['start'], DATETIME_FORMAT) if 'start' in data else None,
+            finish=dt.datetime.strptime(data['finish'], DATETIME_FORMAT) if 'finish' in data else None,
+            iterations=[Iteration.from_dict(iteration) for iteration in data.get('iterations', [])],
+        )
+
     def as_dict(self) -> dict[str, Any]:
         data: dict[str, Any] = dict(
             testKey=self.test_key,
             status=self.status_str_mapper[self.status],
         )
+        if self.start is not None:
+            data['start'] = self.start.strftime(DATETIME_FORMAT)
+        if self.finish is not None:
+            data['finish'] = self.finish.strftime(DATETIME_FORMAT)
         if self.comment != '':
-            data['comment'] = '{noformat:borderWidth=0px|bgColor=transparent}' + self.comment + '{noformat}'
+            data['comment'] = COMMENT_PREFIX + self.comment + COMMENT_SUFFIX
         if self.evidences:
             data['evidences'] = self.evidences
         if self.defects:
             data['defects'] = self.defects
+        if self.iterations:
+            data['iterations'] = [iteration.as_dict(self.status_str_mapper) for iteration in self.iterations.values()]
         return data
 
 
@@ -157,27 +246,64 @@ class TestExecution:
             return DEFAULT_SUMMARY_DESCRIPTION
         return None
 
+    @property
+    def tests(self) -> list[TestCase]:
+        return self._tests
+
+    @tests.setter
+    def tests(self, tests: list[TestCase]) -> None:
+        self._tests = tests
+        self._tests_by_key: dict[str, TestCase] = {}
+        for test in tests:
+            self._tests_by_key.setdefault(test.test_key, test)
+
     def append(self, test: Union[dict, TestCase]) -> None:
         if not isinstance(test, TestCase):
             test = TestCase(**test)
-        self.tests.append(test)
+        self._tests.append(test)
+        self._tests_by_key.setdefault(test.test_key, test)
 
     def find_test_case(self, test_key: str) -> TestCase:
         """
         Searches a stored test case by identifier.
         If not found, raises KeyError
         """
-        # Linear search, but who cares really of performance here?
+        return self._tests_by_key[test_key]
+
+    def update(self, test: TestCase) -> None:
+        """Store changes of a test case returned by ``find_test_case`` or ``iter_tests``."""
+        # test cases are kept in memory, so they are already updated
 
-        for test in self.tests:
-            if test.test_key == test_key:
-                return test
+    def iter_tests(self) -> Iterator[TestCase]:
+        """Iterate over stored test cases in the order they were added."""
+        return iter(self._tests)
 
-        raise KeyError(test_key)
+    def close(self) -> None:
+        """Release resources used to store test cases."""
+
+    def iter_batches(self, size: Optional[int] = None) -> Iterator[dict[str, Any]]:
+        """
+        Iterate over test execution results split into dictionaries with at most ``size`` tests.
+
+        At least one dictionary is returned even if there are no tests. All tests are returned
+        in a single dictionary if size is not given.
+        """
+        batch: list[dict[str, Any]] = []
+        empty = True
+        for test in self.iter_tests():
+            batch.append(test.as_dict())
+            if size is not None and len(batch) >= size:
+                yield self._as_dict(batch)
+                batch = []
+                empty = False
+        if batch or empty:
+            yield self._as_dict(batch)
 
     def as_dict(self) -> dict[str, Any]:
         """Return test execution result as dictionary."""
-        tests = [test.as_dict() for test in self.tests]
+        return self._as_dict([test.as_dict() for test in self.tests])
+
+    def _as_dict(self, tests: list[dict[str, Any]]) -> dict[str, Any]:
         info: dict[str, Any] = dict(
             startDate=self.start_date.strftime(DATETIME_FORMAT),
             finishDate=self.finish_date.strftime(DATETIME_FORMAT),  # type: ignore
@@ -302,7 +428,29 @@ def _from_environ(name: str, separator: Optional[str] = None) -> list[str]:
     return list(filter(lambda x: len(x) > 0, map(lambda x: x.strip(), source)))
 
 
+def status_from_str(value: str) -> Status:
+    """Return status from string used by either the Cloud Jira, or the on-site Jira."""
+    for status_str_mapper in (STATUS_STR_MAPPER_JIRA, STATUS_STR_MAPPER_CLOUD):
+        for status, status_str in status_str_mapper.items():
+            if status_str == value:
+                return status
+    raise XrayError(f'Unknown test status: {value}')
+
+
 def _merge_status(status_1: Status, status_2: Status) -> Status:
     """Merges the status of two tests."""
 
     return STATUS_HIERARCHY[max(STATUS_HIERARCHY.index(status_1), STATUS_HIERARCHY.index(status_2))]
+
+
+def _merge_time(
+    func: Callable[[dt.datetime, dt.datetime], dt.datetime],
+    time_1: Optional[dt.datetime],
+    time_2: Optional[dt.datetime],
+) -> Optional[dt.datetime]:
+    """Merges start or finish time of two tests, a missing time is ignored."""
+    if time_1 is None:
+        return time_2
+    if time_2 is None:
+        return time_1
+    return func(time_1, time_2)
@@ -0,0 +1,92 @@
+"""
+History of statuses and durations of Jira XRAY test keys, used to order tests and to find slow tests.
+
+The history is stored in its own file in the pytest cache directory as compact JSON, one pair of status
+and duration lists per Jira key, because the JSON values of pytest cache are indented and sorted, which
+makes them several times larger and slower to write for tens of thousands of keys.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Any, Optional
+
+from _pytest.config import Config
+
+from pytest_xray.constant import XRAY_CACHE_DIR, XRAY_HISTORY_FILE
+from pytest_xray.helper import FAILED_STATUSES, Status
+
+_logger = logging.getLogger(__name__)
+
+# number of the most recent runs stored for each Jira key
+HISTORY_SIZE: int = 10
+
+
+class XrayHistory:
+    """Recent statuses and durations of Jira XRAY test keys, each key has a list of statuses and of durations."""
+
+    def __init__(self, data: Optional[dict[str, list[list[Any]]]] = None, size: int = HISTORY_SIZE) -> None:
+        self.data: dict[str, list[list[Any]]] = data or {}
+        self.size = size
+
+    @staticmethod
+    def _get_path(config: Config) -> Optional[Path]:
+        cache = getattr(config, 'cache', None)
+        if cache is None:
+            return None
+        return cache.mkdir(XRAY_CACHE_DIR) / XRAY_HISTORY_FILE
+
+    @classmethod
+    def load(cls, config: Config) -> 'XrayHistory':
+        """Load history from pytest cache directory, return empty history if it is not available."""
+        path = cls._get_path(config)
+        if path is None:
+            return cls()
+        try:
+            with open(path, encoding='UTF-8') as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return cls()
+        except (OSError, ValueError):
+            _logger.exception('Cannot read Xray history "%s"', path)
+            return cls()
+        return cls(data if isinstance(data, dict) else None)
+
+    def save(self, config: Config) -> None:
+        """Save history to pytest cache directory if available."""
+        path = self._get_path(config)
+        if path is None:
+            return
+        try:
+            with open(path, 'w', encoding='UTF-8') as file:
+                file.write(json.dumps(self.data, separators=(',', ':')))
+        except OSError:
+            _logger.exception('Cannot write Xray history "%s"', path)
+
+    def record(self, test_key: str, status: Status, duration: float) -> None:
+        """Add result of a test to the history, only the most recent results are kept."""
+        statuses, durations = self.data.get(test_key) or ([], [])
+        self.data[test_key] = [
+            [*statuses, status.value][-self.size :],
+            [*durations, round(duration, 6)][-self.size :],
+        ]
+
+    def failure_score(self, test_key: str) -> float:
+        """
+        Return how likely the test fails, between 0 and 1.
+
+        Failure of the last run counts the most, previous failures only distinguish tests
+        with the same last status.
+        """
+        entry = self.data.get(test_key)
+        if not entry or not entry[0]:
+            return 0.0
+        failures = [Status(status) in FAILED_STATUSES for status in entry[0]]
+        return (failures[-1] + sum(failures) / len(failures)) / 2
+
+    def duration(self, test_key: str) -> Optional[float]:
+        """Return mean duration of the test or None if not known."""
+        entry = self.data.get(test_key)
+        if not entry or not entry[1]:
+            return None
+        return sum(entry[1]) / len(entry[1])
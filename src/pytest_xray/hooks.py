@@ -1,6 +1,23 @@
 from typing import Any
 
 import pytest
+from _pytest.reports import TestReport
+
+from pytest_xray.helper import TestCase
+
+
+@pytest.hookspec
+def pytest_xray_test_result(test_case: TestCase, report: TestReport) -> None:
+    """
+    Called when result of a pytest test phase was added to the result of its Jira XRAY test key.
+
+    It is called for each key of the test as soon as the result is aggregated, so results can be
+    consumed during the session. It is not called on xdist workers, but on the controller.
+
+    :param test_case: result of the key aggregated from all reports of tests marked with the key so far,
+        it must not be modified
+    :param report: pytest report of the test phase
+    """
 
 
 @pytest.hookspec
@@ -8,6 +25,34 @@ def pytest_xray_results(results: dict[str, Any], session: pytest.Session) -> Non
     """
     Called before uploading XRAY result to Jira server.
 
+    With ``--xray-batch-size`` option it is called for each batch of results.
+
     :param results: xray results dictionary
     :param session: pytest session
     """
+
+
+@pytest.hookspec
+def pytest_xray_batch_published(results: dict[str, Any], issue_id: str, session: pytest.Session) -> None:
+    """
+    Called after XRAY results were uploaded to Jira server or saved to a file.
+
+    With ``--xray-batch-size`` option it is called after each batch of results was published,
+    it is not called for batches which failed to be published.
+
+    :param results: xray results dictionary
+    :param issue_id: test execution issue id or path of the file
+    :param session: pytest session
+    """
+
+
+@pytest.hookspec
+def pytest_xray_publish_metrics(metrics: dict[str, Any], session: pytest.Session) -> None:
+    """
+    Called after XRAY results were uploaded to Jira server or saved to a file, also if publishing failed.
+
+    :param metrics: dictionary with numbers of published tests and keys, payload, compressed payload
+        and evidence sizes in bytes, numbers of requests and authentication requests,
+        request latency percentiles in seconds and upload throughput in bytes per second
+    :param session: pytest session
+    """
@@ -0,0 +1,129 @@
+"""
+Ledger of published results, so identical results are not uploaded twice, e.g. when CI retries the upload.
+
+Each published payload is identified by a hash of its normalized JSON and the URL it was sent to.
+The hashes are appended with the keys of the resulting test executions to a JSON lines file.
+"""
+
+import argparse
+import datetime as dt
+import hashlib
+import json
+import logging
+import threading
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any, Optional
+
+from pytest_xray.constant import DATETIME_FORMAT
+from pytest_xray.exceptions import XrayError
+
+_logger = logging.getLogger(__name__)
+
+
+def parse_ignored_fields(value: str) -> list[str]:
+    """Parse comma separated dotted paths of fields left out of the payload hash, e.g. ``info.startDate``."""
+    fields = [field.strip() for field in value.split(',') if field.strip()]
+    if not fields:
+        raise argparse.ArgumentTypeError(f'expected comma separated fields, e.g. info.startDate, but got "{value}"')
+    return fields
+
+
+def _without(value: Any, paths: list[list[str]]) -> Any:
+    """Return value without fields at given paths, paths apply to each item of lists."""
+    if isinstance(value, list):
+        return [_without(item, paths) for item in value]
+    if not isinstance(value, dict):
+        return value
+    nested: dict[str, list[list[str]]] = {}
+    removed = set()
+    for name, *rest in paths:
+        if rest:
+            nested.setdefault(name, []).append(rest)
+        else:
+            removed.add(name)
+    return {
+        name: _without(item, nested[name]) if name in nested else item
+        for name, item in value.items()
+        if name not in removed
+    }
+
+
+def get_payload_fingerprint(url: str, data: dict[str, Any], ignored_fields: Iterable[str] = ()) -> str:
+    """
+    Return hash of results published to given URL.
+
+    Keys of the results are sorted, so the hash does not depend on their order.
+
+    :param url: URL the results are published to
+    :param data: published results
+    :param ignored_fields: dotted paths of fields left out of the hash, e.g. ``tests.start``
+    """
+    paths = [field.split('.') for field in ignored_fields]
+    if paths:
+        data = _without(data, paths)
+    digest = hashlib.sha256(url.encode('utf-8'))
+    digest.update(b'\n')
+    digest.update(json.dumps(data, sort_keys=True, separators=(',', ':')).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class PublishLedger:
+    """
+    Keys of test executions created by published results, read from and appended to a JSON lines file.
+
+    :param path: path of the ledger file
+    :param ignored_fields: dotted paths of fields which do not make results different, e.g. ``info.startDate``
+    """
+
+    def __init__(self, path: str, ignored_fields: Iterable[str] = ()) -> None:
+        self.path = Path(path)
+        self.ignored_fields = list(ignored_fields)
+        self._entries: Optional[dict[str, str]] = None
+        # targets of the fan-out publisher share the ledger
+        self._lock = threading.Lock()
+
+    def fingerprint(self, url: str, data: dict[str, Any]) -> str:
+        """Return hash of results published to given URL."""
+        return get_payload_fingerprint(url, data, self.ignored_fields)
+
+    def _load(self) -> dict[str, str]:
+        if self._entries is not None:
+            return self._entries
+        entries: dict[str, str] = {}
+        try:
+            with open(self.path, encoding='UTF-8') as file:
+                for line in file:
+                    try:
+                        entry = json.loads(line)
+                        entries[entry['fingerprint']] = entry['key']
+                    except (ValueError, KeyError, TypeError):
+                        continue  # e.g. a line partially written by an interrupted run
+        except FileNotFoundError:
+            pass
+        except OSError as exc:
+            raise XrayError(f'Cannot read publish ledger "{self.path}": {exc}') from exc
+        self._entries = entries
+        return entries
+
+    def get(self, fingerprint: str) -> Optional[str]:
+        """Return key of the test execution which was created by results with given hash or raise XrayError."""
+        with self._lock:
+            return self._load().get(fingerprint)
+
+    def record(self, fingerprint: str, key: str) -> None:
+        """Append hash of published results with the key of their test execution."""
+        entry = {
+            'fingerprint': fingerprint,
+            'key': key,
+            'date': dt.datetime.now(tz=dt.timezone.utc).strftime(DATETIME_FORMAT),
+        }
+        with self._lock:
+            self._load()[fingerprint] = key
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, 'a', encoding='UTF-8') as file:
+                    file.write(json.dumps(entry) + '\n')
+            except OSError:
+                # results were published already, only the next retry of the same results is not skipped
+                _logger.exception('Cannot write publish ledger "%s"', self.path)
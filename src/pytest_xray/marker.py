@@ -0,0 +1,48 @@
+from typing import Optional
+
+from _pytest.mark import Mark
+from _pytest.nodes import Item
+
+from pytest_xray.constant import XRAY_MARKER_NAME
+from pytest_xray.exceptions import XrayError
+
+
+def get_xray_marker(item: Item) -> Optional[Mark]:
+    return item.get_closest_marker(XRAY_MARKER_NAME)
+
+
+def get_test_keys(item: Item) -> list[str]:
+    """Return JIRA ids associated with test item"""
+    test_keys: list[str] = []
+    marker = get_xray_marker(item)
+
+    if not marker:
+        return test_keys
+
+    if len(marker.args) == 0:
+        raise XrayError(
+            'pytest.mark.xray needs at least one argument, '
+            f'the test {item.nodeid} does not seem to be decorated in proper way.'
+        )
+    if isinstance(marker.args[0], str):
+        test_keys = list(marker.args)
+    elif isinstance(marker.args[0], list):
+        test_keys = marker.args[0]
+    else:
+        raise XrayError(f'xray marker can only accept strings or lists but got {type(marker.args[0])}')
+    return test_keys
+
+
+def get_defects(item: Item) -> list[str]:
+    """Return JIRA ids for defects associated with test item"""
+    marker = get_xray_marker(item)
+
+    if not marker:
+        return []
+
+    defects = marker.kwargs.get('defects', [])
+
+    if isinstance(defects, list):
+        return defects
+
+    raise XrayError(f'xray marker can only accept list of defects but got {type(defects)}')
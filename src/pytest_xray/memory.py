@@ -0,0 +1,102 @@
+import sys
+from typing import Any, Optional
+
+from pytest_xray.helper import TestCase
+
+# number of the heaviest Jira keys shown in the memory report
+MEMORY_TOP_KEYS: int = 10
+
+CATEGORIES: tuple[str, ...] = ('comment', 'evidences', 'defects', 'metadata')
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - not available on Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux kilobytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _test_case_sizes(test_case: TestCase) -> list[int]:
+    """Return approximate bytes held by a test case for each category."""
+    evidences = 0
+    for evidence in test_case.evidences:
+        evidences += sys.getsizeof(evidence) + sum(sys.getsizeof(value) for value in evidence.values())
+    defects = sys.getsizeof(test_case.defects) + sum(sys.getsizeof(defect) for defect in test_case.defects)
+    metadata = sys.getsizeof(test_case) + sys.getsizeof(test_case.__dict__) + sys.getsizeof(test_case.test_key)
+    comment = sys.getsizeof(test_case.comment)
+    for iteration in test_case.iterations.values():
+        comment += sys.getsizeof(iteration.log)
+        metadata += sys.getsizeof(iteration) + sys.getsizeof(iteration.name)
+        metadata += sum(sys.getsizeof(name) + sys.getsizeof(value) for name, value in iteration.parameters)
+    return [comment, evidences, defects, metadata]
+
+
+class MemoryTracker:
+    """
+    Approximate memory held by test cases of the test execution.
+
+    Sizes are updated incrementally whenever a test case changes, so the overhead stays
+    proportional to the size of the reported test case.
+    """
+
+    def __init__(self) -> None:
+        self.sizes: dict[str, list[int]] = {}  # Jira key: bytes per category
+
+    def update(self, test_case: TestCase) -> None:
+        """Account current size of a new or merged test case."""
+        self.sizes[test_case.test_key] = _test_case_sizes(test_case)
+
+    def totals(self) -> dict[str, int]:
+        """Return bytes held by each category in all test cases."""
+        totals = dict.fromkeys(CATEGORIES, 0)
+        for sizes in self.sizes.values():
+            for category, size in zip(CATEGORIES, sizes):
+                totals[category] += size
+        return totals
+
+    def top(self, count: int = MEMORY_TOP_KEYS) -> list[tuple[str, dict[str, int]]]:
+        """Return the heaviest Jira keys with bytes held by each category."""
+        heaviest = sorted(self.sizes.items(), key=lambda item: -sum(item[1]))[:count]
+        return [(test_key, dict(zip(CATEGORIES, sizes))) for test_key, sizes in heaviest]
+
+    def as_dict(self, count: int = MEMORY_TOP_KEYS) -> dict[str, Any]:
+        totals = self.totals()
+        return {
+            'keys': len(self.sizes),
+            'total_bytes': sum(totals.values()),
+            'categories': totals,
+            'top_keys': [{'key': test_key, **sizes} for test_key, sizes in self.top(count)],
+            'peak_rss_bytes': _peak_rss_bytes(),
+        }
+
+    def summary_lines(self, count: int = MEMORY_TOP_KEYS) -> list[str]:
+        """Return totals per category and the heaviest Jira keys as table lines."""
+        totals = self.totals()
+        lines = [f'{"category":<20} {"bytes":>14}']
+        for category, size in totals.items():
+            lines.append(f'{category:<20} {size:>14}')
+        lines.append(f'{"total":<20} {sum(totals.values()):>14}')
+        peak_rss = _peak_rss_bytes()
+        if peak_rss is not None:
+            lines.append(f'{"peak RSS":<20} {peak_rss:>14}')
+        lines.append('')
+        lines.append(f'{"key":<20} {"total":>14}' + ''.join(f' {category:>14}' for category in CATEGORIES))
+        for test_key, sizes in self.top(count):
+            lines.append(
+                f'{test_key:<20} {sum(sizes.values()):>14}' + ''.join(f' {size:>14}' for size in sizes.values())
+            )
+        return lines
+
+
+class NullMemoryTracker(MemoryTracker):
+    """Memory tracker which does not account anything, used when the memory report is disabled."""
+
+    def update(self, test_case: TestCase) -> None:
+        pass
+
+
+def get_memory_tracker(enabled: bool) -> MemoryTracker:
+    return MemoryTracker() if enabled else NullMemoryTracker()
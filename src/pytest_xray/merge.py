@@ -0,0 +1,211 @@
+"""
+Merge XRAY JSON reports, e.g. created by shards with ``--xraypath`` option, into a single test execution.
+
+Usage::
+
+    $ pytest-xray-merge xray-1.json xray-2.json --output xray.json
+    $ pytest-xray-merge xray-*.json --upload --cloud --client-secret-auth
+    $ pytest-xray-merge xray-*.json --upload --xray-ledger xray-ledger.jsonl
+    $ pytest-xray-merge xray.json --upload --xray-batch-size 500 --xray-checkpoint xray.json.checkpoint
+"""
+
+import argparse
+import datetime as dt
+import json
+import sys
+from collections.abc import Iterable
+from typing import Any, Optional
+
+from pytest_xray.checkpoint import UploadCheckpoint
+from pytest_xray.constant import (
+    DATETIME_FORMAT,
+    JIRA_API_KEY,
+    JIRA_CLIENT_SECRET_AUTH,
+    JIRA_CLOUD,
+    XRAY_BATCH_SIZE,
+    XRAY_CHECKPOINT,
+    XRAY_EXECUTION_ID,
+    XRAY_LEDGER,
+    XRAY_LEDGER_IGNORE,
+    XRAY_TEST_PLAN_ID,
+)
+from pytest_xray.exceptions import XrayError
+from pytest_xray.file_publisher import FilePublisher
+from pytest_xray.helper import (
+    STATUS_STR_MAPPER_CLOUD,
+    STATUS_STR_MAPPER_JIRA,
+    Status,
+    TestCase,
+    TestExecution,
+)
+from pytest_xray.ledger import PublishLedger, parse_ignored_fields
+from pytest_xray.store import parse_batch_size
+from pytest_xray.xray_publisher import get_xray_publisher
+
+# status strings which exist only in Xray cloud format
+CLOUD_ONLY_STATUSES: frozenset[str] = frozenset(STATUS_STR_MAPPER_CLOUD.values()) - frozenset(
+    STATUS_STR_MAPPER_JIRA.values()
+)
+
+
+class ReportMerger:
+    """Merges XRAY JSON reports one by one, only merged test cases are kept in memory."""
+
+    def __init__(self) -> None:
+        self.tests: dict[str, TestCase] = {}
+        self.info: dict[str, Any] = {}
+        self.test_execution_key: Optional[str] = None
+        self.start_date: Optional[dt.datetime] = None
+        self.finish_date: Optional[dt.datetime] = None
+        self.is_cloud_format: bool = False
+
+    def add(self, data: dict[str, Any]) -> None:
+        """Merge single XRAY report into already merged results."""
+        info: dict[str, Any] = data.get('info', {})
+        for name, value in info.items():
+            self.info.setdefault(name, value)
+        if self.test_execution_key is None:
+            self.test_execution_key = data.get('testExecutionKey')
+
+        if 'startDate' in info:
+            start_date = dt.datetime.strptime(info['startDate'], DATETIME_FORMAT)
+            if self.start_date is None or start_date < self.start_date:
+                self.start_date = start_date
+        if 'finishDate' in info:
+            finish_date = dt.datetime.strptime(info['finishDate'], DATETIME_FORMAT)
+            if self.finish_date is None or finish_date > self.finish_date:
+                self.finish_date = finish_date
+
+        for test in data.get('tests', []):
+            if test['status'] in CLOUD_ONLY_STATUSES:
+                self.is_cloud_format = True
+            test_case = TestCase.from_dict(test)
+            merged_test_case = self.tests.get(test_case.test_key)
+            if merged_test_case is None:
+                self.tests[test_case.test_key] = test_case
+            else:
+                merged_test_case.merge(test_case)
+
+    def add_files(self, paths: Iterable[str]) -> None:
+        """Merge XRAY reports from files, files are read one at a time."""
+        for path in paths:
+            try:
+                with open(path, encoding='UTF-8') as file:
+                    data = json.load(file)
+            except (OSError, ValueError) as exc:
+                raise XrayError(f'Cannot read Xray report "{path}": {exc}') from exc
+            self.add(data)
+
+    def get_test_execution(
+        self,
+        test_execution_key: Optional[str] = None,
+        test_plan_key: Optional[str] = None,
+        status_str_mapper: Optional[dict[Status, str]] = None,
+    ) -> TestExecution:
+        """Return merged test execution."""
+        if status_str_mapper is None:
+            status_str_mapper = STATUS_STR_MAPPER_CLOUD if self.is_cloud_format else STATUS_STR_MAPPER_JIRA
+        tests = list(self.tests.values())
+        for test in tests:
+            test.status_str_mapper = status_str_mapper
+
+        test_execution = TestExecution(
+            test_execution_key=test_execution_key or self.test_execution_key,
+            test_plan_key=test_plan_key or self.info.get('testPlanKey'),
+            revision=self.info.get('revision'),
+            tests=tests,
+            test_environments=self.info.get('testEnvironments'),
+            fix_version=self.info.get('version'),
+            summary=self.info.get('summary'),
+            description=self.info.get('description'),
+        )
+        if self.start_date is not None:
+            test_execution.start_date = self.start_date
+        if self.finish_date is not None:
+            test_execution.finish_date = self.finish_date
+        return test_execution
+
+
+def _get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='pytest-xray-merge',
+        description='Merge XRAY JSON reports into a single test execution.',
+    )
+    parser.add_argument('files', nargs='+', metavar='path', help='XRAY JSON report files to merge')
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument('-o', '--output', metavar='path', help='Create merged JSON report file at given path')
+    output.add_argument('--upload', action='store_true', help='Upload merged results to JIRA XRAY')
+    parser.add_argument(JIRA_CLOUD, action='store_true', help='Use with JIRA XRAY cloud server')
+    parser.add_argument(JIRA_API_KEY, action='store_true', help='Use Jira API Key authentication')
+    parser.add_argument(JIRA_CLIENT_SECRET_AUTH, action='store_true', help='Use client secret authentication')
+    parser.add_argument(XRAY_EXECUTION_ID, metavar='ExecutionId', help='XRAY Test Execution ID')
+    parser.add_argument(XRAY_TEST_PLAN_ID, metavar='TestplanId', help='XRAY Test Plan ID')
+    parser.add_argument(
+        XRAY_LEDGER,
+        metavar='path',
+        help='Record uploaded results in a ledger file at given path and do not upload identical results again',
+    )
+    parser.add_argument(
+        XRAY_LEDGER_IGNORE,
+        metavar='fields',
+        type=parse_ignored_fields,
+        default=[],
+        help='Comma separated fields which do not make results different for the ledger',
+    )
+    parser.add_argument(
+        XRAY_BATCH_SIZE,
+        metavar='N',
+        type=parse_batch_size,
+        help='Upload merged results in batches of at most N test keys to the same test execution',
+    )
+    parser.add_argument(
+        XRAY_CHECKPOINT,
+        metavar='path',
+        help='Record uploaded batches in a checkpoint file at given path, so a failed upload of the same results '
+        'continues with the first batch which was not uploaded',
+    )
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = _get_parser()
+    args = parser.parse_args(argv)
+    if args.xray_checkpoint and args.xray_batch_size is None:
+        parser.error(f'{XRAY_CHECKPOINT} option requires {XRAY_BATCH_SIZE} option')
+
+    merger = ReportMerger()
+    try:
+        merger.add_files(args.files)
+        test_execution = merger.get_test_execution(
+            test_execution_key=args.execution,
+            test_plan_key=args.testplan,
+            status_str_mapper=STATUS_STR_MAPPER_CLOUD if args.cloud else None,
+        )
+        if args.output:
+            publisher = FilePublisher(args.output)
+            result = publisher.publish(test_execution.as_dict())
+            print(f'Generated XRAY execution report file: {result}')
+        else:
+            xray_publisher = get_xray_publisher(
+                cloud=args.cloud,
+                client_secret_auth=args.client_secret_auth,
+                api_key_auth=args.api_key_auth,
+                ledger=PublishLedger(args.xray_ledger, args.xray_ledger_ignore) if args.xray_ledger else None,
+                checkpoint=UploadCheckpoint(args.xray_checkpoint) if args.xray_checkpoint else None,
+            )
+            if args.xray_batch_size is None:
+                result = xray_publisher.publish(test_execution.as_dict())
+            else:
+                result = xray_publisher.publish_batches(test_execution.iter_batches(args.xray_batch_size))
+            if xray_publisher.metrics.skipped and not xray_publisher.metrics.requests:
+                print(f'Results were already uploaded to JIRA XRAY. Test Execution Id: {result}')
+            else:
+                print(f'Uploaded results to JIRA XRAY. Test Execution Id: {result}')
+    except XrayError as exc:
+        print(f'Could not merge Jira XRAY results! {exc.message}', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,108 @@
+import math
+from typing import Any, Optional
+
+
+def _percentile(values: list[float], percent: float) -> Optional[float]:
+    """Return percentile of values using the nearest-rank method."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def _format_bytes(size: float) -> str:
+    for unit in ('B', 'KiB', 'MiB'):
+        if size < 1024:
+            return f'{size:.0f} {unit}' if unit == 'B' else f'{size:.1f} {unit}'
+        size /= 1024
+    return f'{size:.1f} GiB'
+
+
+class PublishMetrics:
+    """Metrics of published Xray results collected by the plugin and publishers."""
+
+    def __init__(self, estimate_compression: bool = False) -> None:
+        # compressing each payload is an extra pass over it, so it is done only when the size is consumed
+        self.estimate_compression = estimate_compression
+        self.tests: int = 0  # number of pytest tests reported with Jira keys
+        self.keys: int = 0  # number of published Jira keys
+        self.payload_bytes: int = 0
+        self.compressed_bytes: Optional[int] = None  # estimated size of gzip compressed payload
+        self.evidence_bytes: int = 0  # size of base64 encoded evidences
+        self.requests: int = 0
+        self.auth_requests: int = 0
+        self.skipped: int = 0  # number of results not published again because they were found in the ledger
+        self.latencies: list[float] = []  # duration of each request in seconds
+
+    def add_request(self, latency: float) -> None:
+        self.requests += 1
+        self.latencies.append(latency)
+
+    def merge(self, other: 'PublishMetrics') -> None:
+        """Add payload and requests of other metrics, e.g. of another publisher of the same results."""
+        self.payload_bytes += other.payload_bytes
+        if other.compressed_bytes is not None:
+            self.compressed_bytes = (self.compressed_bytes or 0) + other.compressed_bytes
+        self.requests += other.requests
+        self.auth_requests += other.auth_requests
+        self.skipped += other.skipped
+        self.latencies.extend(other.latencies)
+
+    def add_results(self, results: dict[str, Any]) -> None:
+        """Count published keys and evidences."""
+        tests = results.get('tests', [])
+        self.keys += len(tests)
+        for test in tests:
+            for evidence in test.get('evidences', []):
+                self.evidence_bytes += len(evidence.get('data', ''))
+
+    @property
+    def throughput(self) -> Optional[float]:
+        """Return uploaded bytes per second."""
+        total_latency = sum(self.latencies)
+        if not total_latency:
+            return None
+        return self.payload_bytes / total_latency
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            'tests': self.tests,
+            'keys': self.keys,
+            'payload_bytes': self.payload_bytes,
+            'compressed_bytes': self.compressed_bytes,
+            'evidence_bytes': self.evidence_bytes,
+            'requests': self.requests,
+            'auth_requests': self.auth_requests,
+            'skipped': self.skipped,
+            'latency_p50_s': _percentile(self.latencies, 50),
+            'latency_p90_s': _percentile(self.latencies, 90),
+            'latency_p99_s': _percentile(self.latencies, 99),
+            'latency_max_s': max(self.latencies, default=None),
+            'throughput_bytes_per_s': self.throughput,
+        }
+
+    def summary_line(self) -> str:
+        """Return compact one line summary of the metrics."""
+        payload = _format_bytes(self.payload_bytes)
+        if self.compressed_bytes is not None:
+            payload += f' ({_format_bytes(self.compressed_bytes)} gzip)'
+        parts = [
+            f'{self.tests} tests',
+            f'{self.keys} keys',
+            f'payload {payload}',
+            f'evidences {_format_bytes(self.evidence_bytes)}',
+        ]
+        if self.skipped:
+            parts.append(f'{self.skipped} skipped as already published')
+        if self.requests:
+            parts.append(f'{self.requests} requests')
+            parts.append(f'{self.auth_requests} auth')
+            parts.append(
+                f'latency p50 {_percentile(self.latencies, 50):.3f}s '
+                f'p90 {_percentile(self.latencies, 90):.3f}s '
+                f'max {max(self.latencies):.3f}s'
+            )
+            if self.throughput is not None:
+                parts.append(f'{_format_bytes(self.throughput)}/s')
+        return ', '.join(parts)
@@ -0,0 +1,153 @@
+"""
+Publisher of results partitioned by Jira projects of the test keys.
+
+Each project gets its own test execution, test executions of all projects are published concurrently.
+"""
+
+import argparse
+import functools
+import queue
+import re
+from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from pytest_xray.exceptions import XrayError
+from pytest_xray.fanout import _DONE, FanOutPublisher, PublishTarget, _iter_queue, _put
+from pytest_xray.metrics import PublishMetrics
+from pytest_xray.profiler import Profiler
+from pytest_xray.tracing import Tracer
+from pytest_xray.xray_publisher import EncodedTests, XrayPublisher
+
+# maximal number of projects published concurrently, each project takes a thread for the whole upload
+MAX_PROJECTS: int = 64
+
+# Jira project keys start with a letter followed by letters, digits or underscores
+PROJECT_KEY: re.Pattern = re.compile(r'[A-Za-z][A-Za-z0-9_]*')
+
+
+def get_project(test_key: str) -> str:
+    """Return Jira project of a test key, e.g. ``ABC`` of ``ABC-123``."""
+    return test_key.rsplit('-', 1)[0]
+
+
+def parse_project_keys(value: str) -> tuple[str, Optional[str], Optional[str]]:
+    """
+    Parse Jira project with its test execution and test plan keys, e.g. ``ABC=ABC-10:ABC-20``.
+
+    Either key may be left empty, e.g. ``ABC=:ABC-20`` creates a new test execution in test plan ``ABC-20``.
+    """
+    project, separator, keys = value.partition('=')
+    project = project.strip()
+    if not separator or not PROJECT_KEY.fullmatch(project):
+        raise argparse.ArgumentTypeError(f'expected PROJECT=EXECUTION[:TESTPLAN] but got "{value}"')
+    test_execution_key, _, test_plan_key = keys.partition(':')
+    return project, test_execution_key.strip() or None, test_plan_key.strip() or None
+
+
+def partition_tests(tests: Iterable[dict[str, Any]]) -> dict[str, list[dict[str, Any]]]:
+    """Return tests grouped by Jira projects of their keys in the order of their first occurrence."""
+    partitions: dict[str, list[dict[str, Any]]] = {}
+    for test in tests:
+        partitions.setdefault(get_project(test['testKey']), []).append(test)
+    return partitions
+
+
+class ProjectPublisher(FanOutPublisher):
+    """
+    Publishes tests of each Jira project to its own test execution concurrently.
+
+    Targets are created for projects found in the results, so ``targets`` holds only the projects
+    of the last published results.
+
+    :param get_publisher: function returning a new publisher, each project uses its own connection
+    :param keys: test execution and test plan keys of projects, other projects get a new test execution
+    """
+
+    def __init__(
+        self,
+        get_publisher: Callable[[], XrayPublisher],
+        keys: Optional[dict[str, tuple[Optional[str], Optional[str]]]] = None,
+        profiler: Optional[Profiler] = None,
+        metrics: Optional[PublishMetrics] = None,
+        tracer: Optional[Tracer] = None,
+    ) -> None:
+        super().__init__([], profiler, metrics, tracer)
+        self.get_publisher = get_publisher
+        self.keys = keys or {}
+        self._publishers: list[XrayPublisher] = []  # warmed up publishers not used by any project yet
+
+    def warm_up(self) -> None:
+        """Connect and authenticate a publisher which is used by the first published project."""
+        publisher = self.get_publisher()
+        publisher.warm_up()
+        self._publishers.append(publisher)
+
+    def _target(self, project: str) -> PublishTarget:
+        publisher = self._publishers.pop() if self._publishers else self.get_publisher()
+        test_execution_key, test_plan_key = self.keys.get(project, (None, None))
+        return PublishTarget(f'project {project}', publisher, test_execution_key, test_plan_key)
+
+    def publish(self, data: dict[str, Any]) -> str:
+        """
+        Publish tests of each project to its test execution and return their issue ids or raise XrayError.
+
+        :param data: results to publish
+        :return: comma separated issue ids of the projects
+        """
+        partitions = partition_tests(data['tests'])
+        if not partitions:
+            raise XrayError('No results to publish')
+        if len(partitions) > MAX_PROJECTS:
+            raise XrayError(f'Could not publish results of {len(partitions)} projects, at most {MAX_PROJECTS} allowed')
+        self.targets = [self._target(project) for project in partitions]
+        calls: list[Callable[[], str]] = [
+            functools.partial(self._publish, target, {**data, 'tests': EncodedTests(tests)})
+            for target, tests in zip(self.targets, partitions.values())
+        ]
+        return self._run(calls)
+
+    def publish_batches(
+        self,
+        batches: Iterable[dict[str, Any]],
+        on_published: Optional[Callable[[dict[str, Any], str], None]] = None,
+    ) -> str:
+        """
+        Publish results split into batches to test executions of their projects or raise XrayError.
+
+        A project starts publishing with the first batch containing its tests, batches without
+        tests of a project are not passed to it.
+
+        :param batches: results with parts of tests
+        :param on_published: function called with each batch of a project and its issue id after it was published
+        :return: comma separated issue ids of the projects
+        """
+        callback = None if on_published is None else functools.partial(self._published, on_published)
+        targets: dict[str, PublishTarget] = {}
+        queues: dict[str, queue.Queue] = {}
+        futures: dict[str, Future] = {}
+        span = self.tracer.span('publish to targets')
+        with span, ThreadPoolExecutor(max_workers=MAX_PROJECTS, thread_name_prefix='xray-publish') as executor:
+            try:
+                for data in batches:
+                    for project, tests in partition_tests(data['tests']).items():
+                        if project not in targets:
+                            if len(targets) == MAX_PROJECTS:
+                                raise XrayError(f'Could not publish results of more than {MAX_PROJECTS} projects')
+                            targets[project] = self._target(project)
+                            queues[project] = queue.Queue(maxsize=1)
+                            call = functools.partial(
+                                targets[project].publisher.publish_batches, _iter_queue(queues[project]), callback
+                            )
+                            futures[project] = executor.submit(self._run_target, targets[project], call, span)
+                        batch = targets[project].results({**data, 'tests': EncodedTests(tests)})
+                        _put(queues[project], batch, futures[project])
+            finally:
+                # every project waits for further batches until all batches were partitioned
+                for project, batch_queue in queues.items():
+                    _put(batch_queue, _DONE, futures[project])
+                self.targets = list(targets.values())
+            span.set_attribute('xray.targets', len(self.targets))
+        if not futures:
+            raise XrayError('No results to publish')
+        return self._collect(list(futures.values()))
@@ -1,28 +1,71 @@
-from typing import Union
+import functools
+import itertools
+from typing import Optional
 
+import pytest
 from _pytest.config import Config
 from _pytest.config.argparsing import Parser
-from requests.auth import AuthBase
 
 from pytest_xray import hooks
+from pytest_xray.captures import parse_capture_limit, parse_capture_statuses
 from pytest_xray.constant import (
     JIRA_API_KEY,
     JIRA_CLIENT_SECRET_AUTH,
     JIRA_CLOUD,
     JIRA_XRAY_FLAG,
-    TEST_EXECUTION_ENDPOINT,
-    TEST_EXECUTION_ENDPOINT_CLOUD,
     XRAY_ADD_CAPTURES,
     XRAY_ALLOW_DUPLICATE_IDS,
+    XRAY_ARCHIVE,
+    XRAY_BASELINE,
+    XRAY_BATCH_SIZE,
+    XRAY_CACHE_KEYS,
+    XRAY_CAPTURES_EVIDENCE,
+    XRAY_CAPTURES_FOR,
+    XRAY_CAPTURES_LIMIT,
+    XRAY_DEDUPE_FAILURES,
     XRAY_EXECUTION_ID,
+    XRAY_ITERATIONS,
+    XRAY_KEYS,
+    XRAY_KEYS_FILE,
+    XRAY_LAST_FAILED,
+    XRAY_LEDGER,
+    XRAY_LEDGER_IGNORE,
+    XRAY_MEMORY,
+    XRAY_MEMORY_JSON,
+    XRAY_ORDER,
+    XRAY_PER_PROJECT,
     XRAY_PLUGIN,
+    XRAY_PROFILE,
+    XRAY_PROFILE_JSON,
+    XRAY_PROJECT,
+    XRAY_SAVE_BASELINE,
+    XRAY_SELECTION_PLUGIN,
+    XRAY_SHARD,
+    XRAY_SLOW_COMMENT,
+    XRAY_SLOW_THRESHOLD,
+    XRAY_STORE,
     XRAY_TEST_PLAN_ID,
+    XRAY_TRACE,
+    XRAY_VALIDATE_KEYS,
+    XRAY_VALIDATE_KEYS_TTL,
+    XRAY_WARM_UP,
+    XRAY_WARM_UP_ABORT,
     XRAYPATH,
 )
+from pytest_xray.exceptions import XrayError
+from pytest_xray.fanout import get_fan_out_publisher
 from pytest_xray.file_publisher import FilePublisher
-from pytest_xray.helper import get_api_key_auth, get_basic_auth, get_bearer_auth
+from pytest_xray.ledger import PublishLedger, parse_ignored_fields
+from pytest_xray.metrics import PublishMetrics
+from pytest_xray.partition import ProjectPublisher, parse_project_keys
+from pytest_xray.profiler import get_profiler
+from pytest_xray.regression import parse_threshold
+from pytest_xray.selection import ORDER_FAILED_FIRST, ORDER_FAST_FIRST, XraySelectionPlugin, parse_shard
+from pytest_xray.store import parse_batch_size
+from pytest_xray.tracing import get_tracer
+from pytest_xray.validation import KEYS_CACHE_TTL, KeyValidator, get_key_validator, parse_cache_ttl
 from pytest_xray.xray_plugin import XrayPlugin
-from pytest_xray.xray_publisher import ApiKeyAuth, ClientSecretAuth, XrayPublisher
+from pytest_xray.xray_publisher import get_xray_publisher
 
 
 def pytest_addoption(parser: Parser):
@@ -42,9 +85,19 @@ def pytest_addoption(parser: Parser):
         help='Use client secret authentication',
     )
     xray.addoption(
-        XRAY_EXECUTION_ID, action='store', metavar='ExecutionId', default=None, help='XRAY Test Execution ID'
+        XRAY_EXECUTION_ID,
+        action='append',
+        metavar='ExecutionId',
+        default=None,
+        help='XRAY Test Execution ID (can be used multiple times to publish results to several test executions)',
+    )
+    xray.addoption(
+        XRAY_TEST_PLAN_ID,
+        action='append',
+        metavar='TestplanId',
+        default=None,
+        help='XRAY Test Plan ID (can be used multiple times, paired with test execution IDs in the same order)',
     )
-    xray.addoption(XRAY_TEST_PLAN_ID, action='store', metavar='TestplanId', default=None, help='XRAY Test Plan ID')
     xray.addoption(
         XRAYPATH,
         action='store',
@@ -52,6 +105,44 @@ def pytest_addoption(parser: Parser):
         default=None,
         help='Do not upload to a server but create JSON report file at given path',
     )
+    xray.addoption(
+        XRAY_ARCHIVE,
+        action='store',
+        metavar='path',
+        default=None,
+        help='Store results also in a JSON report file at given path',
+    )
+    xray.addoption(
+        XRAY_PER_PROJECT,
+        action='store_true',
+        default=False,
+        help='Upload results of each Jira project to its own test execution, projects are uploaded concurrently',
+    )
+    xray.addoption(
+        XRAY_PROJECT,
+        action='append',
+        metavar='PROJECT=EXECUTION[:TESTPLAN]',
+        type=parse_project_keys,
+        default=None,
+        help='Upload results of Jira project to given test execution or test plan (implies --xray-per-project, '
+        'can be used multiple times)',
+    )
+    xray.addoption(
+        XRAY_LEDGER,
+        action='store',
+        metavar='path',
+        default=None,
+        help='Record uploaded results in a ledger file at given path and do not upload identical results again',
+    )
+    xray.addoption(
+        XRAY_LEDGER_IGNORE,
+        action='store',
+        metavar='fields',
+        type=parse_ignored_fields,
+        default=None,
+        help='Comma separated fields which do not make results different for the ledger, e.g. '
+        'info.startDate,info.finishDate,tests.start,tests.finish',
+    )
     xray.addoption(
         XRAY_ALLOW_DUPLICATE_IDS,
         action='store_true',
@@ -64,6 +155,178 @@ def pytest_addoption(parser: Parser):
         default=False,
         help='Add captures from log, stdout or/and stderr, to the report comment field',
     )
+    xray.addoption(
+        XRAY_CAPTURES_FOR,
+        action='store',
+        metavar='STATUS,...',
+        type=parse_capture_statuses,
+        default=None,
+        help='Add captures only to tests with given comma separated statuses, e.g. FAIL,ABORTED (default: all)',
+    )
+    xray.addoption(
+        XRAY_CAPTURES_LIMIT,
+        action='store',
+        metavar='N',
+        type=parse_capture_limit,
+        default=None,
+        help='Keep only the last N characters of each captured stream',
+    )
+    xray.addoption(
+        XRAY_CAPTURES_EVIDENCE,
+        action='store_true',
+        default=False,
+        help='Add captures as a gzip compressed text evidence instead of the report comment field',
+    )
+    xray.addoption(
+        XRAY_KEYS,
+        action='append',
+        metavar='KEY,...',
+        default=None,
+        help='Run only tests marked with given comma separated Jira XRAY test keys (can be used multiple times)',
+    )
+    xray.addoption(
+        XRAY_KEYS_FILE,
+        action='append',
+        metavar='path',
+        default=None,
+        help='Run only tests marked with Jira XRAY test keys listed in a text file or in a XRAY JSON report',
+    )
+    xray.addoption(
+        XRAY_LAST_FAILED,
+        action='store_true',
+        default=False,
+        help='Rerun only tests marked with Jira XRAY test keys which failed at the last run',
+    )
+    xray.addoption(
+        XRAY_SHARD,
+        action='store',
+        metavar='i/n',
+        type=parse_shard,
+        default=None,
+        help='Run only i-th of n shards, tests marked with the same Jira XRAY test key are kept in one shard',
+    )
+    xray.addoption(
+        XRAY_ORDER,
+        action='store',
+        choices=[ORDER_FAILED_FIRST, ORDER_FAST_FIRST],
+        default=None,
+        help='Reorder tests using statuses and durations of Jira XRAY test keys from previous runs',
+    )
+    xray.addoption(
+        XRAY_PROFILE,
+        action='store_true',
+        default=False,
+        help='Show time spent in the plugin hooks and publish phases',
+    )
+    xray.addoption(
+        XRAY_PROFILE_JSON,
+        action='store',
+        metavar='path',
+        default=None,
+        help='Store time spent in the plugin hooks and publish phases in a JSON file at given path',
+    )
+    xray.addoption(
+        XRAY_MEMORY,
+        action='store_true',
+        default=False,
+        help='Show memory held by comments, evidences and defects of Jira XRAY test keys',
+    )
+    xray.addoption(
+        XRAY_MEMORY_JSON,
+        action='store',
+        metavar='path',
+        default=None,
+        help='Store memory held by comments, evidences and defects of Jira XRAY test keys in a JSON file at given path',
+    )
+    xray.addoption(
+        XRAY_TRACE,
+        action='store',
+        metavar='path',
+        default=None,
+        help='Store trace of the plugin and publish phases as OpenTelemetry spans in a JSONL file at given path',
+    )
+    xray.addoption(
+        XRAY_SLOW_THRESHOLD,
+        action='store',
+        metavar='ratio',
+        type=parse_threshold,
+        default=None,
+        help='Report Jira XRAY test keys slower than their baseline duration by given ratio, e.g. 1.5',
+    )
+    xray.addoption(
+        XRAY_BASELINE,
+        action='store',
+        metavar='path',
+        default=None,
+        help='Read baseline durations of Jira XRAY test keys from a file instead of durations of previous runs',
+    )
+    xray.addoption(
+        XRAY_SAVE_BASELINE,
+        action='store',
+        metavar='path',
+        default=None,
+        help='Store durations of Jira XRAY test keys in a baseline file',
+    )
+    xray.addoption(
+        XRAY_SLOW_COMMENT,
+        action='store_true',
+        default=False,
+        help='Add a note about duration regression to comments of slow Jira XRAY test keys',
+    )
+    xray.addoption(
+        XRAY_STORE,
+        action='store',
+        metavar='path',
+        default=None,
+        help='Keep results in a SQLite database file at given path instead of memory',
+    )
+    xray.addoption(
+        XRAY_BATCH_SIZE,
+        action='store',
+        metavar='N',
+        type=parse_batch_size,
+        default=None,
+        help='Upload results in batches of at most N Jira XRAY test keys to the same test execution',
+    )
+    xray.addoption(
+        XRAY_WARM_UP,
+        action='store_true',
+        default=False,
+        help='Connect and authenticate to Jira XRAY in background at session start to report errors early',
+    )
+    xray.addoption(
+        XRAY_WARM_UP_ABORT,
+        action='store_true',
+        default=False,
+        help='Connect and authenticate to Jira XRAY at session start and abort the session if it fails',
+    )
+    xray.addoption(
+        XRAY_ITERATIONS,
+        action='store_true',
+        default=False,
+        help='Report parametrized tests as iterations of Jira XRAY test with parameters and short log',
+    )
+    xray.addoption(
+        XRAY_DEDUPE_FAILURES,
+        action='store_true',
+        default=False,
+        help='Keep full traceback only for the first occurrence of the same failure, refer to it from other tests',
+    )
+    xray.addoption(
+        XRAY_VALIDATE_KEYS,
+        action='store_true',
+        default=False,
+        help='Check in background that Jira issues of collected Jira XRAY test keys exist, results of missing ones '
+        'are not uploaded',
+    )
+    xray.addoption(
+        XRAY_VALIDATE_KEYS_TTL,
+        action='store',
+        metavar='seconds',
+        type=parse_cache_ttl,
+        default=KEYS_CACHE_TTL,
+        help='Do not check again Jira XRAY test keys found within given number of seconds (default: %(default)s)',
+    )
 
 
 def pytest_addhooks(pluginmanager):
@@ -72,6 +335,14 @@ def pytest_addhooks(pluginmanager):
 
 def pytest_configure(config: Config) -> None:
     config.addinivalue_line('markers', 'xray(JIRA_ID): mark test with JIRA XRAY test case ID')
+
+    if XraySelectionPlugin.is_requested(config):
+        try:
+            selection = XraySelectionPlugin(config)
+        except XrayError as exc:
+            raise pytest.UsageError(exc.message) from exc
+        config.pluginmanager.register(plugin=selection, name=XRAY_SELECTION_PLUGIN)
+
     if config.option.collectonly:
         return
 
@@ -79,30 +350,90 @@ def pytest_configure(config: Config) -> None:
         return
 
     xray_path = config.getoption(XRAYPATH)
+    profiler = get_profiler(config.getoption(XRAY_PROFILE) or config.getoption(XRAY_PROFILE_JSON) is not None)
+    metrics = PublishMetrics()
+    # only the controller process writes the trace file when running on xdist
+    tracer = get_tracer(None if hasattr(config, 'workerinput') else config.getoption(XRAY_TRACE))
 
-    if xray_path:
-        publisher = FilePublisher(xray_path)  # type: ignore
+    # the i-th test execution is paired with the i-th test plan, each pair is published separately
+    keys = list(
+        itertools.zip_longest(
+            config.getoption(XRAY_EXECUTION_ID) or [None], config.getoption(XRAY_TEST_PLAN_ID) or [None]
+        )
+    )
+    archive = config.getoption(XRAY_ARCHIVE)
+    if xray_path and len(keys) > 1:
+        raise pytest.UsageError(
+            f'{XRAYPATH} option stores results of a single test execution, use {XRAY_ARCHIVE} option with a server'
+        )
+
+    ledger_path = config.getoption(XRAY_LEDGER)
+    ledger = PublishLedger(ledger_path, config.getoption(XRAY_LEDGER_IGNORE) or []) if ledger_path else None
+
+    project_keys = config.getoption(XRAY_PROJECT) or []
+    per_project = config.getoption(XRAY_PER_PROJECT) or bool(project_keys)
+    if per_project and (xray_path or archive or keys != [(None, None)]):
+        raise pytest.UsageError(
+            f'{XRAY_PER_PROJECT} option cannot be combined with {XRAY_EXECUTION_ID}, {XRAY_TEST_PLAN_ID}, {XRAYPATH} '
+            f'or {XRAY_ARCHIVE} options, use {XRAY_PROJECT} option to choose test executions of projects'
+        )
+
+    if per_project:
+        publisher = ProjectPublisher(  # type: ignore
+            functools.partial(
+                get_xray_publisher,
+                cloud=config.getoption(JIRA_CLOUD),
+                client_secret_auth=config.getoption(JIRA_CLIENT_SECRET_AUTH),
+                api_key_auth=config.getoption(JIRA_API_KEY),
+                profiler=profiler,
+                tracer=tracer,
+                ledger=ledger,
+            ),
+            {
+                project: (test_execution_key, test_plan_key)
+                for project, test_execution_key, test_plan_key in project_keys
+            },
+            profiler=profiler,
+            metrics=metrics,
+            tracer=tracer,
+        )
+    elif len(keys) > 1 or archive:
+        publisher = get_fan_out_publisher(  # type: ignore
+            keys,
+            xray_path=xray_path,
+            archive=archive,
+            cloud=config.getoption(JIRA_CLOUD),
+            client_secret_auth=config.getoption(JIRA_CLIENT_SECRET_AUTH),
+            api_key_auth=config.getoption(JIRA_API_KEY),
+            profiler=profiler,
+            metrics=metrics,
+            tracer=tracer,
+            ledger=ledger,
+        )
+    elif xray_path:
+        publisher = FilePublisher(xray_path, profiler, metrics, tracer)  # type: ignore
     else:
+        publisher = get_xray_publisher(  # type: ignore
+            cloud=config.getoption(JIRA_CLOUD),
+            client_secret_auth=config.getoption(JIRA_CLIENT_SECRET_AUTH),
+            api_key_auth=config.getoption(JIRA_API_KEY),
+            profiler=profiler,
+            metrics=metrics,
+            tracer=tracer,
+            ledger=ledger,
+        )
+
+    key_validator: Optional[KeyValidator] = None
+    # only the controller process validates keys when running on xdist
+    if config.getoption(XRAY_VALIDATE_KEYS) and not xray_path and not hasattr(config, 'workerinput'):
         if config.getoption(JIRA_CLOUD):
-            endpoint = TEST_EXECUTION_ENDPOINT_CLOUD
-        else:
-            endpoint = TEST_EXECUTION_ENDPOINT
-
-        if config.getoption(JIRA_CLIENT_SECRET_AUTH):
-            options = get_bearer_auth()
-            auth: Union[AuthBase, tuple[str, str]] = ClientSecretAuth(
-                options['BASE_URL'], options['CLIENT_ID'], options['CLIENT_SECRET'], options['VERIFY']
-            )
-        elif config.getoption(JIRA_API_KEY):
-            options = get_api_key_auth()
-            auth = ApiKeyAuth(options['API_KEY'])
-        else:
-            options = get_basic_auth()
-            auth = (options['USER'], options['PASSWORD'])
-
-        publisher = XrayPublisher(  # type: ignore
-            base_url=options['BASE_URL'], endpoint=endpoint, auth=auth, verify=options['VERIFY']
+            raise pytest.UsageError(f'{XRAY_VALIDATE_KEYS} option is not supported with Jira XRAY cloud')
+        cache = getattr(config, 'cache', None)
+        key_validator = get_key_validator(
+            api_key_auth=config.getoption(JIRA_API_KEY),
+            cached=cache.get(XRAY_CACHE_KEYS, {}) if cache is not None else None,
+            ttl=config.getoption(XRAY_VALIDATE_KEYS_TTL),
         )
 
-    plugin = XrayPlugin(config, publisher)
+    plugin = XrayPlugin(config, publisher, profiler, metrics, tracer, key_validator)
     config.pluginmanager.register(plugin=plugin, name=XRAY_PLUGIN)
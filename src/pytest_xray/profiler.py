@@ -0,0 +1,85 @@
+import threading
+import time
+from typing import Any
+
+
+class _Measure:
+    """Context manager adding elapsed wall time of its block to a profiler phase."""
+
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler: 'Profiler', name: str) -> None:
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *args: Any) -> None:
+        self.profiler.add(self.name, time.perf_counter() - self.start)
+
+
+class _NoMeasure:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, *args: Any) -> None:
+        pass
+
+
+_NO_MEASURE = _NoMeasure()
+
+
+class Profiler:
+    """Collects cumulative wall time and number of calls of the plugin phases measured by any thread."""
+
+    def __init__(self) -> None:
+        self.phases: dict[str, list[float]] = {}  # phase name: [total time, number of calls]
+        self._lock = threading.Lock()
+
+    def measure(self, name: str) -> Any:
+        """Return context manager measuring wall time of a phase."""
+        return _Measure(self, name)
+
+    def add(self, name: str, elapsed: float) -> None:
+        with self._lock:
+            phase = self.phases.get(name)
+            if phase is None:
+                self.phases[name] = [elapsed, 1]
+            else:
+                phase[0] += elapsed
+                phase[1] += 1
+
+    def as_dict(self) -> dict[str, dict[str, Any]]:
+        """Return phases with total time in seconds and number of calls."""
+        with self._lock:
+            phases = [(name, total, calls) for name, (total, calls) in self.phases.items()]
+        return {
+            name: {'calls': int(calls), 'total_s': round(total, 6), 'mean_us': round(total / calls * 1e6, 3)}
+            for name, total, calls in phases
+        }
+
+    def summary_lines(self) -> list[str]:
+        """Return phases as table lines, the slowest phases first."""
+        lines = [f'{"phase":<40} {"calls":>10} {"total [s]":>12} {"mean [us]":>12}']
+        phases = sorted(self.as_dict().items(), key=lambda phase: -phase[1]['total_s'])
+        for name, phase in phases:
+            lines.append(f'{name:<40} {phase["calls"]:>10} {phase["total_s"]:>12.6f} {phase["mean_us"]:>12.3f}')
+        return lines
+
+
+class NullProfiler(Profiler):
+    """Profiler which does not measure anything, used when profiling is disabled."""
+
+    def measure(self, name: str) -> Any:
+        return _NO_MEASURE
+
+    def add(self, name: str, elapsed: float) -> None:
+        pass
+
+
+def get_profiler(enabled: bool) -> Profiler:
+    return Profiler() if enabled else NullProfiler()
@@ -0,0 +1,91 @@
+import argparse
+import json
+from pathlib import Path
+from typing import Optional
+
+from pytest_xray.exceptions import XrayError
+from pytest_xray.history import XrayHistory
+
+# regressions smaller than this number of seconds are ignored as noise of short tests
+MIN_REGRESSION_SECONDS: float = 0.1
+
+
+class Regression:
+    """Duration of a Jira key which exceeded its baseline duration."""
+
+    def __init__(self, test_key: str, duration: float, baseline: float) -> None:
+        self.test_key = test_key
+        self.duration = duration
+        self.baseline = baseline
+
+    @property
+    def ratio(self) -> float:
+        return self.duration / self.baseline
+
+    def __str__(self) -> str:
+        return f'{self.duration:.2f}s, baseline {self.baseline:.2f}s ({self.ratio:.2f}x)'
+
+
+def parse_threshold(value: str) -> float:
+    """Parse threshold given as ratio of duration to baseline duration, e.g. 1.5 for 50% slower tests."""
+    try:
+        threshold = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'threshold must be a number but got "{value}"') from None
+    if threshold <= 1:
+        raise argparse.ArgumentTypeError(f'threshold must be greater than 1 but got {value}')
+    return threshold
+
+
+def read_baseline(path: str) -> dict[str, float]:
+    """Read durations of Jira keys from a baseline file or raise XrayError."""
+    try:
+        data = json.loads(Path(path).read_text(encoding='UTF-8'))
+    except OSError as exc:
+        raise XrayError(f'Cannot read Xray baseline file "{path}": {exc}') from exc
+    except ValueError as exc:
+        raise XrayError(f'Cannot parse Xray baseline file "{path}": {exc}') from exc
+    if not isinstance(data, dict) or not all(isinstance(duration, (int, float)) for duration in data.values()):
+        raise XrayError(f'Cannot parse Xray baseline file "{path}": expected durations of Jira keys')
+    return data
+
+
+def write_baseline(path: str, durations: dict[str, float]) -> None:
+    """Store durations of Jira keys in a baseline file or raise XrayError."""
+    file_path = Path(path)
+    data = {test_key: round(duration, 6) for test_key, duration in sorted(durations.items())}
+    try:
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text(json.dumps(data, indent=2), encoding='UTF-8')
+    except OSError as exc:
+        raise XrayError(f'Cannot write Xray baseline file "{path}": {exc}') from exc
+
+
+def find_regressions(
+    durations: dict[str, float],
+    threshold: float,
+    baseline: Optional[dict[str, float]] = None,
+    history: Optional[XrayHistory] = None,
+) -> list[Regression]:
+    """
+    Return Jira keys which are slower than their baseline more than the threshold, the largest regressions first.
+
+    :param durations: durations of Jira keys in the current run
+    :param threshold: ratio of duration to baseline duration
+    :param baseline: baseline durations of Jira keys, if not given the mean duration from history is used
+    :param history: history of previous runs
+    :return: list of regressions
+    """
+    regressions = []
+    for test_key, duration in durations.items():
+        if baseline is not None:
+            baseline_duration = baseline.get(test_key)
+        elif history is not None:
+            baseline_duration = history.duration(test_key)
+        else:
+            baseline_duration = None
+        if not baseline_duration or duration - baseline_duration < MIN_REGRESSION_SECONDS:
+            continue
+        if duration > baseline_duration * threshold:
+            regressions.append(Regression(test_key, duration, baseline_duration))
+    return sorted(regressions, key=lambda regression: -regression.ratio)
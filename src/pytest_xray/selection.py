@@ -0,0 +1,263 @@
+import argparse
+import heapq
+import json
+import re
+from pathlib import Path
+from typing import Optional
+
+import pytest
+from _pytest.config import Config
+from _pytest.nodes import Item
+
+from pytest_xray.constant import (
+    XRAY_CACHE_LAST_FAILED,
+    XRAY_KEYS,
+    XRAY_KEYS_FILE,
+    XRAY_LAST_FAILED,
+    XRAY_ORDER,
+    XRAY_SHARD,
+    XRAYPATH,
+)
+from pytest_xray.exceptions import XrayError
+from pytest_xray.helper import FAILED_STATUSES, status_from_str
+from pytest_xray.history import XrayHistory
+from pytest_xray.marker import get_test_keys
+
+KEYS_SPLIT_PATTERN = re.compile(r'[\s,]+')
+ORDER_FAILED_FIRST = 'failed-first'
+ORDER_FAST_FIRST = 'fast-first'
+
+
+def parse_keys(value: str) -> set[str]:
+    """Return set of Jira keys from comma or whitespace separated string."""
+    return {key for key in KEYS_SPLIT_PATTERN.split(value) if key}
+
+
+def read_keys_file(path: str) -> set[str]:
+    """
+    Read Jira keys from a file.
+
+    The file can be an Xray JSON report (e.g. created with ``--xraypath``) or a plain text
+    file with keys separated by commas or white spaces. Lines starting with ``#`` are ignored.
+
+    :param path: path to the file
+    :return: set of Jira keys
+    """
+    try:
+        content = Path(path).read_text(encoding='UTF-8')
+    except OSError as exc:
+        raise XrayError(f'Cannot read Xray keys file "{path}": {exc}') from exc
+
+    if content.lstrip().startswith(('{', '[')):
+        try:
+            data = json.loads(content)
+        except ValueError as exc:
+            raise XrayError(f'Cannot parse Xray keys file "{path}": {exc}') from exc
+        if isinstance(data, dict):
+            return {test['testKey'] for test in data.get('tests', [])}
+        return set(data)
+
+    keys: set[str] = set()
+    for line in content.splitlines():
+        if line.lstrip().startswith('#'):
+            continue
+        keys.update(parse_keys(line))
+    return keys
+
+
+def get_selected_keys(config: Config) -> Optional[set[str]]:
+    """Return Jira keys selected from command line or None if selection is not requested."""
+    keys_options: Optional[list[str]] = config.getoption(XRAY_KEYS)
+    keys_files: Optional[list[str]] = config.getoption(XRAY_KEYS_FILE)
+    if keys_options is None and keys_files is None:
+        return None
+
+    selected_keys: set[str] = set()
+    for value in keys_options or []:
+        selected_keys.update(parse_keys(value))
+    for path in keys_files or []:
+        selected_keys.update(read_keys_file(path))
+    return selected_keys
+
+
+def read_failed_keys(path: str) -> set[str]:
+    """Return Jira keys of failed tests from a XRAY JSON report."""
+    try:
+        with open(path, encoding='UTF-8') as file:
+            data = json.load(file)
+    except (OSError, ValueError) as exc:
+        raise XrayError(f'Cannot read Xray report "{path}": {exc}') from exc
+    return {test['testKey'] for test in data.get('tests', []) if status_from_str(test['status']) in FAILED_STATUSES}
+
+
+def get_last_failed_keys(config: Config) -> set[str]:
+    """
+    Return Jira keys which failed in the last run.
+
+    Keys are read from pytest cache, if it is not available then from
+    previous XRAY JSON report given by ``--xraypath`` option.
+    """
+    cache = getattr(config, 'cache', None)
+    if cache is not None:
+        last_failed: Optional[dict[str, str]] = cache.get(XRAY_CACHE_LAST_FAILED, None)
+        if last_failed is not None:
+            return set(last_failed)
+
+    xray_path = config.getoption(XRAYPATH)
+    if xray_path and Path(xray_path).exists():
+        return read_failed_keys(xray_path)
+    return set()
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    """Parse shard given in ``i/n`` format, where shards are numbered from 1."""
+    try:
+        index, count = (int(number) for number in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'shard must be given in i/n format but got "{value}"') from None
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f'shard index must be between 1 and {count} but got {index}')
+    return index, count
+
+
+def split_into_shards(items: list[Item], count: int) -> list[int]:
+    """
+    Assign items to shards and return shard index (starting from 0) for each item.
+
+    Items sharing at least one Jira key are grouped together, so each shard contains
+    complete results for its keys. Items without keys are single item groups.
+    The groups are assigned to the least loaded shard starting from the largest one,
+    which is deterministic as long as all shards collect the same items.
+
+    :param items: collected items
+    :param count: number of shards
+    :return: list of shard indexes in the order of items
+    """
+    parent: dict[str, str] = {}
+
+    def find(name: str) -> str:
+        while parent[name] != name:
+            parent[name] = parent[parent[name]]
+            name = parent[name]
+        return name
+
+    item_names: list[str] = []
+    for item in items:
+        test_keys = get_test_keys(item)
+        names = [f'key:{test_key}' for test_key in test_keys] if test_keys else [f'nodeid:{item.nodeid}']
+        for name in names:
+            parent.setdefault(name, name)
+        root = find(names[0])
+        for name in names[1:]:
+            other_root = find(name)
+            if other_root != root:
+                # keep the smallest name as a root, it identifies the group regardless of items order
+                root, other_root = min(root, other_root), max(root, other_root)
+                parent[other_root] = root
+        item_names.append(names[0])
+
+    item_groups = [find(name) for name in item_names]
+    weights: dict[str, int] = {}
+    for group in item_groups:
+        weights[group] = weights.get(group, 0) + 1
+
+    shards_load: list[tuple[int, int]] = [(0, index) for index in range(count)]
+    group_shards: dict[str, int] = {}
+    for group in sorted(weights, key=lambda name: (-weights[name], name)):
+        load, index = heapq.heappop(shards_load)
+        group_shards[group] = index
+        heapq.heappush(shards_load, (load + weights[group], index))
+
+    return [group_shards[group] for group in item_groups]
+
+
+class XraySelectionPlugin:
+    """Selects collected tests by Jira Xray test keys."""
+
+    def __init__(self, config: Config) -> None:
+        self.config = config
+        self.selected_keys: Optional[set[str]] = get_selected_keys(config)
+        self.last_failed_keys: Optional[set[str]] = None
+        if config.getoption(XRAY_LAST_FAILED):
+            self.last_failed_keys = get_last_failed_keys(config)
+            # the same as pytest --lf, run all tests if nothing failed previously
+            if self.last_failed_keys:
+                if self.selected_keys is None:
+                    self.selected_keys = self.last_failed_keys
+                else:
+                    self.selected_keys &= self.last_failed_keys
+        self.shard: Optional[tuple[int, int]] = config.getoption(XRAY_SHARD)
+        self.order: Optional[str] = config.getoption(XRAY_ORDER)
+        self.report_lines: list[str] = []
+        self.history: Optional[XrayHistory] = None  # history loaded to reorder tests, reused by the xray plugin
+
+    @staticmethod
+    def is_requested(config: Config) -> bool:
+        """Return True if any of selection options is used."""
+        options = (XRAY_KEYS, XRAY_KEYS_FILE, XRAY_LAST_FAILED, XRAY_SHARD, XRAY_ORDER)
+        return any(config.getoption(option) for option in options)
+
+    def _is_selected(self, item: Item) -> bool:
+        assert self.selected_keys is not None
+        return any(test_key in self.selected_keys for test_key in get_test_keys(item))
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_collection_modifyitems(self, config: Config, items: list[Item]) -> None:
+        selected: list[Item] = items
+        deselected: list[Item] = []
+
+        if self.selected_keys is not None:
+            selected = []
+            for item in items:
+                if self._is_selected(item):
+                    selected.append(item)
+                else:
+                    deselected.append(item)
+
+        if self.last_failed_keys is not None:
+            if self.last_failed_keys:
+                self.report_lines.append(
+                    f'xray: rerun {len(self.last_failed_keys)} previously failed Jira XRAY test keys'
+                )
+            else:
+                self.report_lines.append('xray: no previously failed Jira XRAY test keys, not deselecting items.')
+
+        if self.shard is not None:
+            index, count = self.shard
+            shard_items = selected
+            selected = []
+            for item, shard_index in zip(shard_items, split_into_shards(shard_items, count)):
+                if shard_index == index - 1:
+                    selected.append(item)
+                else:
+                    deselected.append(item)
+            self.report_lines.append(
+                f'xray: shard {index}/{count}, running {len(selected)} of {len(shard_items)} items'
+            )
+
+        if self.order is not None:
+            selected = self._reorder(selected)
+
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+        items[:] = selected
+
+    def _reorder(self, items: list[Item]) -> list[Item]:
+        """Return items sorted by history of their Jira keys, the order of equally ranked items is kept."""
+        history = self.history = XrayHistory.load(self.config)
+        if self.order == ORDER_FAILED_FIRST:
+
+            def rank(item: Item) -> float:
+                return -max((history.failure_score(test_key) for test_key in get_test_keys(item)), default=0.0)
+
+        else:
+
+            def rank(item: Item) -> float:
+                # tests without known duration are run first
+                durations = (history.duration(test_key) for test_key in get_test_keys(item))
+                return max((duration for duration in durations if duration is not None), default=0.0)
+
+        return sorted(items, key=rank)
+
+    def pytest_report_collectionfinish(self) -> list[str]:
+        return self.report_lines
@@ -0,0 +1,147 @@
+"""
+Test execution storing test cases in a SQLite database file instead of memory.
+
+It is used for large test sessions, where keeping all comments and evidences in memory until
+the end of the session is not acceptable. Test cases are written to the database when they are
+added or updated and read back one batch at a time when the results are published.
+"""
+
+import argparse
+import json
+import sqlite3
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any, Optional
+
+from pytest_xray.exceptions import XrayError
+from pytest_xray.helper import STATUS_STR_MAPPER_JIRA, Status, TestCase, TestExecution
+
+# number of written test cases after which the transaction is committed
+COMMIT_INTERVAL: int = 1000
+
+# schema of the table of stored test cases
+TESTS_TABLE: str = 'CREATE TABLE tests (position INTEGER PRIMARY KEY AUTOINCREMENT, test_key TEXT UNIQUE, data TEXT)'
+
+
+def parse_batch_size(value: str) -> int:
+    """Parse number of tests uploaded in a single request."""
+    try:
+        size = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'batch size must be an integer but got "{value}"') from None
+    if size < 1:
+        raise argparse.ArgumentTypeError(f'batch size must be greater than 0 but got {size}')
+    return size
+
+
+def _is_store(path: Path) -> bool:
+    """Return True if the file is a SQLite database with the table of stored test cases only."""
+    try:
+        with open(path, 'rb') as file:
+            if file.read(16) != b'SQLite format 3\x00':
+                return False
+        connection = sqlite3.connect(f'{path.absolute().as_uri()}?mode=ro', uri=True)
+        try:
+            tables = connection.execute(
+                "SELECT name, sql FROM sqlite_master WHERE type = 'table' AND name != 'sqlite_sequence'"
+            ).fetchall()
+        finally:
+            connection.close()
+    except (OSError, sqlite3.Error):
+        return False
+    return tables == [('tests', TESTS_TABLE)]
+
+
+class SQLiteTestExecution(TestExecution):
+    """
+    Test execution keeping test cases in a SQLite database file.
+
+    Test cases returned by ``find_test_case`` and ``iter_tests`` are copies, their changes
+    have to be stored with ``update``. The database file is recreated when the execution is created,
+    an existing file is replaced only if it is a store of an earlier session.
+
+    :param path: path to the database file
+    :param status_str_mapper: status mapper of stored test cases
+    """
+
+    def __init__(
+        self, path: str, *args: Any, status_str_mapper: Optional[dict[Status, str]] = None, **kwargs: Any
+    ) -> None:
+        self.path = Path(path)
+        self.status_str_mapper = status_str_mapper or STATUS_STR_MAPPER_JIRA
+        self._lock = threading.Lock()
+        self._writes = 0
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if self.path.exists():
+                if not _is_store(self.path):
+                    raise XrayError(f'Cannot create Xray store "{self.path}": file exists and it is not an Xray store')
+                for suffix in ('', '-wal', '-shm'):
+                    Path(f'{self.path}{suffix}').unlink(missing_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            # readers do not block writers in WAL mode, so test cases can be updated while iterating
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute(TESTS_TABLE)
+        except (OSError, sqlite3.Error) as exc:
+            raise XrayError(f'Cannot create Xray store "{self.path}": {exc}') from exc
+        super().__init__(*args, **kwargs)
+
+    @property  # type: ignore[override]
+    def tests(self) -> list[TestCase]:
+        return list(self.iter_tests())
+
+    @tests.setter
+    def tests(self, tests: list[TestCase]) -> None:
+        with self._lock:
+            self._connection.execute('DELETE FROM tests')
+        for test in tests:
+            self.append(test)
+
+    def _write(self, test: TestCase, replace: bool) -> None:
+        data = json.dumps(test.as_dict())
+        with self._lock:
+            if replace:
+                self._connection.execute(
+                    'INSERT INTO tests (test_key, data) VALUES (?, ?) '
+                    'ON CONFLICT (test_key) DO UPDATE SET data = excluded.data',
+                    (test.test_key, data),
+                )
+            else:
+                self._connection.execute(
+                    'INSERT OR IGNORE INTO tests (test_key, data) VALUES (?, ?)', (test.test_key, data)
+                )
+            self._writes += 1
+            if self._writes % COMMIT_INTERVAL == 0:
+                self._connection.commit()
+
+    def append(self, test: Any) -> None:
+        if not isinstance(test, TestCase):
+            test = TestCase(**test)
+        self._write(test, replace=False)
+
+    def update(self, test: TestCase) -> None:
+        self._write(test, replace=True)
+
+    def find_test_case(self, test_key: str) -> TestCase:
+        with self._lock:
+            row = self._connection.execute('SELECT data FROM tests WHERE test_key = ?', (test_key,)).fetchone()
+        if row is None:
+            raise KeyError(test_key)
+        return TestCase.from_dict(json.loads(row[0]), self.status_str_mapper)
+
+    def iter_tests(self) -> Iterator[TestCase]:
+        with self._lock:
+            self._connection.commit()
+        # separate connection reads rows lazily from a snapshot of the database
+        connection = sqlite3.connect(self.path)
+        try:
+            for (data,) in connection.execute('SELECT data FROM tests ORDER BY position'):
+                yield TestCase.from_dict(json.loads(data), self.status_str_mapper)
+        finally:
+            connection.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.commit()
+            self._connection.close()
@@ -0,0 +1,310 @@
+"""
+In-process Jira Xray stand-in for testing, benchmarking and fault injection.
+
+It implements the Xray server and cloud import execution endpoints, the cloud authentication
+endpoint and the Jira issue search by keys. Latency, throughput, request size limits and error
+responses can be configured, and all received requests are recorded.
+
+The ``xray_server`` fixture can be enabled in ``conftest.py``::
+
+    pytest_plugins = ['pytest_xray.testing']
+"""
+
+import gzip
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+from urllib.parse import parse_qs
+
+import pytest
+
+from pytest_xray.constant import (
+    AUTHENTICATE_ENDPOINT,
+    ENV_XRAY_API_BASE_URL,
+    ENV_XRAY_API_KEY,
+    ENV_XRAY_API_PASSWORD,
+    ENV_XRAY_API_USER,
+    ENV_XRAY_CLIENT_ID,
+    ENV_XRAY_CLIENT_SECRET,
+    SEARCH_ENDPOINT,
+    TEST_EXECUTION_ENDPOINT,
+    TEST_EXECUTION_ENDPOINT_CLOUD,
+)
+
+# size of chunks in which request body is read when throughput is limited
+READ_CHUNK_SIZE: int = 64 * 1024
+
+# keys of the JQL query searching issues by keys, e.g. key in ("ABC-1", "ABC-2")
+JQL_KEYS: re.Pattern = re.compile(r'key\s+in\s*\(([^)]*)\)', re.IGNORECASE)
+
+
+class RecordedRequest:
+    """Request received by the Xray stand-in."""
+
+    def __init__(
+        self, method: str, path: str, headers: dict[str, str], body: bytes, status: int, query: str = ''
+    ) -> None:
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+        self.status = status  # status code of the response
+        self.time = time.monotonic()
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+
+class _Fault:
+    def __init__(self, status: int, retry_after: Optional[float]) -> None:
+        self.status = status
+        self.retry_after = retry_after
+
+
+class _XrayRequestHandler(BaseHTTPRequestHandler):
+    server: '_XrayHTTPServer'
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self) -> None:
+        self.server.xray.handle(self)
+
+    def do_GET(self) -> None:
+        self.server.xray.handle(self)
+
+    def do_HEAD(self) -> None:
+        self.server.xray.handle(self)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class _XrayHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], xray: 'XrayServer') -> None:
+        super().__init__(address, _XrayRequestHandler)
+        self.xray = xray
+
+
+class XrayServer:
+    """
+    Jira Xray stand-in running in a background thread.
+
+    :param host: host to listen on
+    :param port: port to listen on, by default a free port is used
+    :param latency: delay in seconds before each response is sent
+    :param throughput: maximal number of request body bytes read per second
+    :param max_request_size: maximal size of request body in bytes, larger requests get 413 response
+    :param error_rate: probability of responding with one of ``error_statuses`` to import requests
+    :param error_statuses: status codes used with ``error_rate``
+    :param seed: seed of random generator used with ``error_rate``
+    :param token: token returned by the authentication endpoint
+    :param key_prefix: Jira project of created test executions
+    :param issues: keys of Jira issues found by the search endpoint, by default every key is found
+    :param max_search_results: maximal number of issues in a page of search results, by default as requested
+    """
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        latency: float = 0.0,
+        throughput: Optional[float] = None,
+        max_request_size: Optional[int] = None,
+        error_rate: float = 0.0,
+        error_statuses: tuple[int, ...] = (429, 500, 502, 503, 504),
+        seed: Optional[int] = None,
+        token: str = 'dummy_token',
+        key_prefix: str = 'XRAY',
+        issues: Optional[set[str]] = None,
+        max_search_results: Optional[int] = None,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.throughput = throughput
+        self.max_request_size = max_request_size
+        self.error_rate = error_rate
+        self.error_statuses = error_statuses
+        self.token = token
+        self.key_prefix = key_prefix
+        self.issues = issues
+        self.max_search_results = max_search_results
+        self.requests: list[RecordedRequest] = []
+        self._random = random.Random(seed)
+        self._faults: deque[_Fault] = deque()
+        self._lock = threading.Lock()
+        self._executions = 0
+        self._server: Optional[_XrayHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Return base URL of the running server."""
+        if self._server is None:
+            raise RuntimeError('Xray server is not running')
+        return f'http://{self.host}:{self._server.server_port}'
+
+    def start(self) -> 'XrayServer':
+        self._server = _XrayHTTPServer((self.host, self.port), self)
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={'poll_interval': 0.05}, name='xray-server', daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> 'XrayServer':
+        return self.start()
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+    def fail_next(self, status: int, times: int = 1, retry_after: Optional[float] = None) -> None:
+        """Respond with given status code to the next import requests."""
+        with self._lock:
+            self._faults.extend(_Fault(status, retry_after) for _ in range(times))
+
+    def import_requests(self) -> list[RecordedRequest]:
+        """Return recorded requests to the import execution endpoints."""
+        endpoints = (TEST_EXECUTION_ENDPOINT, TEST_EXECUTION_ENDPOINT_CLOUD)
+        return [request for request in self.requests if request.path in endpoints]
+
+    def search_requests(self) -> list[RecordedRequest]:
+        """Return recorded requests to the Jira search endpoint."""
+        return [request for request in self.requests if request.path == SEARCH_ENDPOINT]
+
+    def _read_body(self, handler: _XrayRequestHandler, length: int) -> bytes:
+        if not self.throughput:
+            return handler.rfile.read(length)
+        chunks = []
+        remaining = length
+        start = time.monotonic()
+        while remaining > 0:
+            chunk = handler.rfile.read(min(READ_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            chunks.append(chunk)
+            remaining -= len(chunk)
+            delay = (length - remaining) / self.throughput - (time.monotonic() - start)
+            if delay > 0:
+                time.sleep(delay)
+        return b''.join(chunks)
+
+    def _next_fault(self) -> Optional[_Fault]:
+        with self._lock:
+            if self._faults:
+                return self._faults.popleft()
+            if self.error_rate and self._random.random() < self.error_rate:
+                return _Fault(self._random.choice(self.error_statuses), None)
+        return None
+
+    def _new_execution_key(self) -> str:
+        with self._lock:
+            self._executions += 1
+            return f'{self.key_prefix}-{self._executions}'
+
+    def handle(self, handler: _XrayRequestHandler) -> None:
+        path, _, query = handler.path.partition('?')
+        length = int(handler.headers.get('Content-Length', 0))
+        headers: dict[str, str] = {}
+
+        body = self._read_body(handler, length)
+        if self.max_request_size is not None and length > self.max_request_size:
+            status, response = 413, {'error': f'Request body exceeds {self.max_request_size} bytes'}
+        else:
+            if handler.headers.get('Content-Encoding') == 'gzip':
+                body = gzip.decompress(body)
+            status, response, headers = self._respond(handler.command, path, query, body)
+
+        with self._lock:
+            self.requests.append(RecordedRequest(handler.command, path, dict(handler.headers), body, status, query))
+
+        if self.latency:
+            time.sleep(self.latency)
+        data = json.dumps(response).encode('utf-8')
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(data)))
+        for name, value in headers.items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        if handler.command != 'HEAD':
+            handler.wfile.write(data)
+
+    def _respond(self, method: str, path: str, query: str, body: bytes) -> tuple[int, Any, dict[str, str]]:
+        if method == 'HEAD':
+            return 200, None, {}
+
+        if method == 'GET' and path == SEARCH_ENDPOINT:
+            return self._search(query)
+
+        if method == 'POST' and path == AUTHENTICATE_ENDPOINT:
+            return 200, self.token, {}
+
+        if method != 'POST' or path not in (TEST_EXECUTION_ENDPOINT, TEST_EXECUTION_ENDPOINT_CLOUD):
+            return 404, {'error': f'Not Found: {method} {path}'}, {}
+
+        fault = self._next_fault()
+        if fault is not None:
+            headers = {'Retry-After': str(fault.retry_after)} if fault.retry_after is not None else {}
+            return fault.status, {'error': f'Injected error {fault.status}'}, headers
+
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return 400, {'error': 'Request body is not a valid JSON'}, {}
+
+        key = data.get('testExecutionKey') or self._new_execution_key()
+        issue = {'id': str(10000 + self._executions), 'key': key, 'self': f'{self.url}/rest/api/2/issue/{key}'}
+        if path == TEST_EXECUTION_ENDPOINT_CLOUD:
+            return 200, issue, {}
+        return 200, {'testExecIssue': issue}, {}
+
+    def _search(self, query: str) -> tuple[int, Any, dict[str, str]]:
+        params = parse_qs(query)
+        match = JQL_KEYS.search(params.get('jql', [''])[0])
+        if match is None:
+            return 400, {'errorMessages': ['Only searching issues by keys is supported']}, {}
+        keys = [key.strip().strip('"') for key in match.group(1).split(',') if key.strip()]
+        found = [key for key in keys if self.issues is None or key in self.issues]
+        warnings = [f"An issue with key '{key}' does not exist for field 'key'." for key in keys if key not in found]
+        start_at = int(params.get('startAt', ['0'])[0])
+        max_results = int(params.get('maxResults', ['50'])[0])
+        if self.max_search_results is not None:
+            max_results = min(max_results, self.max_search_results)
+        issues = [{'id': str(index), 'key': key} for index, key in enumerate(found, 20000)]
+        response = {
+            'startAt': start_at,
+            'maxResults': max_results,
+            'total': len(found),
+            'issues': issues[start_at : start_at + max_results],
+        }
+        if warnings:
+            response['warningMessages'] = warnings
+        return 200, response, {}
+
+
+@pytest.fixture
+def xray_server(monkeypatch: pytest.MonkeyPatch) -> Iterator[XrayServer]:
+    """Run Xray stand-in and point the plugin environment variables to it."""
+    with XrayServer() as server:
+        monkeypatch.setenv(ENV_XRAY_API_BASE_URL, server.url)
+        monkeypatch.setenv(ENV_XRAY_API_USER, 'jirauser')
+        monkeypatch.setenv(ENV_XRAY_API_PASSWORD, 'jirapassword')
+        monkeypatch.setenv(ENV_XRAY_CLIENT_ID, 'client_id')
+        monkeypatch.setenv(ENV_XRAY_CLIENT_SECRET, 'client_secret')
+        monkeypatch.setenv(ENV_XRAY_API_KEY, 'api_key')
+        yield server
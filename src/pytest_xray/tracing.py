@@ -0,0 +1,216 @@
+"""
+Trace of the plugin phases exported as OpenTelemetry spans.
+
+Each line of the trace file is an OTLP/JSON ``ExportTraceServiceRequest`` with a single span,
+as read by the ``otlpjsonfile`` receiver of the OpenTelemetry collector.
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import IO, Any, Optional
+
+SERVICE_NAME: str = 'pytest'
+SCOPE_NAME: str = 'pytest_xray'
+
+# OTLP span kinds and status codes
+SPAN_KIND_INTERNAL: int = 1
+SPAN_KIND_CLIENT: int = 3
+STATUS_CODE_ERROR: int = 2
+
+
+def _attribute_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def _attributes(attributes: dict[str, Any]) -> list[dict[str, Any]]:
+    return [{'key': key, 'value': _attribute_value(value)} for key, value in attributes.items()]
+
+
+class Span:
+    """Span of a traced phase, can be used as a context manager or ended explicitly."""
+
+    __slots__ = ('tracer', 'name', 'kind', 'attributes', 'span_id', 'parent_id', 'start_ns', 'error')
+
+    def __init__(self, tracer: 'Tracer', name: str, kind: int, attributes: dict[str, Any]) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+        self.span_id = os.urandom(8).hex()
+        self.parent_id: Optional[str] = None
+        self.start_ns = 0
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def start(self) -> 'Span':
+        self.tracer._start(self)
+        return self
+
+    def end(self) -> None:
+        self.tracer._end(self, time.time_ns())
+
+    def __enter__(self) -> 'Span':
+        return self.start()
+
+    def __exit__(self, exc_type: Any, exc: Optional[BaseException], *args: Any) -> None:
+        if exc is not None:
+            self.error = f'{exc_type.__name__}: {exc}'
+        self.end()
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def start(self) -> '_NoSpan':
+        return self
+
+    def end(self) -> None:
+        pass
+
+    def __enter__(self) -> '_NoSpan':
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+class Tracer:
+    """
+    Writes spans of the plugin phases to a JSONL file in OTLP/JSON format.
+
+    Spans may be started from several threads, each thread has its own stack of started spans.
+    Spans of a thread without started spans are children of the innermost span of the thread
+    which created the tracer, unless the thread attached its parent span.
+
+    :param path: path of the trace file, it is overwritten when the first span ends
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = Path(path)
+        self.trace_id = os.urandom(16).hex()
+        self._main_thread = threading.get_ident()
+        self._stacks: dict[int, list[Span]] = {}  # started spans of each thread
+        self._parents: dict[int, Span] = {}  # parents of spans of threads which attached them
+        self._file: Optional[IO[str]] = None
+        self._closed = False  # spans ended by background threads after the trace was closed are dropped
+        self._lock = threading.Lock()
+
+    def span(self, name: str, kind: int = SPAN_KIND_INTERNAL, attributes: Optional[dict[str, Any]] = None) -> Any:
+        """Return a new span, it is started when entered as a context manager or by its ``start`` method."""
+        return Span(self, name, kind, attributes or {})
+
+    def _get_stack(self) -> list[Span]:
+        return self._stacks.setdefault(threading.get_ident(), [])
+
+    def _start(self, span: Span) -> None:
+        with self._lock:
+            stack = self._get_stack()
+            if stack:
+                parent: Optional[Span] = stack[-1]
+            else:
+                main_stack = self._stacks.get(self._main_thread)
+                parent = self._parents.get(threading.get_ident(), main_stack[-1] if main_stack else None)
+            span.parent_id = parent.span_id if parent is not None else None
+            span.start_ns = time.time_ns()
+            stack.append(span)
+
+    def _end(self, span: Span, end_ns: int) -> None:
+        with self._lock:
+            stack = self._get_stack()
+            if span in stack:
+                stack.remove(span)
+            self._write(span, end_ns)
+
+    @contextlib.contextmanager
+    def attach(self, span: Any) -> Iterator[None]:
+        """Make a span started by another thread the parent of spans started by the current thread."""
+        thread = threading.get_ident()
+        with self._lock:
+            self._parents[thread] = span
+        try:
+            yield
+        finally:
+            with self._lock:
+                del self._parents[thread]
+
+    def _write(self, span: Span, end_ns: int) -> None:
+        """Write ended span to the trace file, it has to be called with the lock held."""
+        if self._closed:
+            return
+        record: dict[str, Any] = {
+            'traceId': self.trace_id,
+            'spanId': span.span_id,
+            'name': span.name,
+            'kind': span.kind,
+            'startTimeUnixNano': str(span.start_ns),
+            'endTimeUnixNano': str(end_ns),
+            'attributes': _attributes(span.attributes),
+            'status': {'code': STATUS_CODE_ERROR, 'message': span.error} if span.error else {},
+        }
+        if span.parent_id is not None:
+            record['parentSpanId'] = span.parent_id
+        request = {
+            'resourceSpans': [
+                {
+                    'resource': {'attributes': _attributes({'service.name': SERVICE_NAME})},
+                    'scopeSpans': [{'scope': {'name': SCOPE_NAME}, 'spans': [record]}],
+                }
+            ]
+        }
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, 'w', encoding='UTF-8')  # noqa: SIM115
+        self._file.write(json.dumps(request) + '\n')
+        self._file.flush()
+
+    def close(self) -> None:
+        """End spans which were not ended and close the trace file."""
+        end_ns = time.time_ns()
+        with self._lock:
+            for stack in self._stacks.values():
+                while stack:
+                    self._write(stack.pop(), end_ns)
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._closed = True
+
+
+class NullTracer(Tracer):
+    """Tracer which does not record anything, used when tracing is disabled."""
+
+    def __init__(self) -> None:
+        pass
+
+    def span(self, name: str, kind: int = SPAN_KIND_INTERNAL, attributes: Optional[dict[str, Any]] = None) -> Any:
+        return _NO_SPAN
+
+    @contextlib.contextmanager
+    def attach(self, span: Any) -> Iterator[None]:
+        yield
+
+    def close(self) -> None:
+        pass
+
+
+def get_tracer(path: Optional[str]) -> Tracer:
+    return Tracer(path) if path else NullTracer()
@@ -0,0 +1,212 @@
+"""
+Pre-flight validation of Jira XRAY test keys with ``--xray-validate-keys`` option.
+
+Keys are searched in Jira in a background thread while the tests run, so mistyped keys are
+found before the results are published. Keys of existing issues are cached with a TTL.
+"""
+
+import argparse
+import logging
+import queue
+import threading
+import time
+from collections.abc import Iterable
+from typing import Any, Optional, Union
+
+import requests
+
+from pytest_xray.constant import SEARCH_ENDPOINT
+from pytest_xray.exceptions import XrayError
+from pytest_xray.helper import get_api_key_auth, get_basic_auth
+from pytest_xray.xray_publisher import ApiKeyAuth, AuthType
+
+_logger = logging.getLogger(__name__)
+
+# number of keys searched by a single JQL query, keeps URLs of the requests short
+VALIDATION_CHUNK_SIZE: int = 100
+
+# seconds for which existing keys are not searched again
+KEYS_CACHE_TTL: float = 24 * 60 * 60.0
+
+# timeout in seconds of each search request
+VALIDATION_TIMEOUT: float = 30.0
+
+_DONE = object()  # marks the end of submitted keys
+
+
+def parse_cache_ttl(value: str) -> float:
+    """Parse number of seconds for which existing keys are cached, 0 disables the cache."""
+    try:
+        ttl = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'cache TTL must be a number of seconds but got "{value}"') from None
+    if ttl < 0:
+        raise argparse.ArgumentTypeError(f'cache TTL must not be negative but got {value}')
+    return ttl
+
+
+class KeyValidator:
+    """
+    Searches Jira issues of submitted test keys in a background thread.
+
+    Keys are searched in chunks of ``VALIDATION_CHUNK_SIZE``, keys submitted while a chunk is
+    searched are joined into the next one.
+
+    :param base_url: URL of the Jira server
+    :param auth: authentication of the search requests
+    :param verify: verify SSL certificate of the server or path to a CA bundle
+    :param cached: keys of existing issues with times of their last check
+    :param ttl: seconds for which cached keys are not searched again
+    :param session: session used for the search requests
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        auth: AuthType,
+        verify: Union[bool, str] = True,
+        cached: Optional[dict[str, float]] = None,
+        ttl: float = KEYS_CACHE_TTL,
+        session: Optional[requests.Session] = None,
+    ) -> None:
+        self.base_url = base_url.rstrip('/')
+        self.auth = auth
+        self.verify = verify
+        self.ttl = ttl
+        self.session = session or requests.Session()
+        now = time.time()
+        # keys of existing issues with times of their last check
+        self.existing: dict[str, float] = {
+            key: checked for key, checked in (cached or {}).items() if now - checked < ttl
+        }
+        self.invalid: set[str] = set()  # keys without Jira issue
+        self.error: Optional[XrayError] = None  # keeps an exception if raised by a search
+        self.searches: int = 0  # number of search requests
+        self._submitted: set[str] = set(self.existing)
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, keys: Iterable[str]) -> None:
+        """Search keys which were not submitted or cached yet in the background."""
+        with self._lock:
+            new = [key for key in keys if key not in self._submitted]
+            if not new:
+                return
+            self._submitted.update(new)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='xray-validate-keys', daemon=True)
+                self._thread.start()
+        for key in new:
+            self._queue.put(key)
+
+    def close(self) -> None:
+        """Wait until all submitted keys were searched."""
+        with self._lock:
+            thread = self._thread
+        if thread is not None:
+            self._queue.put(_DONE)
+            thread.join()
+
+    def get_invalid(self) -> set[str]:
+        """Return keys found so far without Jira issue."""
+        with self._lock:
+            return set(self.invalid)
+
+    def _run(self) -> None:
+        done = False
+        while not done:
+            chunk = [self._queue.get()]
+            while len(chunk) < VALIDATION_CHUNK_SIZE and not self._queue.empty():
+                chunk.append(self._queue.get_nowait())
+            if _DONE in chunk:
+                chunk.remove(_DONE)
+                done = True
+            if chunk and self.error is None:
+                try:
+                    found = self.search(chunk)
+                except XrayError as exc:
+                    self.error = exc
+                    continue
+                now = time.time()
+                with self._lock:
+                    self.existing.update((key, now) for key in found)
+                    self.invalid.update(key for key in chunk if key not in found)
+
+    def search(self, keys: list[str]) -> set[str]:
+        """
+        Return those of given keys which have a Jira issue or raise XrayError.
+
+        Pages of the search results are requested until all found issues are read, the server
+        may return fewer issues per page than requested.
+        """
+        url = self.base_url + SEARCH_ENDPOINT
+        params = {
+            'jql': f'key in ({", ".join(_quote_jql(key) for key in keys)})',
+            'fields': 'key',
+            'maxResults': str(len(keys)),
+            'validateQuery': 'warn',  # keys without issue are reported as warnings instead of an error
+        }
+        found: set[str] = set()
+        read = 0
+        while True:
+            data = self._get(url, {**params, 'startAt': str(read)})
+            issues = data.get('issues', [])
+            found.update(issue['key'] for issue in issues)
+            read += len(issues)
+            total = data.get('total', read)
+            if read >= total:
+                return found
+            if not issues:
+                # keys not read would be reported as invalid and their results would not be uploaded
+                raise XrayError(f'Incomplete results of JIRA search at {url}: {read} of {total} issues read')
+
+    def _get(self, url: str, params: dict[str, str]) -> dict[str, Any]:
+        self.searches += 1
+        try:
+            response = self.session.get(
+                url,
+                params=params,
+                headers={'Accept': 'application/json'},
+                auth=self.auth,
+                verify=self.verify,
+                timeout=VALIDATION_TIMEOUT,
+            )
+            response.raise_for_status()
+        except requests.exceptions.HTTPError as exc:
+            err_message = (
+                f'HTTPError: Could not search JIRA service at {url}. Response status code: {exc.response.status_code}'
+            )
+            _logger.exception(err_message)
+            raise XrayError(err_message) from exc
+        except requests.exceptions.RequestException as exc:
+            err_message = f'ConnectionError: cannot connect to JIRA service at {url}'
+            _logger.exception(err_message)
+            raise XrayError(err_message) from exc
+        return response.json()
+
+
+def _quote_jql(value: str) -> str:
+    """Return value as JQL string, so a malformed key does not break the query of other keys."""
+    escaped = value.replace('\\', '\\\\').replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+def get_key_validator(
+    api_key_auth: bool = False, cached: Optional[dict[str, float]] = None, ttl: float = KEYS_CACHE_TTL
+) -> KeyValidator:
+    """
+    Return validator of test keys configured from environment variables or raise XrayError.
+
+    :param api_key_auth: use API key authentication, basic authentication is used by default
+    :param cached: keys of existing issues with times of their last check
+    :param ttl: seconds for which cached keys are not searched again
+    :return: key validator
+    """
+    if api_key_auth:
+        options = get_api_key_auth()
+        auth: AuthType = ApiKeyAuth(options['API_KEY'])
+    else:
+        options = get_basic_auth()
+        auth = (options['USER'], options['PASSWORD'])
+    return KeyValidator(options['BASE_URL'], auth, options['VERIFY'], cached, ttl)
@@ -1,56 +1,177 @@
 import datetime as dt
+import functools
+import json
 import os
-import re
+import threading
+import time
+from collections.abc import Iterator
 from pathlib import Path
-from typing import Optional, Union
+from typing import Any, Optional, Union
 
 import pytest
 from _pytest.config import Config, ExitCode
-from _pytest.mark import Mark
 from _pytest.nodes import Item
 from _pytest.reports import TestReport
 from _pytest.terminal import TerminalReporter
 
+from pytest_xray.captures import get_captures, get_captures_evidence
 from pytest_xray.constant import (
     JIRA_CLOUD,
     XRAY_ADD_CAPTURES,
     XRAY_ALLOW_DUPLICATE_IDS,
+    XRAY_BASELINE,
+    XRAY_BATCH_SIZE,
+    XRAY_CACHE_KEYS,
+    XRAY_CACHE_LAST_FAILED,
+    XRAY_CAPTURES_EVIDENCE,
+    XRAY_CAPTURES_FOR,
+    XRAY_CAPTURES_LIMIT,
+    XRAY_DEDUPE_FAILURES,
     XRAY_EXECUTION_ID,
-    XRAY_MARKER_NAME,
+    XRAY_ITERATIONS,
+    XRAY_MEMORY,
+    XRAY_MEMORY_JSON,
+    XRAY_PROFILE,
+    XRAY_PROFILE_JSON,
+    XRAY_SAVE_BASELINE,
+    XRAY_SELECTION_PLUGIN,
+    XRAY_SLOW_COMMENT,
+    XRAY_SLOW_THRESHOLD,
+    XRAY_STORE,
     XRAY_TEST_PLAN_ID,
+    XRAY_WARM_UP,
+    XRAY_WARM_UP_ABORT,
     XRAYPATH,
 )
 from pytest_xray.exceptions import XrayError
+from pytest_xray.fanout import FanOutPublisher
+from pytest_xray.fingerprint import get_failure_fingerprint
 from pytest_xray.helper import (
+    FAILED_STATUSES,
     STATUS_STR_MAPPER_CLOUD,
     STATUS_STR_MAPPER_JIRA,
+    Iteration,
     Status,
     TestCase,
     TestExecution,
 )
+from pytest_xray.history import XrayHistory
+from pytest_xray.marker import get_defects, get_test_keys
+from pytest_xray.memory import MemoryTracker, get_memory_tracker
+from pytest_xray.metrics import PublishMetrics
+from pytest_xray.profiler import NullProfiler, Profiler
+from pytest_xray.regression import Regression, find_regressions, read_baseline, write_baseline
+from pytest_xray.store import SQLiteTestExecution
+from pytest_xray.tracing import NullTracer, Tracer
+from pytest_xray.validation import KeyValidator
+
+# number of locks guarding results of Jira keys reported from several threads
+KEY_LOCKS: int = 64
+
+# maximal length of a log of an iteration
+ITERATION_LOG_LIMIT: int = 1000
+
+
+def _get_short_log(report: TestReport) -> str:
+    """Return only the error message of a failed or skipped test."""
+    longrepr = report.longrepr
+    if longrepr is None:
+        return ''
+    if isinstance(longrepr, tuple):  # skipped test: path, line number and reason
+        return str(longrepr[2])
+    crash = getattr(longrepr, 'reprcrash', None)
+    message = crash.message if crash is not None else report.longreprtext.strip().rsplit('\n', 1)[-1]
+    if len(message) > ITERATION_LOG_LIMIT:
+        return message[: ITERATION_LOG_LIMIT - 3] + '...'
+    return message
 
 
 class XrayPlugin:
     """Collects results from pytest and exports to Jira Xray server."""
 
-    def __init__(self, config, publisher):
+    def __init__(
+        self,
+        config,
+        publisher,
+        profiler: Optional[Profiler] = None,
+        metrics: Optional[PublishMetrics] = None,
+        tracer: Optional[Tracer] = None,
+        key_validator: Optional[KeyValidator] = None,
+    ):
         self.config = config
         self.publisher = publisher
-        self.test_execution_id: str = self.config.getoption(XRAY_EXECUTION_ID)
-        self.test_plan_id: str = self.config.getoption(XRAY_TEST_PLAN_ID)
+        self.profiler: Profiler = profiler or NullProfiler()
+        self.metrics: PublishMetrics = metrics or PublishMetrics()
+        self.tracer: Tracer = tracer or NullTracer()
+        self.session_span = self.tracer.span('pytest session')
+        # results are built for the first test execution and test plan, other ones are set by the fan-out publisher
+        self.test_execution_id: Optional[str] = (self.config.getoption(XRAY_EXECUTION_ID) or [None])[0]
+        self.test_plan_id: Optional[str] = (self.config.getoption(XRAY_TEST_PLAN_ID) or [None])[0]
         self.is_cloud_server: str = self.config.getoption(JIRA_CLOUD)
         self.allow_duplicate_ids: bool = self.config.getoption(XRAY_ALLOW_DUPLICATE_IDS)
         logfile = self.config.getoption(XRAYPATH)
         self.add_captures: bool = self.config.getoption(XRAY_ADD_CAPTURES)
+        self.capture_statuses: Optional[set[Status]] = self.config.getoption(XRAY_CAPTURES_FOR)
+        self.capture_limit: Optional[int] = self.config.getoption(XRAY_CAPTURES_LIMIT)
+        self.captures_evidence: bool = self.config.getoption(XRAY_CAPTURES_EVIDENCE)
+        self.iterations: bool = self.config.getoption(XRAY_ITERATIONS)
+        self.dedupe_failures: bool = self.config.getoption(XRAY_DEDUPE_FAILURES)
+        # first occurrence of each failure fingerprint: Jira key and pytest node id
+        self.failures: dict[str, tuple[str, str]] = {}
         self.logfile: Optional[str] = self._get_normalize_logfile(logfile) if logfile else None
         self.issue_id: Union[str, None] = None  # issue id returned by XRAY server
         self.exception: Union[Exception, None] = None  # keeps an exception if raised by XrayPublisher
-        self.test_execution: TestExecution = TestExecution(
-            test_execution_key=self.test_execution_id, test_plan_key=self.test_plan_id
-        )
         self.status_str_mapper: dict[Status, str] = STATUS_STR_MAPPER_JIRA
         if self.is_cloud_server:
             self.status_str_mapper = STATUS_STR_MAPPER_CLOUD
+        self.batch_size: Optional[int] = self.config.getoption(XRAY_BATCH_SIZE)
+        store: Optional[str] = self.config.getoption(XRAY_STORE)
+        self.test_execution: TestExecution
+        if store and not hasattr(self.config, 'workerinput'):
+            try:
+                self.test_execution = SQLiteTestExecution(
+                    store,
+                    test_execution_key=self.test_execution_id,
+                    test_plan_key=self.test_plan_id,
+                    status_str_mapper=self.status_str_mapper,
+                )
+            except XrayError as exc:
+                raise pytest.UsageError(exc.message) from exc
+        else:
+            self.test_execution = TestExecution(
+                test_execution_key=self.test_execution_id, test_plan_key=self.test_plan_id
+            )
+        self.durations: dict[str, float] = {}  # total duration of all test phases per Jira key
+        self.timings: dict[str, list[float]] = {}  # start and finish timestamps of all test phases per Jira key
+        # offset of the monotonic clock from the wall clock, so timings are not affected by clock adjustments
+        self.clock_offset: float = time.time() - time.monotonic()
+        self.profile_json: Optional[str] = self.config.getoption(XRAY_PROFILE_JSON)
+        self.profile: bool = self.config.getoption(XRAY_PROFILE) or self.profile_json is not None
+        self.memory_json: Optional[str] = self.config.getoption(XRAY_MEMORY_JSON)
+        self.memory_report: bool = self.config.getoption(XRAY_MEMORY) or self.memory_json is not None
+        self.memory: MemoryTracker = get_memory_tracker(self.memory_report)
+        self.slow_threshold: Optional[float] = self.config.getoption(XRAY_SLOW_THRESHOLD)
+        self.slow_comment: bool = self.config.getoption(XRAY_SLOW_COMMENT)
+        self.save_baseline: Optional[str] = self.config.getoption(XRAY_SAVE_BASELINE)
+        baseline = self.config.getoption(XRAY_BASELINE)
+        try:
+            self.baseline: Optional[dict[str, float]] = read_baseline(baseline) if baseline else None
+        except XrayError as exc:
+            raise pytest.UsageError(exc.message) from exc
+        self.regressions: list[Regression] = []
+        self.baseline_error: Optional[XrayError] = None  # keeps an exception if the baseline could not be saved
+        self._history: Optional[XrayHistory] = None
+        self.warm_up_abort: bool = self.config.getoption(XRAY_WARM_UP_ABORT)
+        self.warm_up: bool = self.config.getoption(XRAY_WARM_UP) or self.warm_up_abort
+        self.warm_up_thread: Optional[threading.Thread] = None
+        self.warm_up_error: Optional[XrayError] = None  # keeps an exception if raised by warm-up of XrayPublisher
+        self.warm_up_reported: bool = False
+        self.key_validator = key_validator
+        self.invalid_keys: set[str] = set()  # keys without Jira issue, their results are not published
+        self.reported_invalid_keys: set[str] = set()
+        # results may be reported from several threads by thread based runners
+        self._lock = threading.Lock()
+        self._key_locks: list[threading.Lock] = [threading.Lock() for _ in range(KEY_LOCKS)]
 
     @staticmethod
     def _get_normalize_logfile(logfile: str) -> str:
@@ -58,124 +179,222 @@ class XrayPlugin:
         logfile = os.path.normpath(os.path.abspath(logfile))
         return logfile
 
-    def _get_test_keys(self, item: Item) -> list[str]:
-        """Return JIRA ids associated with test item"""
-        test_keys: list[str] = []
-        marker = self._get_xray_marker(item)
-
-        if not marker:
-            return test_keys
-
-        if len(marker.args) == 0:
-            raise XrayError(
-                'pytest.mark.xray needs at least one argument, '
-                f'the test {item.nodeid} does not seem to be decorated in proper way.'
-            )
-        if isinstance(marker.args[0], str):
-            test_keys = list(marker.args)
-        elif isinstance(marker.args[0], list):
-            test_keys = marker.args[0]
-        else:
-            raise XrayError(f'xray marker can only accept strings or lists but got {type(marker.args[0])}')
-        return test_keys
-
-    def _get_defects(self, item: Item) -> list[str]:
-        """Return JIRA ids for defects associated with test item"""
-        marker = self._get_xray_marker(item)
-
-        if not marker:
-            return []
-
-        defects = marker.kwargs.get('defects', [])
+    def _get_test_function(self, item: Item) -> str:
+        """Return id of the test function, parametrizations of a function are one test with ``--xray-iterations``."""
+        if self.iterations and getattr(item, 'callspec', None) is not None:
+            parent_id = item.parent.nodeid if item.parent is not None else ''
+            return f'{parent_id}::{getattr(item, "originalname", item.name)}'
+        return item.nodeid
 
-        if isinstance(defects, list):
-            return defects
-
-        raise XrayError(f'xray marker can only accept list of defects but got {type(defects)}')
-
-    def _verify_jira_ids_for_items(self, items: list[Item]) -> None:
-        """Verify duplicated jira ids."""
-        jira_ids: list[str] = []
+    def _verify_jira_ids_for_items(self, items: list[Item]) -> set[str]:
+        """Verify duplicated jira ids and return all of them."""
+        jira_ids: dict[str, str] = {}  # test function of each jira id
         duplicated_jira_ids: list[str] = []
 
         for item in items:
-            test_keys = self._get_test_keys(item)
+            test_keys = get_test_keys(item)
             if not test_keys:
                 continue
 
+            test_function = self._get_test_function(item)
             for test_key in test_keys:
-                if test_key in jira_ids:
+                if jira_ids.setdefault(test_key, test_function) != test_function:
                     duplicated_jira_ids.append(test_key)
-                else:
-                    jira_ids.append(test_key)
 
             if duplicated_jira_ids and not self.allow_duplicate_ids:
                 raise XrayError(f'Duplicated test case ids: {duplicated_jira_ids}')
-
-    @staticmethod
-    def _get_xray_marker(item: Item) -> Optional[Mark]:
-        return item.get_closest_marker(XRAY_MARKER_NAME)
+        return set(jira_ids)
 
     def pytest_sessionstart(self, session):
-        self.test_execution.start_date = dt.datetime.now(tz=dt.timezone.utc)
+        with self.profiler.measure('hook: pytest_sessionstart'):
+            self.session_span.start()
+            self.test_execution.start_date = dt.datetime.now(tz=dt.timezone.utc)
+            if self.warm_up and not hasattr(self.config, 'workerinput'):
+                self._start_warm_up()
+
+    def _start_warm_up(self) -> None:
+        """Connect to the server in a background thread, or wait for it when the session should be aborted."""
+        if self.warm_up_abort:
+            self._warm_up()
+            if self.warm_up_error is not None:
+                pytest.exit(f'Jira XRAY warm-up failed: {self.warm_up_error.message}')
+            return
+        self.warm_up_thread = threading.Thread(target=self._warm_up, name='xray-warm-up', daemon=True)
+        self.warm_up_thread.start()
+
+    def _warm_up(self) -> None:
+        try:
+            # spans of the warm-up are children of the session span, not of spans of the pytest thread
+            with self.tracer.attach(self.session_span):
+                self.publisher.warm_up()
+        except XrayError as exc:
+            self.warm_up_error = exc
+
+    def _report_warm_up_error(self, terminalreporter: Optional[TerminalReporter]) -> None:
+        self.warm_up_reported = True
+        if terminalreporter is None or self.warm_up_error is None:
+            return
+        terminalreporter.ensure_newline()
+        terminalreporter.write_line(f'Jira XRAY warm-up failed: {self.warm_up_error.message}', yellow=True)
 
     @pytest.hookimpl(tryfirst=True, hookwrapper=True)
     def pytest_runtest_makereport(self, item, call):
         outcome = yield
         report = outcome.get_result()
 
-        if not hasattr(report, 'test_keys'):
-            report.test_keys = {}
-        test_keys = self._get_test_keys(item)
-        if test_keys and item.nodeid not in report.test_keys:
-            report.test_keys[item.nodeid] = test_keys
-
-        if not hasattr(report, 'defects'):
-            report.defects = {}
-        defects = self._get_defects(item)
-        if defects and item.nodeid not in report.defects:
-            report.defects[item.nodeid] = defects
+        with self.profiler.measure('hook: pytest_runtest_makereport'):
+            if not hasattr(report, 'test_keys'):
+                report.test_keys = {}
+            test_keys = get_test_keys(item)
+            if test_keys and item.nodeid not in report.test_keys:
+                report.test_keys[item.nodeid] = test_keys
+            if test_keys:
+                finish = time.monotonic() + self.clock_offset
+                report.xray_timing = (finish - call.duration, finish)
+                callspec = getattr(item, 'callspec', None)
+                if self.iterations and callspec is not None:
+                    report.xray_iteration = {
+                        'name': item.name,
+                        'parameters': [[name, str(value)] for name, value in callspec.params.items()],
+                    }
+
+            if not hasattr(report, 'defects'):
+                report.defects = {}
+            defects = get_defects(item)
+            if defects and item.nodeid not in report.defects:
+                report.defects[item.nodeid] = defects
 
     def pytest_runtest_logreport(self, report: TestReport):
-        status = self._get_status_from_report(report)
-        if status is None:
+        with self.profiler.measure('hook: pytest_runtest_logreport'):
+            self._add_report(report)
+            if self.warm_up_error is not None and not self.warm_up_reported:
+                self._report_warm_up_error(self.config.pluginmanager.get_plugin('terminalreporter'))
+            if self.key_validator is not None:
+                self._validate_keys(self.key_validator, report)
+
+    def _validate_keys(self, key_validator: KeyValidator, report: TestReport) -> None:
+        """Submit keys of tests run by xdist workers and report keys found without Jira issue."""
+        test_keys = report.test_keys.get(report.nodeid)
+        if test_keys:
+            key_validator.submit(test_keys)
+        invalid_keys = key_validator.get_invalid() - self.reported_invalid_keys
+        if not invalid_keys:
             return
+        self.reported_invalid_keys.update(invalid_keys)
+        terminalreporter = self.config.pluginmanager.get_plugin('terminalreporter')
+        if terminalreporter is not None:
+            terminalreporter.ensure_newline()
+            terminalreporter.write_line(
+                f'Jira XRAY test keys not found: {", ".join(sorted(invalid_keys))}', yellow=True
+            )
 
+    def _add_report(self, report: TestReport) -> None:
         test_keys = report.test_keys.get(report.nodeid)
         if test_keys is None:
             return
 
+        timing = getattr(report, 'xray_timing', None)
+        for test_key in test_keys:
+            with self._key_lock(test_key):
+                self.durations[test_key] = self.durations.get(test_key, 0.0) + report.duration
+                if timing is not None:
+                    self._add_timing(test_key, *timing)
+
+        status = self._get_status_from_report(report)
+        if status is None:
+            if timing is not None and report.when == 'teardown':
+                self._extend_timings(test_keys)
+            return
+        if report.when == 'call' or (report.when == 'setup' and not report.passed):
+            with self._lock:
+                self.metrics.tests += 1
+
         defects = report.defects.get(report.nodeid)
         evidences = getattr(report, 'evidences', [])
 
-        comment = report.longreprtext
-        if self.add_captures:
-            if comment != '':
-                comment += '\n'
-            if report.capstdout:
-                comment += f'{"-" * 29} Captured stdout call {"-" * 29}\n{report.capstdout}'
-            if report.capstderr:
-                comment += f'{"-" * 29} Captured stderr call {"-" * 29}\n{report.capstderr}'
-            if report.caplog:
-                # Remove the ncurses escape chars used to color log level
-                logt = re.subn('\x1b.*?m', '', report.caplog)
-                comment += f'{"-" * 30} Captured log call {"-" * 31}\n{logt[0]}'
+        iteration = getattr(report, 'xray_iteration', None)
+        comment = self._get_failure_log(report, test_keys[0]) if iteration is None else _get_short_log(report)
+        if self.add_captures and (self.capture_statuses is None or status in self.capture_statuses):
+            captures = get_captures(report, self.capture_limit)
+            if captures and self.captures_evidence:
+                evidences = [*evidences, get_captures_evidence(report, captures)]
+            elif captures:
+                if comment != '':
+                    comment += '\n'
+                comment += captures
 
         for test_key in test_keys:
             new_test_case = TestCase(
                 test_key=test_key,
                 status=status,
-                comment=comment,
+                comment=comment if iteration is None else None,
                 status_str_mapper=self.status_str_mapper,
                 evidences=evidences,
-                defects=defects,
+                defects=list(defects) if defects else None,  # merge extends defects of the test case
             )
-            try:
-                test_case = self.test_execution.find_test_case(test_key)
-            except KeyError:
-                self.test_execution.append(new_test_case)
-            else:
-                test_case.merge(new_test_case)
+            if iteration is not None:
+                new_test_case.iterations[iteration['name']] = Iteration(
+                    iteration['name'], status, [(name, value) for name, value in iteration['parameters']], comment
+                )
+            with self._key_lock(test_key):
+                self._set_timing(new_test_case)
+                try:
+                    test_case = self.test_execution.find_test_case(test_key)
+                except KeyError:
+                    with self._lock:
+                        self.test_execution.append(new_test_case)
+                    test_case = new_test_case
+                else:
+                    test_case.merge(new_test_case)
+                    self.test_execution.update(test_case)
+                self.memory.update(test_case)
+            # hook implementations may do I/O, other results of keys guarded by the same lock are not blocked by it
+            if not hasattr(self.config, 'workerinput'):
+                self.config.pluginmanager.hook.pytest_xray_test_result(test_case=test_case, report=report)
+
+    def _get_failure_log(self, report: TestReport, test_key: str) -> str:
+        """Return traceback of the first occurrence of a failure and a reference to it for other occurrences."""
+        if not self.dedupe_failures or not report.failed:
+            return report.longreprtext
+        fingerprint = get_failure_fingerprint(report)
+        occurrence = (test_key, report.nodeid)
+        with self._lock:
+            first = self.failures.setdefault(fingerprint, occurrence)
+        if first is occurrence:
+            return f'{report.longreprtext}\nFailure fingerprint: {fingerprint}'
+        return (
+            f'Failure fingerprint: {fingerprint}, same failure as in {first[0]} ({first[1]}):\n{_get_short_log(report)}'
+        )
+
+    def _key_lock(self, test_key: str) -> threading.Lock:
+        """Return lock guarding results of the Jira key, keys are spread over a fixed number of locks."""
+        return self._key_locks[hash(test_key) % KEY_LOCKS]
+
+    def _add_timing(self, test_key: str, start: float, finish: float) -> None:
+        timing = self.timings.get(test_key)
+        if timing is None:
+            self.timings[test_key] = [start, finish]
+        else:
+            timing[0] = min(timing[0], start)
+            timing[1] = max(timing[1], finish)
+
+    def _set_timing(self, test_case: TestCase) -> None:
+        """Set start and finish of the test case from test phases of its Jira key, key lock has to be held."""
+        timing = self.timings.get(test_case.test_key)
+        if timing is not None:
+            test_case.start = dt.datetime.fromtimestamp(timing[0], tz=dt.timezone.utc)
+            test_case.finish = dt.datetime.fromtimestamp(timing[1], tz=dt.timezone.utc)
+
+    def _extend_timings(self, test_keys: list[str]) -> None:
+        """Extend finish of test cases with a passed teardown, which does not add a result."""
+        for test_key in test_keys:
+            with self._key_lock(test_key):
+                try:
+                    test_case = self.test_execution.find_test_case(test_key)
+                except KeyError:
+                    continue
+                self._set_timing(test_case)
+                self.test_execution.update(test_case)
 
     def _get_status_from_report(self, report) -> Optional[Status]:
         if report.failed:
@@ -194,18 +413,150 @@ class XrayPlugin:
         return None
 
     def pytest_collection_modifyitems(self, config: Config, items: list[Item]) -> None:
-        self._verify_jira_ids_for_items(items)
+        span = self.tracer.span('index collected items', attributes={'pytest.items': len(items)})
+        with self.profiler.measure('hook: pytest_collection_modifyitems'), span:
+            jira_ids = self._verify_jira_ids_for_items(items)
+            if self.key_validator is not None:
+                self.key_validator.submit(sorted(jira_ids))
+
+    def _cache_last_failed(self, statuses: dict[str, Status]) -> None:
+        """Store keys of failed tests in pytest cache, keys which were not executed are kept."""
+        cache = getattr(self.config, 'cache', None)
+        if cache is None:
+            return
+        last_failed: dict[str, str] = cache.get(XRAY_CACHE_LAST_FAILED, {})
+        for test_key, status in statuses.items():
+            if status in FAILED_STATUSES:
+                last_failed[test_key] = status.value
+            else:
+                last_failed.pop(test_key, None)
+        cache.set(XRAY_CACHE_LAST_FAILED, last_failed)
+
+    def _find_regressions(self) -> None:
+        """Compare durations with baseline, it has to be called before history of the current run is saved."""
+        if self.slow_threshold is None:
+            return
+        history = None if self.baseline is not None else self._get_history()
+        self.regressions = find_regressions(self.durations, self.slow_threshold, self.baseline, history)
+        if not self.slow_comment:
+            return
+        for regression in self.regressions:
+            try:
+                test_case = self.test_execution.find_test_case(regression.test_key)
+            except KeyError:
+                continue
+            if test_case.comment != '':
+                test_case.comment += '\n'
+            test_case.comment += f'Duration regression: {regression}'
+            self.test_execution.update(test_case)
+
+    def _get_history(self) -> XrayHistory:
+        """Return history of previous runs, it is loaded only once per session."""
+        if self._history is None:
+            selection = self.config.pluginmanager.get_plugin(XRAY_SELECTION_PLUGIN)
+            self._history = getattr(selection, 'history', None) or XrayHistory.load(self.config)
+        return self._history
+
+    def _save_history(self, statuses: dict[str, Status]) -> None:
+        """Store statuses and durations of executed tests in pytest cache directory."""
+        history = self._get_history()
+        for test_key, status in statuses.items():
+            history.record(test_key, status, self.durations.get(test_key, 0.0))
+        history.save(self.config)
 
     def pytest_sessionfinish(self, session: pytest.Session) -> None:
         if hasattr(self.config, 'workerinput'):  # skipping on xdist
             return
-        self.test_execution.finish_date = dt.datetime.now(tz=dt.timezone.utc)
-        results = self.test_execution.as_dict()
-        session.config.pluginmanager.hook.pytest_xray_results(results=results, session=session)
-        try:
-            self.issue_id = self.publisher.publish(results)
-        except XrayError as exc:
-            self.exception = exc
+        with self.profiler.measure('hook: pytest_sessionfinish'):
+            self.test_execution.finish_date = dt.datetime.now(tz=dt.timezone.utc)
+            with self.profiler.measure('publish: update cache'), self.tracer.span('update cache'):
+                self._find_regressions()
+                # test cases are read once, they may be stored in a database
+                statuses = {test.test_key: test.status for test in self.test_execution.iter_tests()}
+                self._cache_last_failed(statuses)
+                self._save_history(statuses)
+                if self.save_baseline:
+                    try:
+                        write_baseline(self.save_baseline, self.durations)
+                    except XrayError as exc:
+                        self.baseline_error = exc
+            if self.warm_up_thread is not None:
+                with self.profiler.measure('publish: wait for warm-up'):
+                    self.warm_up_thread.join()
+            if self.key_validator is not None:
+                with self.profiler.measure('publish: wait for key validation'):
+                    self._finish_key_validation(self.key_validator)
+            # compressed size of the payload is estimated only when somebody reads it
+            self.metrics.estimate_compression = bool(
+                session.config.pluginmanager.hook.pytest_xray_publish_metrics.get_hookimpls()
+            )
+            batches = self._iter_results(session)
+            try:
+                on_published = functools.partial(self._batch_published, session)
+                if self.batch_size is None:
+                    results = next(batches)
+                    with self.profiler.measure('publish: total'), self.tracer.span('publish') as span:
+                        self.issue_id = self.publisher.publish(results)
+                        span.set_attribute('xray.test_execution', self.issue_id)
+                    on_published(results, self.issue_id)
+                else:
+                    with self.profiler.measure('publish: total'), self.tracer.span('publish') as span:
+                        self.issue_id = self.publisher.publish_batches(batches, on_published)
+                        span.set_attribute('xray.test_execution', self.issue_id)
+            except XrayError as exc:
+                self.exception = exc
+            self.test_execution.close()
+            session.config.pluginmanager.hook.pytest_xray_publish_metrics(
+                metrics=self.metrics.as_dict(), session=session
+            )
+        self.session_span.end()
+        self.tracer.close()
+        self._dump_profile()
+        self._dump_memory()
+
+    def _finish_key_validation(self, key_validator: KeyValidator) -> None:
+        """Wait for the validation of keys and keep the existing keys in pytest cache."""
+        key_validator.close()
+        self.invalid_keys = key_validator.get_invalid()
+        cache = getattr(self.config, 'cache', None)
+        if cache is not None:
+            cache.set(XRAY_CACHE_KEYS, key_validator.existing)
+
+    def _iter_results(self, session: pytest.Session) -> Iterator[dict[str, Any]]:
+        """Build results of test execution split into batches and pass them to ``pytest_xray_results`` hook."""
+        batches = self.test_execution.iter_batches(self.batch_size)
+        while True:
+            with self.profiler.measure('publish: as_dict'), self.tracer.span('build report') as span:
+                results = next(batches, None)
+                if results is None:
+                    return
+                if self.invalid_keys:
+                    results['tests'] = [test for test in results['tests'] if test['testKey'] not in self.invalid_keys]
+                span.set_attribute('xray.tests', len(results['tests']))
+            with self.profiler.measure('publish: pytest_xray_results hook'), self.tracer.span('pytest_xray_results'):
+                session.config.pluginmanager.hook.pytest_xray_results(results=results, session=session)
+            self.metrics.add_results(results)
+            yield results
+
+    def _batch_published(self, session: pytest.Session, results: dict[str, Any], issue_id: str) -> None:
+        with self.profiler.measure('publish: pytest_xray_batch_published hook'):
+            session.config.pluginmanager.hook.pytest_xray_batch_published(
+                results=results, issue_id=issue_id, session=session
+            )
+
+    def _dump_profile(self) -> None:
+        if self.profile_json is None:
+            return
+        path = Path(self.profile_json)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.profiler.as_dict(), indent=2), encoding='UTF-8')
+
+    def _dump_memory(self) -> None:
+        if self.memory_json is None:
+            return
+        path = Path(self.memory_json)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.memory.as_dict(), indent=2), encoding='UTF-8')
 
     def pytest_terminal_summary(self, terminalreporter: TerminalReporter, exitstatus: ExitCode, config: Config) -> None:
         if self.exception:
@@ -219,5 +570,43 @@ class XrayPlugin:
                 terminalreporter.write_sep(
                     '-', f'Generated XRAY execution report file: {Path(self.logfile).absolute()}'
                 )
+            elif self.issue_id and self.metrics.skipped and not self.metrics.requests:
+                terminalreporter.write_sep(
+                    '-', f'Results were already uploaded to JIRA XRAY. Test Execution Id: {self.issue_id}'
+                )
             elif self.issue_id:
                 terminalreporter.write_sep('-', f'Uploaded results to JIRA XRAY. Test Execution Id: {self.issue_id}')
+        if isinstance(self.publisher, FanOutPublisher) and (self.issue_id or self.exception):
+            for line in self.publisher.summary_lines():
+                terminalreporter.write_line(f'Jira XRAY target {line}')
+        if self.warm_up_error is not None and not self.warm_up_reported:
+            self._report_warm_up_error(terminalreporter)
+        if self.invalid_keys:
+            invalid_keys = ', '.join(sorted(self.invalid_keys))
+            terminalreporter.write_line(
+                f'Jira XRAY test keys not found, their results were not uploaded: {invalid_keys}', yellow=True
+            )
+        if self.key_validator is not None and self.key_validator.error is not None:
+            terminalreporter.write_line(
+                f'Could not validate Jira XRAY test keys: {self.key_validator.error.message}', yellow=True
+            )
+        if self.issue_id or self.exception:
+            terminalreporter.write_line(f'Jira XRAY metrics: {self.metrics.summary_line()}')
+
+        if self.profile:
+            terminalreporter.section('Jira XRAY profile', sep='-')
+            for line in self.profiler.summary_lines():
+                terminalreporter.write_line(line)
+
+        if self.baseline_error is not None:
+            terminalreporter.write_line(f'Could not save Jira XRAY baseline! {self.baseline_error.message}', red=True)
+
+        if self.regressions:
+            terminalreporter.section('Jira XRAY slow tests', sep='-', yellow=True)
+            for regression in self.regressions:
+                terminalreporter.write_line(f'{regression.test_key}: {regression}')
+
+        if self.memory_report:
+            terminalreporter.section('Jira XRAY memory', sep='-')
+            for line in self.memory.summary_lines():
+                terminalreporter.write_line(line)
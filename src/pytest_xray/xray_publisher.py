@@ -3,49 +3,130 @@ import json
 import logging
 import os
 import tempfile
+import threading
+import time
+import zlib
+from collections.abc import Iterable
 from typing import Any, Callable, Optional, Union
 
 import requests
 from requests import PreparedRequest
 from requests.auth import AuthBase
 
-from pytest_xray.constant import AUTHENTICATE_ENDPOINT
+from pytest_xray.checkpoint import UploadCheckpoint
+from pytest_xray.constant import AUTHENTICATE_ENDPOINT, TEST_EXECUTION_ENDPOINT, TEST_EXECUTION_ENDPOINT_CLOUD
 from pytest_xray.exceptions import XrayError
+from pytest_xray.helper import get_api_key_auth, get_basic_auth, get_bearer_auth
+from pytest_xray.ledger import PublishLedger
+from pytest_xray.metrics import PublishMetrics
+from pytest_xray.profiler import NullProfiler, Profiler
+from pytest_xray.tracing import SPAN_KIND_CLIENT, NullTracer, Tracer
 
 AuthType = Optional[Union[tuple[str, str], AuthBase, Callable[[PreparedRequest], PreparedRequest]]]
 
 
 _logger = logging.getLogger(__name__)
 
+# timeout in seconds of each request made to warm up the connection
+WARM_UP_TIMEOUT: float = 30.0
+
+
+class EncodedTests(list):
+    """
+    Tests of XRAY results which are encoded to JSON only once.
+
+    It is used to share the encoding of the same results by several publishers,
+    which may encode them at the same time from different threads.
+    """
+
+    def __init__(self, tests: Iterable[dict[str, Any]]) -> None:
+        super().__init__(tests)
+        self._encoded: Optional[bytes] = None
+        self._lock = threading.Lock()
+
+    def encode(self) -> bytes:
+        with self._lock:
+            if self._encoded is None:
+                self._encoded = json.dumps(self).encode('utf-8')
+            return self._encoded
+
+
+def encode_results(data: dict[str, Any]) -> bytes:
+    """Return results encoded to JSON, already encoded tests are reused."""
+    tests = data.get('tests')
+    if not isinstance(tests, EncodedTests):
+        return json.dumps(data).encode('utf-8')
+    header = json.dumps({name: value for name, value in data.items() if name != 'tests'}).encode('utf-8')
+    separator = b', ' if len(header) > 2 else b''
+    return header[:-1] + separator + b'"tests": ' + tests.encode() + b'}'
+
 
 class ClientSecretAuth(AuthBase):
     """Bearer authentication with Client ID and a Client Secret."""
 
-    def __init__(self, base_url: str, client_id: str, client_secret: str, verify: Union[bool, str] = True) -> None:
+    def __init__(
+        self,
+        base_url: str,
+        client_id: str,
+        client_secret: str,
+        verify: Union[bool, str] = True,
+        profiler: Optional[Profiler] = None,
+        metrics: Optional[PublishMetrics] = None,
+        tracer: Optional[Tracer] = None,
+        session: Optional[requests.Session] = None,
+    ) -> None:
         if base_url.endswith('/'):
             base_url = base_url[:-1]
         self.base_url = base_url
         self.client_id = client_id
         self.client_secret = client_secret
         self.verify = verify
+        self.profiler = profiler or NullProfiler()
+        self.metrics = metrics or PublishMetrics()
+        self.tracer = tracer or NullTracer()
+        self.session = session or requests.Session()
+        self.token: Optional[str] = None  # token is requested once and used by all requests
 
     @property
     def endpoint_url(self) -> str:
         return f'{self.base_url}{AUTHENTICATE_ENDPOINT}'
 
-    def __call__(self, r: requests.PreparedRequest) -> requests.PreparedRequest:
+    def authenticate(self, timeout: Optional[float] = None) -> str:
+        """
+        Request a new token and return it or raise XrayError.
+
+        :param timeout: timeout of the request in seconds
+        :return: bearer token
+        """
         headers = {'Content-type': 'application/json', 'Accept': 'text/plain'}
         auth_data = {'client_id': self.client_id, 'client_secret': self.client_secret}
 
+        self.metrics.auth_requests += 1
+        span = self.tracer.span(
+            'authenticate', SPAN_KIND_CLIENT, {'http.request.method': 'POST', 'url.full': self.endpoint_url}
+        )
         try:
-            response = requests.post(self.endpoint_url, data=json.dumps(auth_data), headers=headers, verify=self.verify)
-        except requests.exceptions.ConnectionError as exc:
+            with self.profiler.measure('publish: authenticate'), span:
+                response = self.session.post(
+                    self.endpoint_url, data=json.dumps(auth_data), headers=headers, verify=self.verify, timeout=timeout
+                )
+                span.set_attribute('http.response.status_code', response.status_code)
+        except requests.exceptions.RequestException as exc:
             err_message = f'ConnectionError: cannot authenticate with {self.endpoint_url}'
             _logger.exception(err_message)
             raise XrayError(err_message) from exc
-        else:
-            auth_token = response.text.replace('"', '')
-            r.headers['Authorization'] = f'Bearer {auth_token}'
+        if not response.ok:
+            err_message = (
+                f'HTTPError: cannot authenticate with {self.endpoint_url}. Response status code: {response.status_code}'
+            )
+            _logger.error(err_message)
+            raise XrayError(err_message)
+        return response.text.replace('"', '')
+
+    def __call__(self, r: requests.PreparedRequest) -> requests.PreparedRequest:
+        if self.token is None:
+            self.token = self.authenticate()
+        r.headers['Authorization'] = f'Bearer {self.token}'
         return r
 
 
@@ -63,13 +144,34 @@ class ApiKeyAuth(AuthBase):
 class XrayPublisher:
     """Exports Xray report to a Jira server."""
 
-    def __init__(self, base_url: str, endpoint: str, auth: AuthType, verify: Union[bool, str] = True) -> None:
+    def __init__(
+        self,
+        base_url: str,
+        endpoint: str,
+        auth: AuthType,
+        verify: Union[bool, str] = True,
+        profiler: Optional[Profiler] = None,
+        metrics: Optional[PublishMetrics] = None,
+        tracer: Optional[Tracer] = None,
+        session: Optional[requests.Session] = None,
+        ledger: Optional[PublishLedger] = None,
+        checkpoint: Optional[UploadCheckpoint] = None,
+    ) -> None:
         if base_url.endswith('/'):
             base_url = base_url[:-1]
         self.base_url = base_url
         self.endpoint = endpoint
         self.auth = auth
         self.verify = verify
+        self.profiler = profiler or NullProfiler()
+        self.metrics = metrics or PublishMetrics()
+        self.tracer = tracer or NullTracer()
+        # connections to the server are kept open and reused by the following requests
+        self.session = session or requests.Session()
+        # results found in the ledger are not published again
+        self.ledger = ledger
+        # batches recorded in the checkpoint are not published again
+        self.checkpoint = checkpoint
 
     @property
     def endpoint_url(self) -> str:
@@ -78,15 +180,31 @@ class XrayPublisher:
 
     def _send_data(self, url: str, auth: AuthType, data: dict[str, Any]) -> dict[str, Any]:
         headers = {'Accept': 'application/json', 'Content-Type': 'application/json'}
+        with self.profiler.measure('publish: encode JSON'), self.tracer.span('encode JSON') as span:
+            body = encode_results(data)
+            span.set_attribute('xray.payload.size', len(body))
+        self.metrics.payload_bytes += len(body)
+        if self.metrics.estimate_compression:
+            self.metrics.compressed_bytes = (self.metrics.compressed_bytes or 0) + len(zlib.compress(body, 1))
+        span = self.tracer.span(
+            'POST',
+            SPAN_KIND_CLIENT,
+            {'http.request.method': 'POST', 'url.full': url, 'http.request.body.size': len(body)},
+        )
+        start = time.perf_counter()
         try:
-            response = requests.request(
-                method='POST', url=url, headers=headers, json=data, auth=auth, verify=self.verify
-            )
+            # includes authentication if it requires a request to a server
+            with self.profiler.measure('publish: HTTP request'), span:
+                response = self.session.request(
+                    method='POST', url=url, headers=headers, data=body, auth=auth, verify=self.verify
+                )
+                span.set_attribute('http.response.status_code', response.status_code)
         except requests.exceptions.ConnectionError as exc:
             err_message = f'ConnectionError: cannot connect to JIRA service at {url}'
             _logger.exception(err_message)
             raise XrayError(err_message) from exc
         else:
+            self.metrics.add_request(time.perf_counter() - start)
             try:
                 response.raise_for_status()
             except requests.exceptions.HTTPError as exc:
@@ -102,13 +220,51 @@ class XrayPublisher:
                 raise XrayError(err_message) from exc
             return response.json()
 
+    def warm_up(self, timeout: float = WARM_UP_TIMEOUT) -> None:
+        """
+        Open a connection to the server and request authentication token if needed or raise XrayError.
+
+        The connection and the token are reused when the results are published, so errors
+        of the connection and credentials can be found before the tests are run.
+
+        :param timeout: timeout of each request in seconds
+        """
+        span = self.tracer.span('warm up', SPAN_KIND_CLIENT, {'http.request.method': 'HEAD', 'url.full': self.base_url})
+        with self.profiler.measure('publish: warm up'), span:
+            if isinstance(self.auth, ClientSecretAuth):
+                self.auth.token = self.auth.authenticate(timeout)
+            try:
+                response = self.session.head(self.base_url, verify=self.verify, timeout=timeout)
+                span.set_attribute('http.response.status_code', response.status_code)
+            except requests.exceptions.RequestException as exc:
+                err_message = f'ConnectionError: cannot connect to JIRA service at {self.base_url}'
+                _logger.exception(err_message)
+                raise XrayError(err_message) from exc
+
     def publish(self, data: dict[str, Any]) -> str:
         """
         Publish results to Jira and return testExecutionId or raise XrayError.
 
+        Results which were already published according to the ledger are not sent again,
+        the test execution id recorded in the ledger is returned instead.
+
         :param data: data to send
         :return: test execution issue id
         """
+        if self.ledger is None:
+            return self._publish(data)
+        with self.profiler.measure('publish: fingerprint'):
+            fingerprint = self.ledger.fingerprint(self.endpoint_url, data)
+        key = self.ledger.get(fingerprint)
+        if key is not None:
+            _logger.info('Results were already published to test execution %s, skipping', key)
+            self.metrics.skipped += 1
+            return key
+        key = self._publish(data)
+        self.ledger.record(fingerprint, key)
+        return key
+
+    def _publish(self, data: dict[str, Any]) -> str:
         response_data = self._send_data(self.endpoint_url, self.auth, data)
         # The Xray cloud response does not include the 'testExecIssue' attribute
         try:
@@ -124,3 +280,108 @@ class XrayPublisher:
                 f'Server response can be found in log file: {log_file}'
             ) from None
         return key
+
+    def publish_batches(
+        self,
+        batches: Iterable[dict[str, Any]],
+        on_published: Optional[Callable[[dict[str, Any], str], None]] = None,
+    ) -> str:
+        """
+        Publish results split into batches to a single test execution and return its id or raise XrayError.
+
+        The first batch creates the test execution unless it has ``testExecutionKey``,
+        the following batches are imported into the same test execution. Batches recorded in
+        the checkpoint by a failed upload of the same results are skipped.
+
+        :param batches: results with parts of tests
+        :param on_published: function called with each batch and the test execution issue id after it was published
+        :return: test execution issue id
+        """
+        if self.checkpoint is not None:
+            self.checkpoint.load(self.endpoint_url)
+        key: Optional[str] = None
+        for index, data in enumerate(batches):
+            fingerprint: Optional[str] = None
+            if self.checkpoint is not None:
+                fingerprint = self.checkpoint.fingerprint(data)
+                resumed_key = self.checkpoint.resume(index, fingerprint)
+                if resumed_key is not None:
+                    _logger.info('Batch %d was already published to test execution %s, skipping', index, resumed_key)
+                    self.metrics.skipped += 1
+                    key = resumed_key
+                    continue
+                key = self.checkpoint.test_execution_key
+            if key is not None:
+                data['testExecutionKey'] = key
+            key = self.publish(data)
+            if self.checkpoint is not None and fingerprint is not None:
+                self.checkpoint.add(fingerprint, len(data['tests']), key)
+            if on_published is not None:
+                on_published(data, key)
+        if key is None:
+            raise XrayError('No results to publish')
+        if self.checkpoint is not None:
+            self.checkpoint.finish()
+        return key
+
+
+def get_xray_publisher(
+    cloud: bool = False,
+    client_secret_auth: bool = False,
+    api_key_auth: bool = False,
+    profiler: Optional[Profiler] = None,
+    metrics: Optional[PublishMetrics] = None,
+    tracer: Optional[Tracer] = None,
+    ledger: Optional[PublishLedger] = None,
+    checkpoint: Optional[UploadCheckpoint] = None,
+) -> XrayPublisher:
+    """
+    Return publisher configured from environment variables or raise XrayError.
+
+    :param cloud: use Jira XRAY cloud server endpoint
+    :param client_secret_auth: use client secret authentication
+    :param api_key_auth: use API key authentication, basic authentication is used by default
+    :param profiler: profiler measuring publish phases
+    :param metrics: metrics of published results
+    :param tracer: tracer of publish phases
+    :param ledger: ledger of published results which are not published again
+    :param checkpoint: checkpoint of batches which are not published again when a failed upload is resumed
+    :return: Xray publisher
+    """
+    if cloud:
+        endpoint = TEST_EXECUTION_ENDPOINT_CLOUD
+    else:
+        endpoint = TEST_EXECUTION_ENDPOINT
+
+    session = requests.Session()
+    if client_secret_auth:
+        options = get_bearer_auth()
+        auth: AuthType = ClientSecretAuth(
+            options['BASE_URL'],
+            options['CLIENT_ID'],
+            options['CLIENT_SECRET'],
+            options['VERIFY'],
+            profiler,
+            metrics,
+            tracer,
+            session,
+        )
+    elif api_key_auth:
+        options = get_api_key_auth()
+        auth = ApiKeyAuth(options['API_KEY'])
+    else:
+        options = get_basic_auth()
+        auth = (options['USER'], options['PASSWORD'])
+
+    return XrayPublisher(
+        base_url=options['BASE_URL'],
+        endpoint=endpoint,
+        auth=auth,
+        verify=options['VERIFY'],
+        profiler=profiler,
+        metrics=metrics,
+        tracer=tracer,
+        session=session,
+        ledger=ledger,
+        checkpoint=checkpoint,
+    )
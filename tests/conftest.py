@@ -7,7 +7,24 @@ from pytest_xray.constant import (
     TEST_EXECUTION_ENDPOINT_CLOUD,
 )
 
-pytest_plugins = ['pytester']
+pytest_plugins = ['pytester', 'pytest_xray.testing']
+
+# tests written by ``xray_tests`` fixture, a test module may define its own ``XRAY_TESTS`` and ``XRAY_CONFTEST``
+XRAY_TESTS = """\
+import pytest
+
+@pytest.mark.xray('JIRA-1')
+def test_pass():
+    pass
+
+@pytest.mark.xray('JIRA-2')
+def test_fail():
+    assert False
+
+@pytest.mark.xray('JIRA-3')
+def test_another_pass():
+    pass
+"""
 
 
 @pytest.fixture
@@ -35,3 +52,13 @@ def fake_xray_server(httpserver: HTTPServer, environment_variables):
     # cloud server
     httpserver.expect_request(TEST_EXECUTION_ENDPOINT_CLOUD, method='POST').respond_with_json({'key': '1000'})
     httpserver.expect_request(AUTHENTICATE_ENDPOINT, 'POST').respond_with_data('dummy_token')
+
+
+@pytest.fixture()
+def xray_tests(request: pytest.FixtureRequest, pytester: pytest.Pytester) -> pytest.Pytester:
+    """Create tests marked with Jira XRAY keys and a conftest file from sources of the test module."""
+    conftest = getattr(request.module, 'XRAY_CONFTEST', None)
+    if conftest is not None:
+        pytester.makeconftest(conftest)
+    pytester.makepyfile(getattr(request.module, 'XRAY_TESTS', XRAY_TESTS))
+    return pytester
@@ -0,0 +1,109 @@
+import base64
+import gzip
+import json
+
+import pytest
+
+from pytest_xray.captures import parse_capture_limit, parse_capture_statuses
+from pytest_xray.helper import COMMENT_PREFIX, COMMENT_SUFFIX, Status
+
+XRAY_TESTS = """\
+import logging
+
+import pytest
+
+@pytest.mark.xray('JIRA-1')
+def test_pass():
+    print('passed')
+
+@pytest.mark.xray('JIRA-2')
+def test_fail():
+    print('x' * 100 + 'end')
+    logging.warning('\\x1b[31mcolored\\x1b[0m')
+    assert False
+"""
+
+
+def _tests(pytester: pytest.Pytester) -> dict[str, dict]:
+    return {test['testKey']: test for test in json.loads((pytester.path / 'xray.json').read_text())['tests']}
+
+
+def _comment(test: dict) -> str:
+    return test.get('comment', '').removeprefix(COMMENT_PREFIX).removesuffix(COMMENT_SUFFIX)
+
+
+def test_parse_capture_statuses():
+    assert parse_capture_statuses('fail, ABORTED') == {Status.FAIL, Status.ABORTED}
+    with pytest.raises(Exception, match='unknown status "FAILED"'):
+        parse_capture_statuses('FAILED')
+
+
+def test_parse_capture_limit():
+    assert parse_capture_limit('100') == 100
+    with pytest.raises(Exception, match='greater than 0'):
+        parse_capture_limit('0')
+
+
+def test_captures_only_for_statuses(xray_tests):
+    result = xray_tests.runpytest('--jira-xray', '--xraypath=xray.json', '--add-captures', '--xray-captures-for=FAIL')
+    result.assert_outcomes(passed=1, failed=1)
+
+    tests = _tests(xray_tests)
+    assert 'comment' not in tests['JIRA-1']
+    comment = _comment(tests['JIRA-2'])
+    assert 'x' * 100 + 'end' in comment
+    # colors are stripped
+    assert 'WARNING  root:test_captures_only_for_statuses.py:12 colored' in comment
+
+
+def test_captures_limit(xray_tests):
+    result = xray_tests.runpytest('--jira-xray', '--xraypath=xray.json', '--add-captures', '--xray-captures-limit=10')
+    result.assert_outcomes(passed=1, failed=1)
+
+    tests = _tests(xray_tests)
+    assert _comment(tests['JIRA-1']).endswith(' Captured stdout call ' + '-' * 29 + '\npassed\n')
+    assert '... 94 characters truncated ...\nxxxxxxend\n' in _comment(tests['JIRA-2'])
+
+
+def test_captures_evidence(xray_tests):
+    result = xray_tests.runpytest('--jira-xray', '--xraypath=xray.json', '--add-captures', '--xray-captures-evidence')
+    result.assert_outcomes(passed=1, failed=1)
+
+    tests = _tests(xray_tests)
+    assert 'comment' not in tests['JIRA-1']
+    assert 'Captured' not in _comment(tests['JIRA-2'])
+    assert 'assert False' in _comment(tests['JIRA-2'])
+    [evidence] = tests['JIRA-2']['evidences']
+    assert evidence['filename'] == 'test_captures_evidence.py_test_fail-call.txt.gz'
+    assert evidence['contentType'] == 'application/gzip'
+    captures = gzip.decompress(base64.b64decode(evidence['data'])).decode('utf-8')
+    assert captures.startswith('-' * 29 + ' Captured stdout call ' + '-' * 29 + '\n' + 'x' * 100 + 'end\n')
+    assert 'colored' in captures
+
+
+def test_captures_evidence_of_later_parametrization(pytester):
+    pytester.makepyfile(
+        """
+        import pytest
+
+        @pytest.mark.xray('JIRA-1')
+        @pytest.mark.parametrize('value', [1, 2])
+        def test_value(value):
+            print(f'value {value}')
+            assert value == 1
+        """
+    )
+    result = pytester.runpytest(
+        '--jira-xray',
+        '--xraypath=xray.json',
+        '--allow-duplicate-ids',
+        '--add-captures',
+        '--xray-captures-for=FAIL',
+        '--xray-captures-evidence',
+    )
+    result.assert_outcomes(passed=1, failed=1)
+
+    [evidence] = _tests(pytester)['JIRA-1']['evidences']
+    assert evidence['filename'] == 'test_captures_evidence_of_later_parametrization.py_test_value[2]-call.txt.gz'
+    captures = gzip.decompress(base64.b64decode(evidence['data'])).decode('utf-8')
+    assert 'value 2' in captures
@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+from pytest_xray.checkpoint import UploadCheckpoint
+from pytest_xray.constant import TEST_EXECUTION_ENDPOINT
+from pytest_xray.exceptions import XrayError
+from pytest_xray.merge import main
+from pytest_xray.testing import XrayServer
+from pytest_xray.xray_publisher import XrayPublisher
+
+BATCHES = [
+    {'info': {'summary': 'Nightly'}, 'tests': [{'testKey': f'JIRA-{index}', 'status': 'PASS'}]} for index in range(3)
+]
+
+
+def _batches() -> list[dict]:
+    return json.loads(json.dumps(BATCHES))
+
+
+def _publisher(server: XrayServer, path) -> XrayPublisher:
+    return XrayPublisher(
+        server.url, TEST_EXECUTION_ENDPOINT, ('user', 'password'), checkpoint=UploadCheckpoint(str(path))
+    )
+
+
+def test_resume_failed_upload(tmp_path):
+    path = tmp_path / 'xray.json.checkpoint'
+    with XrayServer() as server:
+        publisher = _publisher(server, path)
+        batches = iter(_batches())
+
+        def fail_second_batch(data, key):
+            server.fail_next(500)  # the first batch is published, the next one fails
+
+        with pytest.raises(XrayError, match='Response status code: 500'):
+            publisher.publish_batches(batches, fail_second_batch)
+        checkpoint = json.loads(path.read_text())
+        assert checkpoint['testExecutionKey'] == 'XRAY-1'
+        assert [batch['tests'] for batch in checkpoint['batches']] == [1]
+        assert checkpoint['complete'] is False
+
+        publisher = _publisher(server, path)
+        assert publisher.publish_batches(_batches()) == 'XRAY-1'
+        assert publisher.metrics.skipped == 1
+        requests = [request.json() for request in server.import_requests() if request.status == 200]
+        assert [data['tests'][0]['testKey'] for data in requests] == ['JIRA-0', 'JIRA-1', 'JIRA-2']
+        assert [data.get('testExecutionKey') for data in requests] == [None, 'XRAY-1', 'XRAY-1']
+        checkpoint = json.loads(path.read_text())
+        assert len(checkpoint['batches']) == 3
+        assert checkpoint['complete'] is True
+
+        # completed upload is not sent again
+        publisher = _publisher(server, path)
+        assert publisher.publish_batches(_batches()) == 'XRAY-1'
+        assert publisher.metrics.skipped == 3
+        assert publisher.metrics.requests == 0
+
+
+def test_upload_of_other_results_starts_again(tmp_path):
+    path = tmp_path / 'xray.json.checkpoint'
+    with XrayServer() as server:
+        assert _publisher(server, path).publish_batches(_batches()) == 'XRAY-1'
+        batches = _batches()
+        batches[0]['tests'][0]['status'] = 'FAIL'
+        assert _publisher(server, path).publish_batches(batches) == 'XRAY-2'
+        # checkpoints of other servers are ignored
+        path.write_text(path.read_text().replace(server.url, 'http://other'))
+        assert _publisher(server, path).publish_batches(_batches()) == 'XRAY-3'
+    assert len(server.import_requests()) == 9
+
+
+def test_merge_resumes_upload(xray_server, tmp_path, capsys):
+    report = tmp_path / 'xray.json'
+    # reports created by pytest have dates, otherwise the current time would make each upload different
+    info = {'startDate': '2026-01-01T10:00:00+0000', 'finishDate': '2026-01-01T11:00:00+0000'}
+    report.write_text(json.dumps({'info': info, 'tests': [test for batch in BATCHES for test in batch['tests']]}))
+    options = [str(report), '--upload', '--xray-batch-size=2', f'--xray-checkpoint={report}.checkpoint']
+
+    xray_server.fail_next(500)
+    assert main(options) == 1
+    assert 'Could not merge Jira XRAY results!' in capsys.readouterr().err
+    assert main(options) == 0
+    assert 'Uploaded results to JIRA XRAY. Test Execution Id: XRAY-1' in capsys.readouterr().out
+    assert main(options) == 0
+    assert 'Results were already uploaded to JIRA XRAY. Test Execution Id: XRAY-1' in capsys.readouterr().out
+    assert [request.status for request in xray_server.import_requests()] == [500, 200, 200]
+
+
+def test_merge_checkpoint_requires_batch_size(tmp_path, capsys):
+    report = tmp_path / 'xray.json'
+    report.write_text(json.dumps({'tests': BATCHES[0]['tests']}))
+    with pytest.raises(SystemExit):
+        main([str(report), '--upload', f'--xray-checkpoint={report}.checkpoint'])
+    assert '--xray-checkpoint option requires --xray-batch-size option' in capsys.readouterr().err
@@ -0,0 +1,103 @@
+import sys
+import threading
+from typing import Optional
+
+import pytest
+from _pytest.reports import TestReport
+
+from pytest_xray.constant import XRAY_PLUGIN
+from pytest_xray.helper import Status
+
+THREADS: int = 16
+KEYS: int = 8
+REPORTS_PER_THREAD: int = 200
+
+
+def make_report(index: int, test_key: str, failed: bool, shared_key: Optional[str] = 'SHARED-1') -> TestReport:
+    nodeid = f'test_stress.py::test_{index}'
+    report = TestReport(
+        nodeid=nodeid,
+        location=('test_stress.py', index, nodeid),
+        keywords={},
+        outcome='failed' if failed else 'passed',
+        longrepr=f'error {index}' if failed else None,
+        when='call',
+        duration=0.5,
+    )
+    report.test_keys = {nodeid: [test_key, shared_key] if shared_key else [test_key]}  # type: ignore[attr-defined]
+    report.defects = {nodeid: [f'BUG-{index % 3}']}  # type: ignore[attr-defined]
+    report.xray_timing = (1000.0 + index, 1001.0 + index)  # type: ignore[attr-defined]
+    return report
+
+
+@pytest.fixture()
+def fast_thread_switching():
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+@pytest.mark.parametrize('extra_args', [[], ['--xray-store=store.db']], ids=['memory', 'store'])
+def test_concurrent_aggregation_of_shared_keys(pytester, fast_thread_switching, extra_args):
+    config = pytester.parseconfigure('--jira-xray', '--xraypath=xray.json', '--xray-memory', *extra_args)
+    plugin = config.pluginmanager.get_plugin(XRAY_PLUGIN)
+    total = THREADS * REPORTS_PER_THREAD
+    reports = [make_report(index, f'JIRA-{index % KEYS}', failed=index % 10 == 0) for index in range(total)]
+    barrier = threading.Barrier(THREADS)
+
+    def worker(thread_index: int) -> None:
+        barrier.wait()
+        for report in reports[thread_index::THREADS]:
+            plugin.pytest_runtest_logreport(report)
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    tests = {test.test_key: test for test in plugin.test_execution.tests}
+    assert len(plugin.test_execution.tests) == KEYS + 1
+    assert plugin.metrics.tests == total
+    assert plugin.durations['SHARED-1'] == pytest.approx(0.5 * total)
+    assert plugin.timings['SHARED-1'] == [1000.0, 1000.0 + total]
+    assert set(plugin.memory.sizes) == set(tests)
+    assert tests['SHARED-1'].status == Status.FAIL
+    assert tests['SHARED-1'].comment.count('error ') == total // 10
+    assert sorted(tests['SHARED-1'].defects) == ['BUG-0', 'BUG-1', 'BUG-2']
+    for key_index in range(KEYS):
+        test_case = tests[f'JIRA-{key_index}']
+        assert plugin.durations[test_case.test_key] == pytest.approx(0.5 * total / KEYS)
+        assert test_case.status == (Status.FAIL if key_index in (0, 2, 4, 6) else Status.PASS)
+
+
+def test_test_result_hook_does_not_block_keys_of_same_lock(pytester):
+    config = pytester.parseconfigure('--jira-xray', '--xraypath=xray.json')
+    plugin = config.pluginmanager.get_plugin(XRAY_PLUGIN)
+    other_key = next(
+        f'JIRA-{index}' for index in range(1, 1000) if plugin._key_lock(f'JIRA-{index}') is plugin._key_lock('JIRA-0')
+    )
+    in_hook = threading.Event()
+    release = threading.Event()
+
+    class SlowDashboard:
+        def pytest_xray_test_result(self, test_case, report):
+            if test_case.test_key == 'JIRA-0':
+                in_hook.set()
+                release.wait(timeout=10)
+
+    config.pluginmanager.register(SlowDashboard())
+    reports = [make_report(0, 'JIRA-0', failed=False, shared_key=None), make_report(1, other_key, False, None)]
+    slow = threading.Thread(target=plugin.pytest_runtest_logreport, args=(reports[0],))
+    slow.start()
+    try:
+        assert in_hook.wait(timeout=10)
+        fast = threading.Thread(target=plugin.pytest_runtest_logreport, args=(reports[1],))
+        fast.start()
+        fast.join(timeout=5)
+        assert not fast.is_alive()
+    finally:
+        release.set()
+        slow.join()
+    assert {test.test_key for test in plugin.test_execution.tests} == {'JIRA-0', other_key}
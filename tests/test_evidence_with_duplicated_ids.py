@@ -1,5 +1,6 @@
 import json
 import textwrap
+from unittest.mock import ANY
 
 import pytest
 
@@ -30,6 +31,8 @@ def test_attach_evidence_for_tests(pytester: pytest.Pytester):
                 'evidences': [{'contentType': 'text/plain', 'data': 'SU5GTzogdGVzdA==', 'filename': 'test.log'}],
                 'status': 'PASS',
                 'testKey': 'JIRA-1',
+                'start': ANY,
+                'finish': ANY,
             }
         ],
     }
@@ -78,11 +81,15 @@ def test_attach_evidence_for_tests_with_duplicated_ids(pytester: pytest.Pytester
                 ],
                 'status': 'PASS',
                 'testKey': 'JIRA-1',
+                'start': ANY,
+                'finish': ANY,
             },
             {
                 'evidences': [{'contentType': 'plain/text', 'data': 'SU5GTzogdGVzdA==', 'filename': 'test.log'}],
                 'status': 'PASS',
                 'testKey': 'JIRA-2',
+                'start': ANY,
+                'finish': ANY,
             },
         ],
     }
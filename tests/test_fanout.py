@@ -0,0 +1,153 @@
+import json
+import textwrap
+
+import pytest
+
+from pytest_xray.fanout import FanOutPublisher, PublishTarget
+from pytest_xray.file_publisher import FilePublisher
+from pytest_xray.helper import DEFAULT_SUMMARY_DESCRIPTION
+from pytest_xray.xray_publisher import EncodedTests, encode_results
+
+RESULTS = {
+    'info': {'summary': DEFAULT_SUMMARY_DESCRIPTION, 'testPlanKey': 'PLAN-1'},
+    'testExecutionKey': 'JIRA-10',
+    'tests': [{'testKey': 'JIRA-1', 'status': 'PASS'}],
+}
+
+
+def test_encode_results_with_shared_tests():
+    tests = EncodedTests(RESULTS['tests'])
+    assert json.loads(encode_results({**RESULTS, 'tests': tests})) == RESULTS
+    assert json.loads(encode_results({'tests': tests})) == {'tests': RESULTS['tests']}
+    assert tests.encode() is tests.encode()
+
+
+def test_target_results():
+    target = PublishTarget('new test execution', FilePublisher('xray.json'))
+    assert target.results(RESULTS) == {'info': {'summary': DEFAULT_SUMMARY_DESCRIPTION}, 'tests': RESULTS['tests']}
+
+    target = PublishTarget('JIRA-20', FilePublisher('xray.json'), 'JIRA-20', 'PLAN-2')
+    results = target.results({**RESULTS, 'info': {'summary': DEFAULT_SUMMARY_DESCRIPTION}})
+    assert results == {'info': {'testPlanKey': 'PLAN-2'}, 'testExecutionKey': 'JIRA-20', 'tests': RESULTS['tests']}
+    assert results['tests'] is RESULTS['tests']
+    assert RESULTS['info'] == {'summary': DEFAULT_SUMMARY_DESCRIPTION, 'testPlanKey': 'PLAN-1'}
+
+
+def test_publish_to_files(tmp_path):
+    targets = [
+        PublishTarget(str(tmp_path / f'{name}.json'), FilePublisher(str(tmp_path / f'{name}.json'))) for name in 'ab'
+    ]
+    publisher = FanOutPublisher(targets)
+    assert publisher.publish(RESULTS) == f'{tmp_path / "a.json"}, {tmp_path / "b.json"}'
+    for name in 'ab':
+        assert json.loads((tmp_path / f'{name}.json').read_text())['tests'] == RESULTS['tests']
+    assert publisher.metrics.payload_bytes > 0
+
+
+def test_publish_to_several_executions(xray_tests, xray_server):
+    result = xray_tests.runpytest(
+        '--jira-xray', '--execution=JIRA-10', '--execution=JIRA-20', '--testplan=PLAN-1', '--xray-archive=archive.json'
+    )
+    result.assert_outcomes(passed=2, failed=1)
+    result.stdout.fnmatch_lines(
+        [
+            '*Test Execution Id: JIRA-10, JIRA-20, archive.json*',
+            'Jira XRAY target JIRA-10: JIRA-10',
+            'Jira XRAY target JIRA-20: JIRA-20',
+            'Jira XRAY target archive.json: archive.json',
+        ]
+    )
+    requests = sorted(
+        (request.json() for request in xray_server.import_requests()), key=lambda data: data['testExecutionKey']
+    )
+    assert [(data['testExecutionKey'], data['info'].get('testPlanKey')) for data in requests] == [
+        ('JIRA-10', 'PLAN-1'),
+        ('JIRA-20', None),
+    ]
+    assert requests[0]['tests'] == requests[1]['tests']
+    archive = json.loads((xray_tests.path / 'archive.json').read_text())
+    assert archive['tests'] == requests[0]['tests']
+    assert archive['testExecutionKey'] == 'JIRA-10'
+
+
+@pytest.mark.parametrize('batch_size', [None, '2'])
+def test_trace_and_profile_of_targets(xray_tests, xray_server, batch_size):
+    options = ['--jira-xray', '--execution=JIRA-10', '--execution=JIRA-20', '--xray-archive=archive.json']
+    if batch_size:
+        options.append(f'--xray-batch-size={batch_size}')
+    result = xray_tests.runpytest(*options, '--xray-trace=trace.jsonl', '--xray-profile-json=profile.json')
+    result.assert_outcomes(passed=2, failed=1)
+
+    spans = [
+        span
+        for line in (xray_tests.path / 'trace.jsonl').read_text().splitlines()
+        for resource_spans in json.loads(line)['resourceSpans']
+        for scope_spans in resource_spans['scopeSpans']
+        for span in scope_spans['spans']
+    ]
+    [targets_span] = [span for span in spans if span['name'] == 'publish to targets']
+    requests = len(xray_server.import_requests())
+    assert requests == (2 if batch_size is None else 4)
+    post_spans = [span for span in spans if span['name'] == 'POST']
+    assert len(post_spans) == requests
+    write_spans = [span for span in spans if span['name'] == 'write file']
+    assert len(write_spans) == 1
+    for span in [*post_spans, *write_spans]:
+        assert span['parentSpanId'] == targets_span['spanId']
+    assert all(span['traceId'] == targets_span['traceId'] for span in spans)
+
+    profile = json.loads((xray_tests.path / 'profile.json').read_text())
+    assert profile['publish: HTTP request']['calls'] == requests
+    assert profile['publish: write file']['calls'] == 1
+
+
+def test_publish_batches_to_several_executions(xray_tests, xray_server):
+    xray_tests.makeconftest(
+        textwrap.dedent(
+            """\
+        def pytest_xray_batch_published(results, issue_id, session):
+            with open('published.txt', 'a') as file:
+                file.write(f"{issue_id}\\n")
+        """
+        )
+    )
+    result = xray_tests.runpytest(
+        '--jira-xray', '--testplan=PLAN-1', '--testplan=PLAN-2', '--xray-batch-size=2', '--xray-archive=archive.json'
+    )
+    result.assert_outcomes(passed=2, failed=1)
+    requests = [request.json() for request in xray_server.import_requests()]
+    assert len(requests) == 4
+    plans = {}
+    for data in requests:
+        plans.setdefault(data['info']['testPlanKey'], []).append(data)
+    for data in plans.values():
+        # the first batch creates the test execution, the second one is added to it
+        assert 'testExecutionKey' not in data[0]
+        assert data[1]['testExecutionKey'] in ('XRAY-1', 'XRAY-2')
+        assert [test['testKey'] for batch in data for test in batch['tests']] == ['JIRA-1', 'JIRA-2', 'JIRA-3']
+    archive = json.loads((xray_tests.path / 'archive.json').read_text())
+    assert [test['testKey'] for test in archive['tests']] == ['JIRA-1', 'JIRA-2', 'JIRA-3']
+    assert sorted((xray_tests.path / 'published.txt').read_text().split()) == sorted(
+        ['XRAY-1', 'XRAY-1', 'XRAY-2', 'XRAY-2', 'archive.json', 'archive.json']
+    )
+
+
+def test_publish_to_several_executions_fails(xray_tests, xray_server):
+    xray_server.fail_next(500)
+    result = xray_tests.runpytest('--jira-xray', '--execution=JIRA-10', '--execution=JIRA-20')
+    result.stdout.fnmatch_lines(
+        [
+            'Could not publish results to Jira XRAY!',
+            'Could not publish results to 1 of 2 targets: JIRA-*',
+            'Jira XRAY target JIRA-*: *',
+            'Jira XRAY target JIRA-*: *',
+        ]
+    )
+    assert len(xray_server.import_requests()) == 2
+    assert 'failed, HTTPError: Could not post to JIRA service' in result.stdout.str()
+
+
+def test_xraypath_with_several_executions(xray_tests):
+    result = xray_tests.runpytest('--jira-xray', '--xraypath=xray.json', '--execution=JIRA-10', '--execution=JIRA-20')
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines(['*--xraypath option stores results of a single test execution*'])
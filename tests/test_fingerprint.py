@@ -0,0 +1,74 @@
+import json
+import re
+import textwrap
+
+import pytest
+from _pytest.reports import TestReport
+
+from pytest_xray.fingerprint import get_failure_fingerprint, normalize_failure
+from pytest_xray.helper import COMMENT_PREFIX, COMMENT_SUFFIX
+
+
+def _report(longrepr: str) -> TestReport:
+    return TestReport('test_a.py::test_a', ('test_a.py', 1, 'test_a'), {}, 'failed', longrepr, 'call')
+
+
+def test_normalize_failure():
+    assert normalize_failure('<Session object at 0x7f2b69453470> in /tmp/pytest-117/x') == (
+        '<Session object at 0x?> in /tmp/pytest-?/x'
+    )
+    assert normalize_failure('Timeout after 30.5s, limit 10 seconds') == 'Timeout after ?s, limit ? seconds'
+    assert normalize_failure('assert 1 == 2') == 'assert 1 == 2'
+
+
+def test_fingerprint_of_text_failure():
+    assert get_failure_fingerprint(_report('Error at 0x1234')) == get_failure_fingerprint(_report('Error at 0xabcd'))
+    assert get_failure_fingerprint(_report('assert 1 == 2')) != get_failure_fingerprint(_report('assert 1 == 3'))
+    assert len(get_failure_fingerprint(_report('assert 1 == 2'))) == 12
+
+
+@pytest.mark.parametrize('extra_args', ['-n 0', '-n 2'], ids=['no_xdist', 'xdist'])
+def test_dedupe_failures(pytester, extra_args):
+    pytester.makepyfile(
+        textwrap.dedent(
+            """\
+        import pytest
+
+        def connect():
+            raise ConnectionError(f'Service {object()} is not available')
+
+        @pytest.mark.xray('JIRA-1')
+        def test_one():
+            connect()
+
+        @pytest.mark.xray('JIRA-2')
+        def test_two():
+            connect()
+
+        @pytest.mark.xray('JIRA-3')
+        def test_other():
+            assert False
+        """
+        )
+    )
+    report_file = pytester.path / 'xray.json'
+    result = pytester.runpytest(
+        '--jira-xray', '--xray-dedupe-failures', f'--xraypath={report_file}', *extra_args.split()
+    )
+    result.assert_outcomes(failed=3)
+
+    comments = {
+        test['testKey']: test['comment'].removeprefix(COMMENT_PREFIX).removesuffix(COMMENT_SUFFIX)
+        for test in json.loads(report_file.read_text())['tests']
+    }
+    # with xdist, any of the tests can fail first
+    first, second = sorted(['JIRA-1', 'JIRA-2'], key=lambda key: 'def connect():' not in comments[key])
+    assert 'def connect():' not in comments[second]
+    fingerprint = comments[first].rsplit('\nFailure fingerprint: ', 1)[1]
+    assert len(fingerprint) == 12
+    first_node_id = 'test_dedupe_failures.py::test_one' if first == 'JIRA-1' else 'test_dedupe_failures.py::test_two'
+    reference, log = comments[second].split('\n')
+    assert reference == f'Failure fingerprint: {fingerprint}, same failure as in {first} ({first_node_id}):'
+    assert re.fullmatch(r'ConnectionError: Service <object object at 0x[0-9a-f]+> is not available', log)
+    assert 'assert False' in comments['JIRA-3']
+    assert fingerprint not in comments['JIRA-3']
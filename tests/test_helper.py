@@ -1,6 +1,8 @@
+import datetime as dt
+
 import pytest
 
-from pytest_xray.helper import STATUS_STR_MAPPER_CLOUD, Status, TestCase, TestExecution
+from pytest_xray.helper import STATUS_STR_MAPPER_CLOUD, Iteration, Status, TestCase, TestExecution
 
 
 @pytest.mark.parametrize(
@@ -41,6 +43,23 @@ def test_merge_test_cases():
         t1.merge(t3)
 
 
+def test_merge_test_case_start_and_finish():
+    start = dt.datetime(2024, 1, 1, 10, 0, 0, tzinfo=dt.timezone.utc)
+    t1 = TestCase('JIRA-1', Status.PASS, start=start, finish=start + dt.timedelta(seconds=5))
+    t2 = TestCase('JIRA-1', Status.PASS, start=start - dt.timedelta(seconds=3), finish=start + dt.timedelta(seconds=1))
+    t1.merge(t2)
+    t1.merge(TestCase('JIRA-1', Status.PASS))
+
+    data = t1.as_dict()
+    assert data['start'] == '2024-01-01T09:59:57+0000'
+    assert data['finish'] == '2024-01-01T10:00:05+0000'
+    assert TestCase.from_dict(data).start == t1.start
+
+
+def test_test_case_without_start_and_finish():
+    assert 'start' not in TestCase('JIRA-1', Status.PASS).as_dict()
+
+
 def test_find_test_case():
     execution = TestExecution()
     execution.append(TestCase('JIRA-1', Status.PASS, ''))
@@ -54,3 +73,20 @@ def test_find_test_case():
 
     with pytest.raises(KeyError):
         execution.find_test_case('JIRA-42')
+
+
+def test_merge_iterations():
+    t1 = TestCase('JIRA-1', Status.PASS, iterations=[Iteration('test[1]', Status.PASS, [('value', '1')])])
+    t2 = TestCase('JIRA-1', Status.FAIL, iterations=[Iteration('test[2]', Status.FAIL, [('value', '2')], 'error')])
+    t3 = TestCase('JIRA-1', Status.FAIL, iterations=[Iteration('test[1]', Status.FAIL, log='teardown error')])
+    t1.merge(t2)
+    t1.merge(t3)
+
+    assert t1.status == Status.FAIL
+    assert t1.comment == ''
+    data = t1.as_dict()
+    assert data['iterations'] == [
+        {'name': 'test[1]', 'parameters': [{'name': 'value', 'value': '1'}], 'status': 'FAIL', 'log': 'teardown error'},
+        {'name': 'test[2]', 'parameters': [{'name': 'value', 'value': '2'}], 'status': 'FAIL', 'log': 'error'},
+    ]
+    assert TestCase.from_dict(data).as_dict() == data
@@ -0,0 +1,86 @@
+import json
+
+import pytest
+
+from pytest_xray.helper import Status
+from pytest_xray.history import XrayHistory
+
+XRAY_TESTS = """\
+import time
+import pytest
+
+@pytest.mark.xray('JIRA-1')
+def test_slow():
+    time.sleep(0.1)
+
+@pytest.mark.xray('JIRA-2')
+@pytest.mark.parametrize('value', [1, 2])
+def test_fail(value):
+    assert value == 1
+
+@pytest.mark.xray('JIRA-3')
+def test_fast():
+    assert True
+
+def test_without_key():
+    assert True
+"""
+
+
+def test_history_keeps_only_recent_results():
+    history = XrayHistory(size=2)
+    history.record('JIRA-1', Status.FAIL, 3.0)
+    history.record('JIRA-1', Status.PASS, 1.0)
+    history.record('JIRA-1', Status.PASS, 2.0)
+
+    assert history.data == {'JIRA-1': [['PASS', 'PASS'], [1.0, 2.0]]}
+    assert history.duration('JIRA-1') == 1.5
+    assert history.duration('JIRA-2') is None
+
+
+def test_history_failure_score():
+    history = XrayHistory()
+    for status in (Status.FAIL, Status.PASS):
+        history.record('JIRA-1', status, 0.1)
+    for status in (Status.PASS, Status.ABORTED):
+        history.record('JIRA-2', status, 0.1)
+    history.record('JIRA-3', Status.PASS, 0.1)
+
+    assert history.failure_score('JIRA-2') > history.failure_score('JIRA-1') > history.failure_score('JIRA-3')
+    assert history.failure_score('JIRA-4') == 0.0
+
+
+def _executed_tests(result: pytest.RunResult) -> list[str]:
+    return [line.split('::')[1].split(' ')[0] for line in result.outlines if line.endswith('%]')]
+
+
+def test_history_is_stored_in_cache(xray_tests):
+    xray_tests.runpytest('--jira-xray', '--xraypath=xray.json', '--allow-duplicate-ids')
+    history_file = xray_tests.path / '.pytest_cache' / 'd' / 'pytest_xray' / 'history.json'
+    assert '\n' not in history_file.read_text()
+    history = json.loads(history_file.read_text())
+    assert set(history) == {'JIRA-1', 'JIRA-2', 'JIRA-3'}
+    assert history['JIRA-2'][0] == ['FAIL']
+    assert history['JIRA-1'][1][0] >= 0.1
+
+
+def test_order_failed_first(xray_tests):
+    xray_tests.runpytest('--jira-xray', '--xraypath=xray.json', '--allow-duplicate-ids')
+    result = xray_tests.runpytest('--xray-order=failed-first', '--allow-duplicate-ids', '-v')
+    assert _executed_tests(result) == ['test_fail[1]', 'test_fail[2]', 'test_slow', 'test_fast', 'test_without_key']
+
+
+def test_order_fast_first(xray_tests):
+    xray_tests.runpytest('--jira-xray', '--xraypath=xray.json', '--allow-duplicate-ids')
+    result = xray_tests.runpytest('--xray-order=fast-first', '--allow-duplicate-ids', '-v')
+    assert _executed_tests(result)[-1] == 'test_slow'
+    assert _executed_tests(result)[0] == 'test_without_key'
+
+
+def test_history_is_loaded_once(xray_tests, monkeypatch):
+    loads = []
+    load = XrayHistory.load.__func__  # type: ignore[attr-defined]
+    monkeypatch.setattr(XrayHistory, 'load', classmethod(lambda cls, config: loads.append(config) or load(cls, config)))
+    args = ('--jira-xray', '--xraypath=xray.json', '--allow-duplicate-ids', '--xray-slow-threshold=2')
+    xray_tests.runpytest_inprocess(*args, '--xray-order=failed-first')
+    assert len(loads) == 1
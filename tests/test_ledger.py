@@ -0,0 +1,93 @@
+import json
+import textwrap
+
+import pytest
+
+from pytest_xray.ledger import PublishLedger, get_payload_fingerprint, parse_ignored_fields
+
+URL = 'https://jira.example.com/rest/raven/2.0/import/execution'
+
+RESULTS = {
+    'info': {'summary': 'Nightly', 'startDate': '2024-01-01T10:00:00+0000'},
+    'tests': [
+        {'testKey': 'JIRA-1', 'status': 'PASS', 'start': '2024-01-01T10:00:00+0000'},
+        {'testKey': 'JIRA-2', 'status': 'FAIL', 'start': '2024-01-01T10:00:01+0000'},
+    ],
+}
+
+
+def test_parse_ignored_fields():
+    assert parse_ignored_fields('info.startDate, tests.start') == ['info.startDate', 'tests.start']
+    with pytest.raises(Exception, match='expected comma separated fields'):
+        parse_ignored_fields(' , ')
+
+
+def test_payload_fingerprint():
+    fingerprint = get_payload_fingerprint(URL, RESULTS)
+    reordered = {'tests': RESULTS['tests'], 'info': dict(reversed(list(RESULTS['info'].items())))}
+    assert get_payload_fingerprint(URL, reordered) == fingerprint
+    assert get_payload_fingerprint(URL + '/', RESULTS) != fingerprint
+
+    changed = json.loads(json.dumps(RESULTS))
+    changed['info']['startDate'] = '2024-01-02T10:00:00+0000'
+    changed['tests'][1]['start'] = '2024-01-02T10:00:01+0000'
+    assert get_payload_fingerprint(URL, changed) != fingerprint
+    ignored = ['info.startDate', 'tests.start']
+    assert get_payload_fingerprint(URL, changed, ignored) == get_payload_fingerprint(URL, RESULTS, ignored)
+    changed['tests'][1]['status'] = 'PASS'
+    assert get_payload_fingerprint(URL, changed, ignored) != get_payload_fingerprint(URL, RESULTS, ignored)
+    assert RESULTS['info']['startDate'] == '2024-01-01T10:00:00+0000'
+
+
+def test_ledger_records_keys(tmp_path):
+    path = tmp_path / 'ledger' / 'xray.jsonl'
+    ledger = PublishLedger(str(path))
+    assert ledger.get('abc') is None
+    ledger.record('abc', 'JIRA-10')
+    assert ledger.get('abc') == 'JIRA-10'
+
+    with open(path, 'a') as file:
+        file.write('{"fingerprint": "def", "ke')  # interrupted write
+    ledger = PublishLedger(str(path))
+    assert ledger.get('abc') == 'JIRA-10'
+    assert ledger.get('def') is None
+
+
+@pytest.mark.parametrize('batch_size', [None, '2'])
+def test_publish_with_ledger(xray_tests, xray_server, batch_size):
+    options = [
+        '--jira-xray',
+        '--xray-ledger=ledger.jsonl',
+        '--xray-ledger-ignore=info.startDate,info.finishDate,tests.start,tests.finish',
+    ]
+    if batch_size:
+        options.append(f'--xray-batch-size={batch_size}')
+    result = xray_tests.runpytest(*options)
+    result.assert_outcomes(passed=2, failed=1)
+    result.stdout.fnmatch_lines(['*Uploaded results to JIRA XRAY. Test Execution Id: XRAY-1*'])
+    requests = len(xray_server.import_requests())
+    assert requests == (1 if batch_size is None else 2)
+
+    # the same results of a rerun are not uploaded again
+    result = xray_tests.runpytest(*options)
+    result.assert_outcomes(passed=2, failed=1)
+    result.stdout.fnmatch_lines(
+        [
+            '*Results were already uploaded to JIRA XRAY. Test Execution Id: XRAY-1*',
+            f'Jira XRAY metrics: *, {requests} skipped as already published*',
+        ]
+    )
+    assert len(xray_server.import_requests()) == requests
+
+    # changed results are uploaded
+    xray_tests.makeconftest(
+        textwrap.dedent(
+            """\
+        def pytest_xray_results(results, session):
+            results['info']['summary'] = 'Changed'
+        """
+        )
+    )
+    result = xray_tests.runpytest(*options)
+    result.stdout.fnmatch_lines(['*Uploaded results to JIRA XRAY. Test Execution Id: XRAY-2*'])
+    assert len(xray_server.import_requests()) == 2 * requests
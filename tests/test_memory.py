@@ -0,0 +1,67 @@
+import json
+
+from pytest_xray.helper import Status, TestCase
+from pytest_xray.memory import CATEGORIES, MemoryTracker, NullMemoryTracker
+
+XRAY_CONFTEST = """\
+import pytest
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    if report.when == 'call' and report.failed:
+        report.evidences = [{'data': 'x' * 100000, 'filename': 'data.txt', 'contentType': 'text/plain'}]
+"""
+
+XRAY_TESTS = """\
+import pytest
+
+@pytest.mark.xray('JIRA-1', defects=['BUG-1'])
+def test_fail():
+    assert 0 == 1
+
+@pytest.mark.xray('JIRA-2')
+def test_pass():
+    pass
+"""
+
+
+def test_memory_tracker_accounts_merged_test_cases():
+    tracker = MemoryTracker()
+    test_case = TestCase('JIRA-1', Status.PASS, comment='a')
+    tracker.update(test_case)
+    size = tracker.totals()['comment']
+
+    test_case.merge(TestCase('JIRA-1', Status.FAIL, comment='b' * 1000))
+    tracker.update(test_case)
+    tracker.update(TestCase('JIRA-2', Status.PASS))
+
+    assert tracker.totals()['comment'] > size + 1000
+    assert [test_key for test_key, _ in tracker.top(1)] == ['JIRA-1']
+    data = tracker.as_dict()
+    assert data['keys'] == 2
+    assert data['total_bytes'] == sum(data['categories'].values())
+    assert set(data['top_keys'][0]) == {'key', *CATEGORIES}
+
+
+def test_null_memory_tracker_does_not_account():
+    tracker = NullMemoryTracker()
+    tracker.update(TestCase('JIRA-1', Status.PASS))
+    assert tracker.as_dict()['keys'] == 0
+
+
+def test_memory_summary_and_json(xray_tests):
+    memory_file = xray_tests.path / 'memory.json'
+    result = xray_tests.runpytest('--jira-xray', '--xraypath=xray.json', f'--xray-memory-json={memory_file}')
+    result.stdout.fnmatch_lines(['*- Jira XRAY memory -*', 'category*bytes', 'evidences*', 'key*total*', 'JIRA-1 *'])
+    data = json.loads(memory_file.read_text())
+    assert data['keys'] == 2
+    assert data['categories']['evidences'] > 100000
+    assert data['categories']['defects'] > 0
+    assert data['top_keys'][0]['key'] == 'JIRA-1'
+
+
+def test_memory_report_disabled(xray_tests):
+    result = xray_tests.runpytest('--jira-xray', '--xraypath=xray.json')
+    result.stdout.no_fnmatch_line('*Jira XRAY memory*')
@@ -0,0 +1,105 @@
+import json
+
+import pytest
+
+from pytest_xray.merge import main
+
+
+def _report(start_date, finish_date, tests, **info):
+    return {'info': {'startDate': start_date, 'finishDate': finish_date, **info}, 'tests': tests}
+
+
+@pytest.fixture
+def shard_files(tmp_path):
+    reports = [
+        _report(
+            '2024-01-01T10:00:00+0000',
+            '2024-01-01T10:30:00+0000',
+            [
+                {'testKey': 'JIRA-1', 'status': 'PASS'},
+                {
+                    'testKey': 'JIRA-2',
+                    'status': 'FAIL',
+                    'comment': '{noformat:borderWidth=0px|bgColor=transparent}error 1{noformat}',
+                    'defects': ['BUG-1'],
+                },
+            ],
+            summary='Nightly run',
+        ),
+        _report(
+            '2024-01-01T09:55:00+0000',
+            '2024-01-01T10:20:00+0000',
+            [
+                {
+                    'testKey': 'JIRA-2',
+                    'status': 'PASS',
+                    'comment': '{noformat:borderWidth=0px|bgColor=transparent}output 2{noformat}',
+                    'defects': ['BUG-1', 'BUG-2'],
+                },
+                {'testKey': 'JIRA-3', 'status': 'ABORTED'},
+            ],
+        ),
+        _report('2024-01-01T10:00:00+0000', '2024-01-01T10:45:00+0000', [{'testKey': 'JIRA-4', 'status': 'PASS'}]),
+    ]
+    paths = []
+    for index, report in enumerate(reports):
+        path = tmp_path / f'xray-{index}.json'
+        path.write_text(json.dumps(report))
+        paths.append(str(path))
+    return paths
+
+
+def test_merge_reports_to_file(shard_files, tmp_path, capsys):
+    output = tmp_path / 'merged.json'
+    assert main([*shard_files, '--output', str(output)]) == 0
+    assert 'Generated XRAY execution report file' in capsys.readouterr().out
+    assert json.loads(output.read_text()) == {
+        'info': {
+            'startDate': '2024-01-01T09:55:00+0000',
+            'finishDate': '2024-01-01T10:45:00+0000',
+            'summary': 'Nightly run',
+        },
+        'tests': [
+            {'testKey': 'JIRA-1', 'status': 'PASS'},
+            {
+                'testKey': 'JIRA-2',
+                'status': 'FAIL',
+                'comment': '{noformat:borderWidth=0px|bgColor=transparent}error 1\n'
+                + '-' * 80
+                + '\noutput 2{noformat}',
+                'defects': ['BUG-1', 'BUG-2'],
+            },
+            {'testKey': 'JIRA-3', 'status': 'ABORTED'},
+            {'testKey': 'JIRA-4', 'status': 'PASS'},
+        ],
+    }
+
+
+def test_merge_reports_converts_statuses_for_cloud(shard_files, tmp_path):
+    output = tmp_path / 'merged.json'
+    assert main([*shard_files, '--output', str(output), '--cloud', '--execution', 'JIRA-10']) == 0
+    data = json.loads(output.read_text())
+    assert data['testExecutionKey'] == 'JIRA-10'
+    assert [test['status'] for test in data['tests']] == ['PASSED', 'FAILED', 'ABORTED', 'PASSED']
+
+
+def test_merge_and_upload_reports(shard_files, fake_xray_server, httpserver, capsys):
+    assert main([*shard_files, '--upload']) == 0
+    assert 'Uploaded results to JIRA XRAY. Test Execution Id: 1000' in capsys.readouterr().out
+    request, _ = httpserver.log[0]
+    assert len(request.json['tests']) == 4
+
+
+def test_merge_reports_from_missing_file(tmp_path, capsys):
+    assert main([str(tmp_path / 'missing.json'), '--output', str(tmp_path / 'merged.json')]) == 1
+    assert 'Cannot read Xray report' in capsys.readouterr().err
+
+
+def test_merge_and_upload_reports_with_ledger(shard_files, fake_xray_server, httpserver, tmp_path, capsys):
+    ledger = str(tmp_path / 'ledger.jsonl')
+    assert main([*shard_files, '--upload', '--xray-ledger', ledger]) == 0
+    assert 'Uploaded results to JIRA XRAY. Test Execution Id: 1000' in capsys.readouterr().out
+    # retried upload of the same reports is skipped
+    assert main([*shard_files, '--upload', '--xray-ledger', ledger]) == 0
+    assert 'Results were already uploaded to JIRA XRAY. Test Execution Id: 1000' in capsys.readouterr().out
+    assert len(httpserver.log) == 1
@@ -0,0 +1,86 @@
+import json
+
+import pytest
+
+from pytest_xray.metrics import PublishMetrics
+
+XRAY_CONFTEST = """\
+import json
+
+def pytest_xray_publish_metrics(metrics, session):
+    with open('metrics.json', 'w') as file:
+        json.dump(metrics, file)
+"""
+
+XRAY_TESTS = """\
+import pytest
+
+@pytest.mark.xray(['JIRA-1', 'JIRA-2'])
+def test_fail():
+    assert 0 == 1
+
+@pytest.mark.xray('JIRA-3')
+def test_pass():
+    pass
+
+def test_no_key():
+    pass
+"""
+
+
+def test_publish_metrics_as_dict():
+    metrics = PublishMetrics()
+    for latency in (0.3, 0.1, 0.2, 0.4):
+        metrics.add_request(latency)
+    metrics.payload_bytes = 1000
+    metrics.add_results({'tests': [{'testKey': 'JIRA-1', 'evidences': [{'data': 'abcd'}]}, {'testKey': 'JIRA-2'}]})
+
+    data = metrics.as_dict()
+    assert data['keys'] == 2
+    assert data['evidence_bytes'] == 4
+    assert data['requests'] == 4
+    assert data['latency_p50_s'] == 0.2
+    assert data['latency_p99_s'] == data['latency_max_s'] == 0.4
+    assert data['throughput_bytes_per_s'] == pytest.approx(1000)
+    assert '4 requests' in metrics.summary_line()
+
+
+def test_publish_metrics_without_requests():
+    metrics = PublishMetrics()
+    data = metrics.as_dict()
+    assert data['latency_p50_s'] is None
+    assert data['throughput_bytes_per_s'] is None
+    assert metrics.summary_line() == '0 tests, 0 keys, payload 0 B, evidences 0 B'
+
+
+def test_metrics_with_file_publisher(xray_tests):
+    result = xray_tests.runpytest('--jira-xray', '--xraypath=xray.json')
+    result.stdout.fnmatch_lines(['Jira XRAY metrics: 2 tests, 3 keys, payload *, evidences 0 B'])
+    metrics = json.loads((xray_tests.path / 'metrics.json').read_text())
+    assert metrics['payload_bytes'] == (xray_tests.path / 'xray.json').stat().st_size
+    assert metrics['requests'] == 0
+
+
+def test_metrics_with_server(xray_tests, xray_server):
+    result = xray_tests.runpytest('--jira-xray', '--cloud', '--client-secret-auth')
+    result.stdout.fnmatch_lines(['Jira XRAY metrics: 2 tests, 3 keys, payload * (* gzip), * 1 requests, 1 auth*'])
+    metrics = json.loads((xray_tests.path / 'metrics.json').read_text())
+    assert metrics['payload_bytes'] == len(xray_server.import_requests()[0].body)
+    assert 0 < metrics['compressed_bytes'] < metrics['payload_bytes']
+    assert metrics['latency_max_s'] > 0
+
+
+def test_metrics_without_hook_do_not_estimate_compression(xray_tests, xray_server):
+    (xray_tests.path / 'conftest.py').unlink()
+    result = xray_tests.runpytest('--jira-xray')
+    result.stdout.fnmatch_lines(['Jira XRAY metrics: 2 tests, 3 keys, payload *, 1 requests, 0 auth*'])
+    assert 'gzip' not in result.stdout.str()
+
+
+def test_metrics_hook_called_on_publish_error(xray_tests, xray_server):
+    xray_server.fail_next(500)
+    result = xray_tests.runpytest('--jira-xray')
+    result.stdout.fnmatch_lines(['Could not publish results to Jira XRAY!', '*Jira XRAY metrics: 2 tests, 3 keys*'])
+    metrics = json.loads((xray_tests.path / 'metrics.json').read_text())
+    assert metrics['keys'] == 3
+    assert metrics['requests'] == 1
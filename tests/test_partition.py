@@ -0,0 +1,144 @@
+import json
+import textwrap
+
+import pytest
+
+from pytest_xray.partition import parse_project_keys, partition_tests
+
+XRAY_TESTS = """\
+import pytest
+
+@pytest.mark.xray('ABC-1')
+def test_pass():
+    pass
+
+@pytest.mark.xray('XYZ-9')
+def test_fail():
+    assert False
+
+@pytest.mark.xray('ABC-2')
+def test_another_pass():
+    pass
+
+@pytest.mark.xray('MY_PROJECT-3')
+def test_skip():
+    pytest.skip()
+"""
+
+
+def _by_project(requests: list[dict]) -> dict[str, list[dict]]:
+    projects: dict[str, list[dict]] = {}
+    for data in requests:
+        projects.setdefault(data['tests'][0]['testKey'].rsplit('-', 1)[0], []).append(data)
+    return projects
+
+
+def test_parse_project_keys():
+    assert parse_project_keys('ABC=ABC-10') == ('ABC', 'ABC-10', None)
+    assert parse_project_keys('ABC=:ABC-20') == ('ABC', None, 'ABC-20')
+    assert parse_project_keys('ABC=ABC-10:ABC-20') == ('ABC', 'ABC-10', 'ABC-20')
+    with pytest.raises(Exception, match='expected PROJECT=EXECUTION'):
+        parse_project_keys('ABC-10')
+    with pytest.raises(Exception, match='expected PROJECT=EXECUTION'):
+        parse_project_keys('1ABC=ABC-10')
+
+
+def test_partition_tests():
+    tests = [{'testKey': 'XYZ-9'}, {'testKey': 'ABC-1'}, {'testKey': 'MY-PROJECT-2'}, {'testKey': 'XYZ-1'}]
+    assert partition_tests(tests) == {
+        'XYZ': [{'testKey': 'XYZ-9'}, {'testKey': 'XYZ-1'}],
+        'ABC': [{'testKey': 'ABC-1'}],
+        'MY-PROJECT': [{'testKey': 'MY-PROJECT-2'}],
+    }
+
+
+@pytest.mark.parametrize('batch_size', [None, '1'])
+def test_publish_per_project(xray_tests, xray_server, batch_size):
+    options = [
+        '--jira-xray',
+        '--xray-warm-up',
+        '--xray-per-project',
+        '--xray-project=XYZ=XYZ-100',
+        '--xray-project=ABC=:ABC-200',
+    ]
+    if batch_size:
+        options.append(f'--xray-batch-size={batch_size}')
+    result = xray_tests.runpytest(*options)
+    result.assert_outcomes(passed=2, failed=1, skipped=1)
+    result.stdout.fnmatch_lines_random(
+        [
+            'Jira XRAY target project ABC: XRAY-*',
+            'Jira XRAY target project XYZ: XYZ-100',
+            'Jira XRAY target project MY_PROJECT: XRAY-*',
+        ]
+    )
+
+    projects = _by_project([request.json() for request in xray_server.import_requests()])
+    assert sorted(projects) == ['ABC', 'MY_PROJECT', 'XYZ']
+    abc = projects['ABC']
+    assert [test['testKey'] for data in abc for test in data['tests']] == ['ABC-1', 'ABC-2']
+    assert all(data['info']['testPlanKey'] == 'ABC-200' for data in abc)
+    assert [data['testExecutionKey'] for data in projects['XYZ']] == ['XYZ-100']
+    assert 'testPlanKey' not in projects['XYZ'][0]['info']
+    assert 'testExecutionKey' not in projects['MY_PROJECT'][0]
+    if batch_size:
+        # the second batch of a project is added to the test execution created by the first one
+        assert 'testExecutionKey' not in abc[0]
+        assert abc[1]['testExecutionKey'].startswith('XRAY-')
+    else:
+        assert len(abc) == 1
+
+
+def test_trace_of_projects(xray_tests, xray_server):
+    result = xray_tests.runpytest('--jira-xray', '--xray-per-project', '--xray-trace=trace.jsonl')
+    result.assert_outcomes(passed=2, failed=1, skipped=1)
+
+    spans = [
+        span
+        for line in (xray_tests.path / 'trace.jsonl').read_text().splitlines()
+        for resource_spans in json.loads(line)['resourceSpans']
+        for scope_spans in resource_spans['scopeSpans']
+        for span in scope_spans['spans']
+    ]
+    [targets_span] = [span for span in spans if span['name'] == 'publish to targets']
+    post_spans = [span for span in spans if span['name'] == 'POST']
+    assert len(post_spans) == 3
+    assert all(span['parentSpanId'] == targets_span['spanId'] for span in post_spans)
+
+
+def test_publish_per_project_fails(xray_tests, xray_server):
+    xray_server.fail_next(500)
+    result = xray_tests.runpytest('--jira-xray', '--xray-per-project')
+    result.stdout.fnmatch_lines(
+        [
+            'Could not publish results to Jira XRAY!',
+            'Could not publish results to 1 of 3 targets: project *',
+        ]
+    )
+    assert result.stdout.str().count('Jira XRAY target project ') == 3
+
+
+@pytest.mark.parametrize('batch_size', [None, '1'])
+def test_publish_per_project_without_keys(pytester, xray_server, batch_size):
+    pytester.makepyfile(
+        textwrap.dedent(
+            """\
+        def test_pass():
+            pass
+        """
+        )
+    )
+    options = ['--jira-xray', '--xray-per-project']
+    if batch_size:
+        options.append(f'--xray-batch-size={batch_size}')
+    result = pytester.runpytest(*options)
+    result.assert_outcomes(passed=1)
+    result.stdout.fnmatch_lines(['Could not publish results to Jira XRAY!', 'No results to publish'])
+    assert 'INTERNALERROR' not in result.stdout.str()
+    assert xray_server.import_requests() == []
+
+
+def test_per_project_with_execution(xray_tests):
+    result = xray_tests.runpytest('--jira-xray', '--xray-project=ABC=ABC-10', '--execution=ABC-20')
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines(['*--xray-per-project option cannot be combined with --execution*'])
@@ -0,0 +1,71 @@
+import json
+import threading
+
+from pytest_xray.profiler import NullProfiler, Profiler
+
+XRAY_TESTS = """\
+import pytest
+
+@pytest.mark.xray(['JIRA-1', 'JIRA-2'])
+def test_fail():
+    assert 0 == 1
+"""
+
+
+def test_profiler_collects_phases():
+    profiler = Profiler()
+    for _ in range(3):
+        with profiler.measure('phase'):
+            pass
+    profiler.add('other', 2.0)
+
+    phases = profiler.as_dict()
+    assert phases['phase']['calls'] == 3
+    assert phases['other'] == {'calls': 1, 'total_s': 2.0, 'mean_us': 2000000.0}
+    assert profiler.summary_lines()[1].startswith('other ')
+
+
+def test_profiler_collects_phases_of_threads():
+    profiler = Profiler()
+
+    def measure() -> None:
+        for _ in range(10000):
+            profiler.add('phase', 0.001)
+
+    threads = [threading.Thread(target=measure) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert profiler.as_dict()['phase']['calls'] == 80000
+    assert profiler.as_dict()['phase']['total_s'] == 80.0
+
+
+def test_null_profiler_does_not_collect_phases():
+    profiler = NullProfiler()
+    with profiler.measure('phase'):
+        pass
+    assert profiler.as_dict() == {}
+
+
+def test_profile_summary_and_json(xray_tests):
+    profile_file = xray_tests.path / 'profile.json'
+    result = xray_tests.runpytest(
+        '--jira-xray', '--xraypath=xray.json', '--xray-profile', f'--xray-profile-json={profile_file}'
+    )
+    result.stdout.fnmatch_lines(
+        [
+            '*- Jira XRAY profile -*',
+            'phase*calls*total ?s?*mean ?us?',
+            'hook: pytest_runtest_logreport*3*',
+        ]
+    )
+    phases = json.loads(profile_file.read_text())
+    assert phases['hook: pytest_runtest_makereport']['calls'] == 3
+    assert {'publish: as_dict', 'publish: write file', 'publish: total'} <= set(phases)
+
+
+def test_profile_is_disabled_by_default(xray_tests):
+    result = xray_tests.runpytest('--jira-xray', '--xraypath=xray.json')
+    assert 'Jira XRAY profile' not in result.stdout.str()
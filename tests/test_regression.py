@@ -0,0 +1,102 @@
+import argparse
+import json
+
+import pytest
+
+from pytest_xray.helper import Status
+from pytest_xray.history import XrayHistory
+from pytest_xray.regression import find_regressions, parse_threshold
+
+XRAY_TESTS = """\
+import os
+import time
+import pytest
+
+@pytest.mark.xray('JIRA-1')
+def test_slow():
+    time.sleep(float(os.environ.get('TEST_DELAY', '0')))
+
+@pytest.mark.xray('JIRA-2')
+def test_fast():
+    pass
+"""
+
+
+def test_find_regressions_with_baseline():
+    durations = {'JIRA-1': 3.0, 'JIRA-2': 1.2, 'JIRA-3': 0.05, 'JIRA-4': 1.0, 'JIRA-5': 2.0}
+    baseline = {'JIRA-1': 1.0, 'JIRA-2': 1.0, 'JIRA-3': 0.01, 'JIRA-5': 1.0}
+    regressions = find_regressions(durations, 1.5, baseline)
+    assert [(regression.test_key, regression.ratio) for regression in regressions] == [('JIRA-1', 3.0), ('JIRA-5', 2.0)]
+    assert str(regressions[0]) == '3.00s, baseline 1.00s (3.00x)'
+
+
+def test_find_regressions_with_history():
+    history = XrayHistory()
+    for duration in (1.0, 2.0):
+        history.record('JIRA-1', Status.PASS, duration)
+    assert [regression.baseline for regression in find_regressions({'JIRA-1': 3.0}, 1.5, history=history)] == [1.5]
+    assert find_regressions({'JIRA-1': 3.0}, 1.5) == []
+
+
+def test_parse_threshold():
+    assert parse_threshold('1.5') == 1.5
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_threshold('1')
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_threshold('fast')
+
+
+def test_regression_from_baseline_file(xray_tests, monkeypatch):
+    baseline_file = xray_tests.path / 'baseline.json'
+    result = xray_tests.runpytest('--jira-xray', '--xraypath=xray.json', f'--xray-save-baseline={baseline_file}')
+    result.assert_outcomes(passed=2)
+    assert set(json.loads(baseline_file.read_text())) == {'JIRA-1', 'JIRA-2'}
+
+    monkeypatch.setenv('TEST_DELAY', '0.3')
+    result = xray_tests.runpytest(
+        '--jira-xray',
+        '--xraypath=xray.json',
+        f'--xray-baseline={baseline_file}',
+        '--xray-slow-threshold=1.5',
+        '--xray-slow-comment',
+    )
+    result.stdout.fnmatch_lines(['*- Jira XRAY slow tests -*', 'JIRA-1: *s, baseline *s (*x)'])
+    result.stdout.no_fnmatch_line('JIRA-2: *')
+    tests = {test['testKey']: test for test in json.loads((xray_tests.path / 'xray.json').read_text())['tests']}
+    assert 'Duration regression: ' in tests['JIRA-1']['comment']
+    assert 'comment' not in tests['JIRA-2']
+
+
+def test_regression_from_history(xray_tests, monkeypatch):
+    xray_tests.runpytest('--jira-xray', '--xraypath=xray.json')
+    monkeypatch.setenv('TEST_DELAY', '0.3')
+    result = xray_tests.runpytest('--jira-xray', '--xraypath=xray.json', '--xray-slow-threshold=2')
+    result.stdout.fnmatch_lines(['*- Jira XRAY slow tests -*', 'JIRA-1: *'])
+    tests = json.loads((xray_tests.path / 'xray.json').read_text())['tests']
+    assert all('comment' not in test for test in tests)
+
+
+def test_missing_baseline_file(xray_tests):
+    result = xray_tests.runpytest('--jira-xray', '--xraypath=xray.json', '--xray-baseline=missing.json')
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines(['*Cannot read Xray baseline file "missing.json"*'])
+    assert 'INTERNALERROR' not in result.stdout.str()
+
+
+@pytest.mark.parametrize('content', ['{"JIRA-1": ', '["JIRA-1"]'], ids=['invalid_json', 'not_durations'])
+def test_corrupt_baseline_file(xray_tests, content):
+    (xray_tests.path / 'baseline.json').write_text(content)
+    result = xray_tests.runpytest('--jira-xray', '--xraypath=xray.json', '--xray-baseline=baseline.json')
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines(['*Cannot parse Xray baseline file "baseline.json"*'])
+
+
+def test_unwritable_baseline_file(xray_tests):
+    (xray_tests.path / 'baseline').write_text('')
+    result = xray_tests.runpytest('--jira-xray', '--xraypath=xray.json', '--xray-save-baseline=baseline/durations.json')
+    assert result.ret == 0
+    assert 'INTERNALERROR' not in result.stdout.str()
+    result.stdout.fnmatch_lines(
+        ['*Generated XRAY execution report file*', 'Could not save Jira XRAY baseline! Cannot write Xray baseline*']
+    )
+    assert (xray_tests.path / 'xray.json').exists()
@@ -0,0 +1,192 @@
+import argparse
+import json
+import textwrap
+
+import pytest
+
+from pytest_xray.exceptions import XrayError
+from pytest_xray.selection import parse_keys, parse_shard, read_keys_file
+
+XRAY_TESTS = """\
+import pytest
+
+@pytest.mark.xray('JIRA-1')
+def test_one():
+    assert True
+
+@pytest.mark.xray(['JIRA-2', 'JIRA-3'])
+def test_two():
+    assert True
+
+@pytest.mark.xray('JIRA-4')
+@pytest.mark.parametrize('value', [1, 2, 3])
+def test_four(value):
+    assert True
+
+def test_without_key():
+    assert True
+"""
+
+
+def test_parse_keys():
+    assert parse_keys('JIRA-1, JIRA-2,JIRA-3 JIRA-4,,') == {'JIRA-1', 'JIRA-2', 'JIRA-3', 'JIRA-4'}
+
+
+def test_read_keys_from_text_file(tmp_path):
+    keys_file = tmp_path / 'keys.txt'
+    keys_file.write_text('# test plan JIRA-100\nJIRA-1\nJIRA-2, JIRA-3\n')
+    assert read_keys_file(str(keys_file)) == {'JIRA-1', 'JIRA-2', 'JIRA-3'}
+
+
+def test_read_keys_from_xray_report(tmp_path):
+    keys_file = tmp_path / 'xray.json'
+    keys_file.write_text(json.dumps({'info': {}, 'tests': [{'testKey': 'JIRA-1'}, {'testKey': 'JIRA-2'}]}))
+    assert read_keys_file(str(keys_file)) == {'JIRA-1', 'JIRA-2'}
+
+
+def test_read_keys_from_missing_file(tmp_path):
+    with pytest.raises(XrayError, match='Cannot read Xray keys file'):
+        read_keys_file(str(tmp_path / 'missing.txt'))
+
+
+def test_select_tests_by_keys(xray_tests):
+    result = xray_tests.runpytest('--xray-keys', 'JIRA-3,JIRA-4', '-v')
+    result.assert_outcomes(passed=4, deselected=2)
+    result.stdout.fnmatch_lines(['*test_two PASSED*', '*test_four?1? PASSED*'])
+
+
+def test_select_tests_by_keys_file(xray_tests):
+    keys_file = xray_tests.path / 'keys.txt'
+    keys_file.write_text('JIRA-1\n')
+    result = xray_tests.runpytest('--xray-keys-file', str(keys_file), '--xray-keys', 'JIRA-2', '-v')
+    result.assert_outcomes(passed=2, deselected=4)
+    result.stdout.fnmatch_lines(['*test_one PASSED*', '*test_two PASSED*'])
+
+
+def test_select_tests_by_missing_keys_file(xray_tests):
+    result = xray_tests.runpytest('--xray-keys-file', 'missing.txt')
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines(['*Cannot read Xray keys file "missing.txt": *'])
+    assert 'INTERNALERROR' not in result.stdout.str()
+
+
+def test_select_tests_by_keys_with_report(xray_tests):
+    report_file = xray_tests.path / 'xray.json'
+    result = xray_tests.runpytest('--jira-xray', f'--xraypath={report_file}', '--xray-keys', 'JIRA-1')
+    result.assert_outcomes(passed=1, deselected=5)
+    data = json.loads(report_file.read_text())
+    assert [test['testKey'] for test in data['tests']] == ['JIRA-1']
+
+
+@pytest.fixture()
+def xray_tests_with_failures(pytester: pytest.Pytester) -> pytest.Pytester:
+    pytester.makepyfile(
+        textwrap.dedent(
+            """\
+        import os
+        import pytest
+
+        @pytest.mark.xray('JIRA-1')
+        def test_pass():
+            assert True
+
+        @pytest.mark.xray('JIRA-2')
+        @pytest.mark.parametrize('value', [1, 2, 3])
+        def test_fail(value):
+            assert value != 2 or os.environ.get('FIXED')
+
+        @pytest.mark.xray('JIRA-3')
+        @pytest.mark.skip('not ready')
+        def test_skip():
+            assert True
+        """
+        )
+    )
+    return pytester
+
+
+def test_last_failed_without_previous_run(xray_tests_with_failures):
+    result = xray_tests_with_failures.runpytest('--xray-last-failed', '--allow-duplicate-ids')
+    result.assert_outcomes(passed=3, failed=1, skipped=1)
+    result.stdout.fnmatch_lines(['xray: no previously failed Jira XRAY test keys, not deselecting items.'])
+
+
+def test_last_failed_reruns_all_items_of_failed_keys(xray_tests_with_failures, monkeypatch):
+    report_file = xray_tests_with_failures.path / 'xray.json'
+    args = ('--jira-xray', f'--xraypath={report_file}', '--allow-duplicate-ids', '--xray-last-failed')
+    result = xray_tests_with_failures.runpytest(*args)
+    result.assert_outcomes(passed=3, failed=1, skipped=1)
+
+    result = xray_tests_with_failures.runpytest(*args)
+    result.stdout.fnmatch_lines(['xray: rerun 2 previously failed Jira XRAY test keys'])
+    result.assert_outcomes(passed=2, failed=1, skipped=1, deselected=1)
+
+    monkeypatch.setenv('FIXED', '1')
+    result = xray_tests_with_failures.runpytest(*args)
+    result.assert_outcomes(passed=3, skipped=1, deselected=1)
+
+    result = xray_tests_with_failures.runpytest(*args)
+    result.stdout.fnmatch_lines(['xray: rerun 1 previously failed Jira XRAY test keys'])
+    result.assert_outcomes(skipped=1, deselected=4)
+
+
+def test_last_failed_reads_xray_report_without_cache(xray_tests_with_failures):
+    report_file = xray_tests_with_failures.path / 'xray.json'
+    args = ('-p', 'no:cacheprovider', '--jira-xray', f'--xraypath={report_file}', '--allow-duplicate-ids')
+    xray_tests_with_failures.runpytest(*args)
+
+    result = xray_tests_with_failures.runpytest(*args, '--xray-last-failed')
+    result.assert_outcomes(passed=2, failed=1, skipped=1, deselected=1)
+
+
+@pytest.mark.parametrize('value', ['1', '0/2', '3/2', 'a/b'])
+def test_parse_invalid_shard(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_shard(value)
+
+
+def test_shards_keep_items_of_the_same_key_together(pytester: pytest.Pytester):
+    pytester.makepyfile(
+        textwrap.dedent(
+            """\
+        import pytest
+
+        @pytest.mark.xray('JIRA-1')
+        @pytest.mark.parametrize('value', range(4))
+        def test_one(value):
+            assert True
+
+        @pytest.mark.xray(['JIRA-2', 'JIRA-3'])
+        def test_two():
+            assert True
+
+        @pytest.mark.xray('JIRA-3')
+        @pytest.mark.parametrize('value', range(2))
+        def test_three(value):
+            assert True
+
+        @pytest.mark.parametrize('value', range(4))
+        def test_without_key(value):
+            assert True
+        """
+        )
+    )
+    executed: list[set[str]] = []
+    for shard, expected_count in (('1/2', 6), ('2/2', 5)):
+        result = pytester.runpytest('--xray-shard', shard, '--allow-duplicate-ids', '-v')
+        result.stdout.fnmatch_lines([f'xray: shard {shard}, running {expected_count} of 11 items'])
+        executed.append({line.split(' ')[0] for line in result.outlines if line.endswith('%]')})
+
+    assert not executed[0] & executed[1]
+    assert len(executed[0] | executed[1]) == 11
+    for shard_items in executed:
+        test_one = {nodeid for nodeid in shard_items if '::test_one' in nodeid}
+        assert len(test_one) in (0, 4)
+        test_two_and_three = {nodeid for nodeid in shard_items if '::test_t' in nodeid and '::test_one' not in nodeid}
+        assert len(test_two_and_three) in (0, 3)
+
+
+def test_invalid_shard_option(pytester: pytest.Pytester):
+    result = pytester.runpytest('--xray-shard', '3/2')
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines(['*shard index must be between 1 and 2 but got 3*'])
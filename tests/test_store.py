@@ -0,0 +1,175 @@
+import json
+import re
+import sqlite3
+import textwrap
+
+import pytest
+
+from pytest_xray.exceptions import XrayError
+from pytest_xray.helper import STATUS_STR_MAPPER_CLOUD, Status, TestCase, TestExecution
+from pytest_xray.store import SQLiteTestExecution, parse_batch_size
+
+XRAY_CONFTEST = """\
+def pytest_xray_results(results, session):
+    with open('batches.txt', 'a') as file:
+        file.write(f"{len(results['tests'])}\\n")
+"""
+
+XRAY_TESTS = """\
+import pytest
+
+@pytest.mark.xray('JIRA-1', defects=['BUG-1'])
+@pytest.mark.parametrize('value', [1, 2])
+def test_parametrized(value):
+    assert value == 1
+
+@pytest.mark.xray(['JIRA-2', 'JIRA-3'])
+def test_multiple_keys():
+    pass
+
+@pytest.mark.xray('JIRA-4')
+@pytest.mark.skip
+def test_skip():
+    pass
+
+@pytest.mark.xray('JIRA-5')
+def test_pass():
+    pass
+"""
+
+
+def test_store_keeps_test_cases(tmp_path):
+    execution = SQLiteTestExecution(str(tmp_path / 'store.db'), status_str_mapper=STATUS_STR_MAPPER_CLOUD)
+    execution.append(TestCase('JIRA-1', Status.PASS, 'first', defects=['BUG-1']))
+    execution.append(TestCase('JIRA-2', Status.PASS))
+
+    test_case = execution.find_test_case('JIRA-1')
+    test_case.merge(TestCase('JIRA-1', Status.FAIL, 'second', defects=['BUG-2']))
+    execution.update(test_case)
+
+    tests = list(execution.iter_tests())
+    assert [test.test_key for test in tests] == ['JIRA-1', 'JIRA-2']
+    assert tests[0].status == Status.FAIL
+    assert tests[0].comment == 'first\n' + '-' * 80 + '\nsecond'
+    assert tests[0].defects == ['BUG-1', 'BUG-2']
+    assert execution.as_dict()['tests'][0]['status'] == 'FAILED'
+    with pytest.raises(KeyError):
+        execution.find_test_case('JIRA-3')
+    execution.close()
+
+
+def test_store_is_recreated(tmp_path):
+    path = str(tmp_path / 'store.db')
+    execution = SQLiteTestExecution(path)
+    execution.append(TestCase('JIRA-1', Status.PASS))
+    execution.close()
+    assert SQLiteTestExecution(path).tests == []
+
+
+@pytest.mark.parametrize('content', [b'important data', b'SQLite format 3\x00'], ids=['text', 'sqlite'])
+def test_store_does_not_replace_other_files(tmp_path, content):
+    path = tmp_path / 'store.db'
+    path.write_bytes(content)
+    with pytest.raises(XrayError, match='file exists and it is not an Xray store'):
+        SQLiteTestExecution(str(path))
+    assert path.read_bytes() == content
+
+
+def test_store_does_not_replace_other_databases(xray_tests):
+    connection = sqlite3.connect(xray_tests.path / 'app.db')
+    connection.execute('CREATE TABLE users (name TEXT)')
+    connection.commit()
+    connection.close()
+    result = xray_tests.runpytest('--jira-xray', '--xraypath=xray.json', '--xray-store=app.db')
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines(['*Cannot create Xray store "app.db": file exists and it is not an Xray store*'])
+    assert (xray_tests.path / 'app.db').exists()
+
+
+@pytest.mark.parametrize('size, expected', [(None, [5]), (2, [2, 2, 1]), (5, [5]), (10, [5])])
+def test_iter_batches(size, expected):
+    execution = TestExecution(tests=[TestCase(f'JIRA-{index}', Status.PASS) for index in range(5)])
+    batches = list(execution.iter_batches(size))
+    assert [len(batch['tests']) for batch in batches] == expected
+    assert all(batch['info'] == batches[0]['info'] for batch in batches)
+
+
+def test_iter_batches_without_tests():
+    assert [batch['tests'] for batch in TestExecution().iter_batches(10)] == [[]]
+
+
+def test_parse_batch_size():
+    assert parse_batch_size('10') == 10
+    with pytest.raises(Exception, match='greater than 0'):
+        parse_batch_size('0')
+
+
+@pytest.mark.parametrize('extra_args', [[], ['-n', '2']], ids=['no_xdist', 'xdist'])
+def test_store_and_batches_to_file(xray_tests, extra_args):
+    xray_tests.runpytest('--jira-xray', '--allow-duplicate-ids', '--xraypath=expected.json', *extra_args)
+    expected = json.loads((xray_tests.path / 'expected.json').read_text())
+    (xray_tests.path / 'batches.txt').unlink()
+
+    result = xray_tests.runpytest(
+        '--jira-xray',
+        '--allow-duplicate-ids',
+        '--xraypath=xray.json',
+        '--xray-store=store.db',
+        '--xray-batch-size=2',
+        *extra_args,
+    )
+    result.assert_outcomes(passed=3, failed=1, skipped=1)
+    data = json.loads((xray_tests.path / 'xray.json').read_text())
+
+    def by_key(tests):
+        # start and finish differ between runs, so do xdist workers mentioned in comments
+        return {
+            test['testKey']: {
+                name: re.sub(r'\[gw\d+\]', '[gw]', value) if name == 'comment' else value
+                for name, value in test.items()
+                if name not in ('start', 'finish')
+            }
+            for test in tests
+        }
+
+    assert by_key(data['tests']) == by_key(expected['tests'])
+    assert data['info']['summary'] == expected['info']['summary']
+    assert (xray_tests.path / 'batches.txt').read_text().split() == ['2', '2', '1']
+
+
+def test_batches_to_server(xray_tests, xray_server):
+    result = xray_tests.runpytest(
+        '--jira-xray', '--allow-duplicate-ids', '--xray-store=store.db', '--xray-batch-size=2'
+    )
+    result.stdout.fnmatch_lines(['*Uploaded results to JIRA XRAY. Test Execution Id: XRAY-1*'])
+    requests = [request.json() for request in xray_server.import_requests()]
+    assert [len(request['tests']) for request in requests] == [2, 2, 1]
+    assert 'testExecutionKey' not in requests[0]
+    assert [request['testExecutionKey'] for request in requests[1:]] == ['XRAY-1', 'XRAY-1']
+
+
+def test_batch_published_hook(xray_tests, xray_server):
+    xray_server.fail_next(500, times=1)
+    xray_tests.makeconftest(
+        textwrap.dedent(
+            """\
+        def pytest_xray_batch_published(results, issue_id, session):
+            with open('published.txt', 'a') as file:
+                file.write(f"{len(results['tests'])} {issue_id}\\n")
+        """
+        )
+    )
+    result = xray_tests.runpytest('--jira-xray', '--allow-duplicate-ids', '--xray-batch-size=2')
+    result.stdout.fnmatch_lines(['Could not publish results to Jira XRAY!'])
+    assert not (xray_tests.path / 'published.txt').exists()
+
+    result = xray_tests.runpytest('--jira-xray', '--allow-duplicate-ids', '--xray-batch-size=2')
+    result.stdout.fnmatch_lines(['*Test Execution Id: XRAY-1*'])
+    assert (xray_tests.path / 'published.txt').read_text().splitlines() == ['2 XRAY-1', '2 XRAY-1', '1 XRAY-1']
+
+
+def test_batch_upload_error(xray_tests, xray_server):
+    xray_server.fail_next(500, times=1)
+    result = xray_tests.runpytest('--jira-xray', '--allow-duplicate-ids', '--xray-batch-size=2')
+    result.stdout.fnmatch_lines(['Could not publish results to Jira XRAY!'])
+    assert len(xray_server.import_requests()) == 1
@@ -0,0 +1,87 @@
+import time
+from unittest.mock import ANY
+
+import pytest
+
+from pytest_xray.constant import TEST_EXECUTION_ENDPOINT, TEST_EXECUTION_ENDPOINT_CLOUD
+from pytest_xray.exceptions import XrayError
+from pytest_xray.testing import XrayServer
+from pytest_xray.xray_publisher import ClientSecretAuth, XrayPublisher
+
+RESULTS = {'info': {'summary': 'Test'}, 'tests': [{'testKey': 'JIRA-1', 'status': 'PASS'}]}
+
+
+def _publisher(server: XrayServer, endpoint: str = TEST_EXECUTION_ENDPOINT, auth=('user', 'password')):
+    return XrayPublisher(base_url=server.url, endpoint=endpoint, auth=auth)
+
+
+def test_server_creates_executions_and_records_requests():
+    with XrayServer() as server:
+        assert _publisher(server).publish(RESULTS) == 'XRAY-1'
+        assert _publisher(server).publish(RESULTS) == 'XRAY-2'
+        assert _publisher(server).publish({**RESULTS, 'testExecutionKey': 'JIRA-10'}) == 'JIRA-10'
+
+    assert [request.json()['tests'] for request in server.import_requests()] == [RESULTS['tests']] * 3
+    assert server.requests[0].headers['Authorization'].startswith('Basic ')
+
+
+def test_server_cloud_endpoint_with_authentication():
+    with XrayServer(token='secret-token') as server:
+        auth = ClientSecretAuth(server.url, 'client_id', 'client_secret')
+        assert _publisher(server, TEST_EXECUTION_ENDPOINT_CLOUD, auth).publish(RESULTS) == 'XRAY-1'
+
+    assert [request.path for request in server.requests] == ['/api/v2/authenticate', TEST_EXECUTION_ENDPOINT_CLOUD]
+    assert server.requests[1].headers['Authorization'] == 'Bearer secret-token'
+
+
+def test_server_injects_errors():
+    with XrayServer() as server:
+        server.fail_next(429, retry_after=1)
+        server.fail_next(503)
+        with pytest.raises(XrayError, match='Response status code: 429'):
+            _publisher(server).publish(RESULTS)
+        with pytest.raises(XrayError, match='Response status code: 503'):
+            _publisher(server).publish(RESULTS)
+        assert _publisher(server).publish(RESULTS) == 'XRAY-1'
+
+    assert [request.status for request in server.requests] == [429, 503, 200]
+
+
+def test_server_error_rate():
+    server = XrayServer(error_rate=1.0, error_statuses=(502,))
+    with server, pytest.raises(XrayError, match='Response status code: 502'):
+        _publisher(server).publish(RESULTS)
+
+
+def test_server_limits_request_size():
+    server = XrayServer(max_request_size=10)
+    with server, pytest.raises(XrayError, match='Response status code: 413'):
+        _publisher(server).publish(RESULTS)
+
+
+def test_server_latency_and_throughput():
+    with XrayServer(latency=0.1, throughput=1000) as server:
+        start = time.monotonic()
+        _publisher(server).publish(RESULTS)
+        assert time.monotonic() - start >= 0.1
+
+        start = time.monotonic()
+        _publisher(server).publish({**RESULTS, 'info': {'description': 'x' * 200}})
+        assert time.monotonic() - start >= 0.2
+
+
+def test_xray_server_fixture(xray_server, pytester):
+    pytester.makepyfile(
+        """
+        import pytest
+
+        @pytest.mark.xray('JIRA-1')
+        def test_pass():
+            assert True
+        """
+    )
+    result = pytester.runpytest('--jira-xray')
+    result.stdout.fnmatch_lines(['*Uploaded results to JIRA XRAY. Test Execution Id: XRAY-1*'])
+    assert xray_server.import_requests()[0].json()['tests'] == [
+        {'testKey': 'JIRA-1', 'status': 'PASS', 'start': ANY, 'finish': ANY}
+    ]
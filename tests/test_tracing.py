@@ -0,0 +1,128 @@
+import json
+import threading
+
+import pytest
+
+from pytest_xray.tracing import STATUS_CODE_ERROR, NullTracer, Tracer
+
+XRAY_TESTS = """\
+import pytest
+
+@pytest.mark.xray('JIRA-1')
+def test_pass():
+    pass
+"""
+
+
+def read_spans(path):
+    spans = {}
+    for line in path.read_text().splitlines():
+        for resource_spans in json.loads(line)['resourceSpans']:
+            for scope_spans in resource_spans['scopeSpans']:
+                for span in scope_spans['spans']:
+                    spans[span['name']] = span
+    return spans
+
+
+def test_tracer_writes_nested_spans(tmp_path):
+    trace_file = tmp_path / 'trace.jsonl'
+    tracer = Tracer(str(trace_file))
+    with tracer.span('parent', attributes={'size': 10}), pytest.raises(ValueError), tracer.span('child') as span:
+        span.set_attribute('ratio', 0.5)
+        raise ValueError('failed')
+    tracer.close()
+
+    spans = read_spans(trace_file)
+    assert spans['child']['parentSpanId'] == spans['parent']['spanId']
+    assert spans['child']['traceId'] == spans['parent']['traceId']
+    assert spans['child']['status'] == {'code': STATUS_CODE_ERROR, 'message': 'ValueError: failed'}
+    assert spans['child']['attributes'] == [{'key': 'ratio', 'value': {'doubleValue': 0.5}}]
+    assert spans['parent']['attributes'] == [{'key': 'size', 'value': {'intValue': '10'}}]
+    assert 'parentSpanId' not in spans['parent']
+    assert int(spans['parent']['startTimeUnixNano']) <= int(spans['child']['startTimeUnixNano'])
+
+
+def test_tracer_ends_open_spans_on_close(tmp_path):
+    trace_file = tmp_path / 'trace.jsonl'
+    tracer = Tracer(str(trace_file))
+    tracer.span('session').start()
+    tracer.close()
+    assert set(read_spans(trace_file)) == {'session'}
+
+
+def test_tracer_spans_of_threads(tmp_path):
+    trace_file = tmp_path / 'trace.jsonl'
+    tracer = Tracer(str(trace_file))
+    session = tracer.span('session').start()
+    started = threading.Event()
+    resume = threading.Event()
+
+    def warm_up():
+        with tracer.attach(session), tracer.span('warm up'):
+            started.set()
+            resume.wait()
+            with tracer.span('authenticate'):
+                pass
+
+    def publish():
+        with tracer.span('POST'):
+            pass
+
+    thread = threading.Thread(target=warm_up)
+    thread.start()
+    started.wait()
+    with tracer.span('collection'):
+        resume.set()
+        thread.join()
+        publisher = threading.Thread(target=publish)
+        publisher.start()
+        publisher.join()
+    session.end()
+    tracer.close()
+
+    spans = read_spans(trace_file)
+    assert spans['warm up']['parentSpanId'] == spans['session']['spanId']
+    assert spans['authenticate']['parentSpanId'] == spans['warm up']['spanId']
+    assert spans['collection']['parentSpanId'] == spans['session']['spanId']
+    # threads without own spans continue the trace of the thread which created the tracer
+    assert spans['POST']['parentSpanId'] == spans['collection']['spanId']
+    assert len(trace_file.read_text().splitlines()) == 5
+
+
+def test_null_tracer_does_not_write(tmp_path):
+    tracer = NullTracer()
+    with tracer.span('phase') as span:
+        span.set_attribute('key', 'value')
+    tracer.close()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_trace_of_publish_to_server(xray_tests, xray_server):
+    trace_file = xray_tests.path / 'trace.jsonl'
+    result = xray_tests.runpytest('--jira-xray', '--cloud', '--client-secret-auth', f'--xray-trace={trace_file}')
+    result.assert_outcomes(passed=1)
+
+    spans = read_spans(trace_file)
+    assert {
+        'pytest session',
+        'index collected items',
+        'update cache',
+        'build report',
+        'pytest_xray_results',
+        'publish',
+        'encode JSON',
+        'POST',
+        'authenticate',
+    } <= set(spans)
+    session_id = spans['pytest session']['spanId']
+    assert spans['publish']['parentSpanId'] == session_id
+    assert spans['POST']['parentSpanId'] == spans['publish']['spanId']
+    assert spans['authenticate']['parentSpanId'] == spans['POST']['spanId']
+    assert {'key': 'http.response.status_code', 'value': {'intValue': '200'}} in spans['POST']['attributes']
+
+
+def test_trace_of_publish_to_file(xray_tests):
+    trace_file = xray_tests.path / 'trace.jsonl'
+    xray_tests.runpytest('--jira-xray', '--xraypath=xray.json', f'--xray-trace={trace_file}')
+    spans = read_spans(trace_file)
+    assert spans['write file']['parentSpanId'] == spans['publish']['spanId']
@@ -0,0 +1,126 @@
+import time
+from urllib.parse import parse_qs
+
+import pytest
+
+from pytest_xray import validation
+from pytest_xray.testing import XrayServer
+from pytest_xray.validation import KeyValidator, parse_cache_ttl
+
+XRAY_TESTS = """\
+import pytest
+
+@pytest.mark.xray('JIRA-1')
+def test_pass():
+    pass
+
+@pytest.mark.xray('JRIA-2')
+def test_mistyped():
+    pass
+
+@pytest.mark.xray('JIRA-3')
+def test_fail():
+    assert False
+"""
+
+
+def _searched_keys(server: XrayServer) -> list[list[str]]:
+    queries = [parse_qs(request.query)['jql'][0] for request in server.search_requests()]
+    return [
+        sorted(key.strip('"') for key in query.removeprefix('key in (').removesuffix(')').split(', '))
+        for query in queries
+    ]
+
+
+def test_parse_cache_ttl():
+    assert parse_cache_ttl('0') == 0.0
+    assert parse_cache_ttl('3600') == 3600.0
+    with pytest.raises(Exception, match='must not be negative'):
+        parse_cache_ttl('-1')
+
+
+def test_validator_searches_keys_in_chunks(monkeypatch):
+    monkeypatch.setattr(validation, 'VALIDATION_CHUNK_SIZE', 2)
+    with XrayServer(issues={'ABC-1', 'ABC-2', 'ABC-4'}) as server:
+        validator = KeyValidator(server.url, ('user', 'password'), cached={'ABC-5': time.time(), 'ABC-6': 0.0})
+        validator.submit(['ABC-1', 'ABC-2', 'ABC-3'])
+        validator.submit(['ABC-1', 'ABC-4', 'ABC-5', 'ABC-6'])
+        validator.close()
+
+    assert validator.error is None
+    assert validator.get_invalid() == {'ABC-3', 'ABC-6'}
+    assert sorted(validator.existing) == ['ABC-1', 'ABC-2', 'ABC-4', 'ABC-5']
+    # cached key is not searched again, expired one is
+    searched = [key for keys in _searched_keys(server) for key in keys]
+    assert sorted(searched) == ['ABC-1', 'ABC-2', 'ABC-3', 'ABC-4', 'ABC-6']
+    assert all(len(keys) <= 2 for keys in _searched_keys(server))
+    assert server.search_requests()[0].headers['Authorization'].startswith('Basic ')
+
+
+def test_validator_reads_all_pages_of_search():
+    with XrayServer(issues={'ABC-1', 'ABC-2', 'ABC-3'}, max_search_results=2) as server:
+        validator = KeyValidator(server.url, ('user', 'password'))
+        validator.submit(['ABC-1', 'ABC-2', 'ABC-3', 'ABC-4'])
+        validator.close()
+
+    assert validator.error is None
+    assert validator.get_invalid() == {'ABC-4'}
+    assert sorted(validator.existing) == ['ABC-1', 'ABC-2', 'ABC-3']
+    assert [parse_qs(request.query)['startAt'] for request in server.search_requests()] == [['0'], ['2']]
+
+
+def test_validator_quotes_keys():
+    with XrayServer(issues={'ABC-1'}) as server:
+        validator = KeyValidator(server.url, ('user', 'password'))
+        validator.submit(['ABC-1', 'ABC 2"'])
+        validator.close()
+
+    assert validator.get_invalid() == {'ABC 2"'}
+    assert parse_qs(server.search_requests()[0].query)['jql'] == ['key in ("ABC-1", "ABC 2\\"")']
+
+
+def test_validator_connection_error():
+    with XrayServer() as server:
+        url = server.url
+    validator = KeyValidator(url, ('user', 'password'))
+    validator.submit(['ABC-1'])
+    validator.close()
+    assert validator.error is not None
+    assert 'cannot connect to JIRA service' in validator.error.message
+    assert validator.get_invalid() == set()
+
+
+@pytest.mark.parametrize('workers', ['0', '2'])
+def test_validate_keys(xray_tests, xray_server, workers):
+    xray_server.issues = {'JIRA-1', 'JIRA-3'}
+    result = xray_tests.runpytest('--jira-xray', '--xray-validate-keys', '-n', workers)
+    result.assert_outcomes(passed=2, failed=1)
+    result.stdout.fnmatch_lines(
+        [
+            '*Uploaded results to JIRA XRAY*',
+            'Jira XRAY test keys not found, their results were not uploaded: JRIA-2',
+        ]
+    )
+    [request] = xray_server.import_requests()
+    assert sorted(test['testKey'] for test in request.json()['tests']) == ['JIRA-1', 'JIRA-3']
+    assert sorted(key for keys in _searched_keys(xray_server) for key in keys) == ['JIRA-1', 'JIRA-3', 'JRIA-2']
+    if workers == '0':
+        # all keys are known at collection and searched at once
+        assert len(xray_server.search_requests()) == 1
+
+    # existing keys are cached, only the missing one is searched again
+    xray_server.requests.clear()
+    result = xray_tests.runpytest('--jira-xray', '--xray-validate-keys', '-n', workers)
+    result.assert_outcomes(passed=2, failed=1)
+    assert _searched_keys(xray_server) == [['JRIA-2']]
+
+    xray_server.requests.clear()
+    result = xray_tests.runpytest('--jira-xray', '--xray-validate-keys', '--xray-validate-keys-ttl=0', '-n', workers)
+    result.assert_outcomes(passed=2, failed=1)
+    assert sorted(key for keys in _searched_keys(xray_server) for key in keys) == ['JIRA-1', 'JIRA-3', 'JRIA-2']
+
+
+def test_validate_keys_with_cloud(xray_tests, xray_server):
+    result = xray_tests.runpytest('--jira-xray', '--cloud', '--client-secret-auth', '--xray-validate-keys')
+    assert result.ret == pytest.ExitCode.USAGE_ERROR
+    result.stderr.fnmatch_lines(['*--xray-validate-keys option is not supported with Jira XRAY cloud*'])
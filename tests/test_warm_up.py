@@ -0,0 +1,56 @@
+import pytest
+
+from pytest_xray.constant import AUTHENTICATE_ENDPOINT, TEST_EXECUTION_ENDPOINT_CLOUD
+
+XRAY_TESTS = """\
+import pytest
+
+@pytest.mark.xray('JIRA-1')
+def test_pass():
+    pass
+
+@pytest.mark.xray('JIRA-2')
+def test_another_pass():
+    pass
+"""
+
+
+def test_warm_up_authenticates_once(xray_tests, xray_server):
+    result = xray_tests.runpytest('--jira-xray', '--cloud', '--client-secret-auth', '--xray-warm-up')
+    result.assert_outcomes(passed=2)
+    result.stdout.fnmatch_lines(['*Test Execution Id: XRAY-1*', '*1 requests, 1 auth*'])
+    assert [(request.method, request.path) for request in xray_server.requests] == [
+        ('POST', AUTHENTICATE_ENDPOINT),
+        ('HEAD', '/'),
+        ('POST', TEST_EXECUTION_ENDPOINT_CLOUD),
+    ]
+    assert xray_server.requests[2].headers['Authorization'] == 'Bearer dummy_token'
+
+
+def test_warm_up_reports_connection_error(xray_tests, xray_server, monkeypatch):
+    monkeypatch.setenv('XRAY_API_BASE_URL', 'http://127.0.0.1:1')
+    result = xray_tests.runpytest('--jira-xray', '--xray-warm-up')
+    result.assert_outcomes(passed=2)
+    result.stdout.fnmatch_lines(
+        [
+            '*Jira XRAY warm-up failed: ConnectionError: cannot connect to JIRA service at http://127.0.0.1:1',
+            '*Could not publish results to Jira XRAY!*',
+        ]
+    )
+    # the error is reported only once, as soon as it is known
+    assert result.stdout.str().count('warm-up failed') == 1
+
+
+def test_warm_up_abort(xray_tests, xray_server, monkeypatch):
+    monkeypatch.setenv('XRAY_API_BASE_URL', 'http://127.0.0.1:1')
+    result = xray_tests.runpytest('--jira-xray', '--cloud', '--client-secret-auth', '--xray-warm-up-abort')
+    assert result.ret == pytest.ExitCode.INTERRUPTED
+    assert 'test_pass' not in result.stdout.str()
+    result.stdout.fnmatch_lines(['*Jira XRAY warm-up failed: ConnectionError: cannot authenticate with*'])
+
+
+def test_warm_up_abort_with_file(xray_tests):
+    (xray_tests.path / 'results').write_text('')
+    result = xray_tests.runpytest('--jira-xray', '--xraypath=results/xray.json', '--xray-warm-up-abort')
+    assert result.ret == pytest.ExitCode.INTERRUPTED
+    result.stdout.fnmatch_lines(['*Jira XRAY warm-up failed: Cannot create directory of Xray results file*'])
@@ -1,3 +1,4 @@
+import datetime as dt
 import json
 import textwrap
 from pathlib import Path
@@ -146,6 +147,42 @@ def test_if_user_can_modify_results_with_hooks(xray_tests):
     assert xray_result['info']['user'] == 'Test User'
 
 
+@pytest.mark.parametrize('extra_args', ['-n 0', '-n 2'], ids=['no_xdist', 'xdist'])
+def test_test_result_hook(xray_tests_multi, extra_args):
+    xray_tests_multi.makeconftest("""
+        def pytest_xray_test_result(test_case, report):
+            with open('results.txt', 'a') as file:
+                file.write(f'{test_case.test_key} {test_case.status.value} {report.nodeid}\\n')
+    """)
+    result = xray_tests_multi.runpytest('--jira-xray', '--xraypath=xray.json', *extra_args.split())
+    assert result.ret == 0
+    lines = (xray_tests_multi.tmpdir / 'results.txt').read_text('utf-8').splitlines()
+    assert sorted(lines) == [
+        'JIRA-1 PASS test_test_result_hook.py::test_foo',
+        'JIRA-2 PASS test_test_result_hook.py::test_foo',
+        'JIRA-3 PASS test_test_result_hook.py::test_bar',
+        'JIRA-4 PASS test_test_result_hook.py::test_bar',
+    ]
+
+
+@pytest.mark.parametrize('extra_args', [[], ['--xray-batch-size=1']], ids=['single', 'batches'])
+def test_batch_published_hook(xray_tests_multi, extra_args):
+    xray_tests_multi.makeconftest("""
+        def pytest_xray_batch_published(results, issue_id, session):
+            with open('batches.txt', 'a') as file:
+                keys = ','.join(test['testKey'] for test in results['tests'])
+                file.write(f'{keys} {issue_id}\\n')
+    """)
+    result = xray_tests_multi.runpytest('--jira-xray', '--xraypath=xray.json', *extra_args)
+    assert result.ret == 0
+    lines = (xray_tests_multi.tmpdir / 'batches.txt').read_text('utf-8').splitlines()
+    if extra_args:
+        assert lines == [f'JIRA-{index} xray.json' for index in range(1, 5)]
+    else:
+        assert lines == ['JIRA-1,JIRA-2,JIRA-3,JIRA-4 xray.json']
+    assert len(json.load((xray_tests_multi.tmpdir / 'xray.json').open())['tests']) == 4
+
+
 def test_if_user_can_attach_evidences(xray_tests):
     expected_tests = [
         {
@@ -181,6 +218,8 @@ def test_if_user_can_attach_evidences(xray_tests):
             ],
             'status': 'PASS',
             'testKey': 'JIRA-1',
+            'start': mock.ANY,
+            'finish': mock.ANY,
         }
     ]
 
@@ -438,6 +477,8 @@ def test_add_captures(testdir):
     expected_tests = [
         {
             'testKey': 'JIRA-1',
+            'start': mock.ANY,
+            'finish': mock.ANY,
             'status': 'PASS',
             'comment': '{noformat:borderWidth=0px|bgColor=transparent}'
             '----------------------------- Captured stdout call -----------------------------\n'
@@ -517,7 +558,7 @@ def test_jira_xray_plugin_gets_unexpected_response(xray_tests, fake_xray_server)
 
 
 def test_jira_xray_plugin_authentication_issue(xray_tests, environment_variables):
-    with mock.patch('requests.post', side_effect=requests.exceptions.ConnectionError):
+    with mock.patch('requests.Session.post', side_effect=requests.exceptions.ConnectionError):
         result = xray_tests.runpytest('--jira-xray', '--client-secret-auth')
     result.assert_outcomes(passed=1)
     result.stdout.fnmatch_lines(
@@ -530,7 +571,7 @@ def test_jira_xray_plugin_authentication_issue(xray_tests, environment_variables
 
 
 def test_jira_xray_plugin_connection_error(xray_tests, environment_variables):
-    with mock.patch('requests.request', side_effect=requests.exceptions.ConnectionError):
+    with mock.patch('requests.Session.request', side_effect=requests.exceptions.ConnectionError):
         result = xray_tests.runpytest('--jira-xray', '--client-secret-auth')
     result.assert_outcomes(passed=1)
     result.stdout.fnmatch_lines(
@@ -547,7 +588,7 @@ def test_jira_xray_plugin_http_error(xray_tests, fake_xray_server):
     response.status_code = 404
     response.json = mock.Mock(return_value={'error': 'Not Found for url'})
     response.raise_for_status.side_effect = requests.exceptions.HTTPError
-    with mock.patch('requests.request', return_value=response):
+    with mock.patch('requests.Session.request', return_value=response):
         result = xray_tests.runpytest('--jira-xray')
     result.assert_outcomes(passed=1)
     result.stdout.fnmatch_lines(
@@ -571,3 +612,170 @@ def test_export_to_file_when_cannot_serialize_report(xray_tests):
     result = xray_tests.runpytest('--jira-xray', f'--xraypath={report_file}')
     assert result.ret == 0
     result.stdout.fnmatch_lines(['Cannot export Xray results to file: Object of type object is not JSON serializable'])
+
+
+@pytest.mark.parametrize('extra_args', ['-n 0', '-n 2'], ids=['no_xdist', 'xdist'])
+def test_start_and_finish_of_tests(pytester, extra_args):
+    pytester.makepyfile(
+        textwrap.dedent(
+            """\
+        import time
+        import pytest
+
+        @pytest.fixture
+        def slow_fixture():
+            time.sleep(1.1)
+
+        @pytest.mark.xray('JIRA-1')
+        @pytest.mark.parametrize('delay', [0.5, 0.6])
+        def test_parametrized(delay):
+            time.sleep(delay)
+
+        @pytest.mark.xray('JIRA-2')
+        def test_setup(slow_fixture):
+            pass
+        """
+        )
+    )
+    report_file = pytester.path / 'xray.json'
+    result = pytester.runpytest(
+        '--jira-xray', '--allow-duplicate-ids', f'--xraypath={report_file}', *extra_args.split()
+    )
+    result.assert_outcomes(passed=3)
+
+    data = json.loads(report_file.read_text())
+    fmt = '%Y-%m-%dT%H:%M:%S%z'
+    start_date = dt.datetime.strptime(data['info']['startDate'], fmt)
+    finish_date = dt.datetime.strptime(data['info']['finishDate'], fmt)
+    for test in data['tests']:
+        start = dt.datetime.strptime(test['start'], fmt)
+        finish = dt.datetime.strptime(test['finish'], fmt)
+        assert start_date <= start <= finish <= finish_date
+        if extra_args == '-n 0':
+            # both parametrizations and the fixture setup are included
+            assert finish - start >= dt.timedelta(seconds=1)
+
+
+@pytest.mark.parametrize('extra_args', [[], ['--xray-store=store.db']], ids=['memory', 'store'])
+def test_finish_of_tests_includes_teardown(pytester, extra_args):
+    pytester.makepyfile(
+        textwrap.dedent(
+            """\
+        import time
+        import pytest
+
+        @pytest.fixture
+        def slow_teardown():
+            yield
+            time.sleep(1.1)
+
+        @pytest.mark.xray('JIRA-1')
+        def test_teardown(slow_teardown):
+            pass
+        """
+        )
+    )
+    report_file = pytester.path / 'xray.json'
+    result = pytester.runpytest('--jira-xray', f'--xraypath={report_file}', *extra_args)
+    result.assert_outcomes(passed=1)
+
+    [test] = json.loads(report_file.read_text())['tests']
+    fmt = '%Y-%m-%dT%H:%M:%S%z'
+    assert dt.datetime.strptime(test['finish'], fmt) - dt.datetime.strptime(test['start'], fmt) >= dt.timedelta(
+        seconds=1
+    )
+
+
+@pytest.mark.parametrize('extra_args', ['-n 0', '-n 2'], ids=['no_xdist', 'xdist'])
+def test_parametrized_tests_as_iterations(pytester, extra_args):
+    pytester.makepyfile(
+        textwrap.dedent(
+            """\
+        import pytest
+
+        @pytest.mark.xray('JIRA-1')
+        @pytest.mark.parametrize('user, password', [('admin', 'secret'), ('guest', '')])
+        def test_login(user, password):
+            assert password, 'empty password'
+
+        @pytest.mark.xray('JIRA-1')
+        @pytest.mark.parametrize('value', [1])
+        @pytest.mark.skip(reason='not ready')
+        def test_skip(value):
+            pass
+
+        @pytest.mark.xray('JIRA-2')
+        def test_no_parameters():
+            assert False
+        """
+        )
+    )
+    report_file = pytester.path / 'xray.json'
+    result = pytester.runpytest(
+        '--jira-xray', '--allow-duplicate-ids', '--xray-iterations', f'--xraypath={report_file}', *extra_args.split()
+    )
+    result.assert_outcomes(passed=1, failed=2, skipped=1)
+
+    tests = {test['testKey']: test for test in json.loads(report_file.read_text())['tests']}
+    assert tests['JIRA-1']['status'] == 'ABORTED'
+    assert 'comment' not in tests['JIRA-1']
+    assert sorted(tests['JIRA-1']['iterations'], key=lambda iteration: iteration['name']) == [
+        {
+            'name': 'test_login[admin-secret]',
+            'parameters': [{'name': 'user', 'value': 'admin'}, {'name': 'password', 'value': 'secret'}],
+            'status': 'PASS',
+        },
+        {
+            'name': 'test_login[guest-]',
+            'parameters': [{'name': 'user', 'value': 'guest'}, {'name': 'password', 'value': ''}],
+            'status': 'FAIL',
+            'log': "AssertionError: empty password\nassert ''",
+        },
+        {
+            'name': 'test_skip[1]',
+            'parameters': [{'name': 'value', 'value': '1'}],
+            'status': 'ABORTED',
+            'log': 'Skipped: not ready',
+        },
+    ]
+    assert 'iterations' not in tests['JIRA-2']
+    assert 'assert False' in tests['JIRA-2']['comment']
+
+
+def test_parametrizations_with_iterations_are_not_duplicates(pytester):
+    pytester.makepyfile(
+        textwrap.dedent(
+            """\
+        import pytest
+
+        @pytest.mark.xray('JIRA-1')
+        @pytest.mark.parametrize('value', [1, 2, 3])
+        def test_values(value):
+            pass
+        """
+        )
+    )
+    report_file = pytester.path / 'xray.json'
+    result = pytester.runpytest('--jira-xray', '--xray-iterations', f'--xraypath={report_file}')
+    result.assert_outcomes(passed=3)
+    [test] = json.loads(report_file.read_text())['tests']
+    assert len(test['iterations']) == 3
+
+    # without iterations each parametrization is a separate test
+    result = pytester.runpytest('--jira-xray', f'--xraypath={report_file}')
+    assert 'Duplicated test case ids' in str(result.stdout)
+
+    # another test function with the same key is still a duplicate
+    pytester.makepyfile(
+        test_other=textwrap.dedent(
+            """\
+        import pytest
+
+        @pytest.mark.xray('JIRA-1')
+        def test_other():
+            pass
+        """
+        )
+    )
+    result = pytester.runpytest('--jira-xray', '--xray-iterations', f'--xraypath={report_file}')
+    assert 'Duplicated test case ids' in str(result.stdout)